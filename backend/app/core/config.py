@@ -3,7 +3,7 @@ Application configuration
 """
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import List, Union
+from typing import Dict, List, Union
 import json
 
 
@@ -28,12 +28,95 @@ class Settings(BaseSettings):
     
     # Voice Processing
     WHISPER_MODEL: str = "base"  # tiny, base, small, medium, large
-    MAX_AUDIO_DURATION: int = 60  # seconds
+    STT_ALLOWED_MODELS: List[str] = ["tiny", "base", "small"]  # Selectable per request
+    STT_LANGUAGE_MODELS: Dict[str, str] = {}  # Language code -> model size or checkpoint path
+    STT_MODEL_MEMORY_BUDGET_MB: float = 2048.0  # Resident Whisper models before LRU eviction
+    MAX_AUDIO_DURATION: int = 60  # seconds of speech after VAD trimming
     SUPPORTED_AUDIO_FORMATS: List[str] = ["wav", "mp3", "m4a", "ogg"]
+    STT_IN_MEMORY_DECODE: bool = True  # Decode uploads in memory instead of temp file + ffmpeg
+    STT_BATCHING_ENABLED: bool = True  # Micro-batch concurrent transcription requests
+    STT_BATCH_MAX_SIZE: int = 8
+    STT_BATCH_MAX_WAIT_MS: float = 20.0
+    STT_BATCH_MAX_QUEUE: int = 64
+    STT_QUANTIZE_INT8: bool = False  # Dynamic int8 Linear layers for Whisper (CPU only)
+    
+    # Short-utterance mode: encode only the audio present instead of a padded 30 s window
+    STT_SHORT_UTTERANCE_MODE: bool = True
+    STT_SHORT_UTTERANCE_MAX_SECONDS: float = 10.0
+    STT_SHORT_MIN_AUDIO_CTX: int = 256  # Encoder positions (20 ms each)
+    STT_SHORT_CTX_MARGIN: int = 32
+    STT_SHORT_CTX_ALIGN: int = 64
+    STT_SHORT_FALLBACK_LOGPROB: float = -1.0  # Re-run with full padding below this avg log-prob
+    
+    # Long recordings: split on pauses and transcribe chunks on a process pool
+    STT_LONG_AUDIO_ENABLED: bool = True
+    STT_LONG_AUDIO_THRESHOLD_SECONDS: float = 30.0
+    STT_LONG_CHUNK_SECONDS: float = 30.0  # Chunk length including overlap (at most one Whisper window)
+    STT_LONG_OVERLAP_SECONDS: float = 1.0
+    STT_LONG_AUDIO_WORKERS: int = 0  # 0 = half the CPU cores
+    
+    # Adaptive cascade: try a small model first, escalate to WHISPER_MODEL when unsure
+    STT_CASCADE_ENABLED: bool = False
+    STT_CASCADE_DRAFT_MODEL: str = "tiny"
+    STT_CASCADE_MIN_LOGPROB: float = -0.5
+    STT_CASCADE_MAX_NO_SPEECH_PROB: float = 0.5
+    STT_CASCADE_MAX_SECONDS: float = 8.0
+    
+    # Speculative decoding: a draft model proposes tokens, the main model verifies them (greedy only)
+    STT_SPECULATIVE_ENABLED: bool = False
+    STT_SPECULATIVE_DRAFT_MODEL: str = "tiny"
+    STT_SPECULATIVE_DRAFT_TOKENS: int = 4
+    
+    # Voice activity detection
+    STT_VAD_ENABLED: bool = True  # Trim silence and reject non-speech clips before Whisper
+    STT_VAD_ENERGY_THRESHOLD_DB: float = -40.0  # Frame energy (dBFS) counted as speech
+    STT_VAD_MAX_ZCR: float = 0.35  # Zero-crossing rate above which quiet frames count as noise
+    STT_VAD_MIN_SPEECH_MS: int = 200
+    STT_VAD_PADDING_MS: int = 200  # Audio kept around the detected speech
+    
+    # Decoding profile: "fast" (greedy, no fallback, banking prompt), "balanced" or "accurate" (beam search)
+    STT_DECODING_PROFILE: str = "balanced"  # Default replaces Whisper's: fallback 0/0.4/0.8, best-of 3, no timestamps
+    STT_STREAM_PARTIAL_PROFILE: str = "fast"  # Profile for streaming partial transcripts
+    
+    # Per-session language pinning (skips Whisper language detection)
+    STT_LANGUAGE_PIN_MIN_LOGPROB: float = -0.8  # Avg log-prob needed to pin or keep a detected language
+    
+    # Streaming STT (WebSocket audio_chunk messages)
+    STT_STREAM_ENDPOINT_SILENCE_MS: int = 600  # Trailing silence that commits an utterance
+    STT_STREAM_MIN_SPEECH_MS: int = 150
+    STT_STREAM_PARTIAL_INTERVAL_MS: int = 700  # New speech between partial transcripts
+    STT_STREAM_MAX_SECONDS: float = 30.0  # Commit when the buffer fills one Whisper window
     
     # NLU
     INTENT_MODEL_PATH: str = "models/intent_model"
     CONFIDENCE_THRESHOLD: float = 0.7
+    INTENT_BACKEND: str = "torch"  # torch, onnx (needs scripts/export_intent_onnx.py output), knn
+    INTENT_KNN_INDEX_DIR: str = "models/intent-knn"  # Written by scripts/build_intent_knn_index.py
+    INTENT_KNN_K: int = 10  # Neighbours voting per utterance
+    INTENT_KNN_TEMPERATURE: float = 0.05  # Softmax temperature over neighbour cosine similarities
+    INTENT_MODEL_REGISTRY_DIR: str = "models/intent-registry"  # scripts/publish_intent_model.py; ACTIVE is served
+    INTENT_REGISTRY_POLL_SECONDS: float = 5.0  # Reload when ACTIVE changes (0 = admin endpoint only)
+    INTENT_REGISTRY_VERIFY_CHECKSUMS: bool = True  # Check manifest SHA-256s before loading a version
+    INTENT_ONNX_THREADS: int = 0  # ONNX Runtime intra-op threads (0 = one per physical core)
+    INTENT_TOP_K: int = 3  # Ranked application intents returned by POST /api/voice/intents
+    INTENT_MAX_LENGTH: int = 128  # Tokens per utterance (Banking77 fine-tuning length)
+    INTENT_MAX_BATCH_SIZE: int = 64  # Texts per forward pass
+    INTENT_BATCH_API_MAX_TEXTS: int = 256  # Texts accepted by POST /api/voice/intents
+    INTENT_BATCHING_ENABLED: bool = True  # Micro-batch concurrent intent requests
+    INTENT_BATCH_MAX_SIZE: int = 32
+    INTENT_BATCH_MAX_WAIT_MS: float = 5.0
+    INTENT_BATCH_MAX_QUEUE: int = 256
+    INTENT_MAX_LATENCY_MS: float = 250.0  # Answer with the rule-based classifier after this
+    INTENT_CASCADE_ENABLED: bool = True  # TF-IDF tier first; transformer only below CONFIDENCE_THRESHOLD
+    INTENT_CASCADE_AUDIT_RATE: float = 0.02  # Confident tier-one answers re-checked by the transformer
+    INTENT_CACHE_ENABLED: bool = True  # Cache model results by normalized text
+    INTENT_CACHE_SIZE: int = 4096  # LRU tier entries
+    INTENT_CACHE_TTL_SECONDS: float = 3600.0
+    INTENT_CACHE_SEED_LIMIT: int = 300  # Banking77 train utterances pre-computed at every load/reload (0 = all ~10k)
+    INTENT_CACHE_SEED_FILE: str = ""  # Frequent production phrases, one per line
+    INTENT_EARLY_EXIT_ENABLED: bool = False  # Needs early_exit_heads.pt (fine_tune_intent_model.py --early-exit)
+    INTENT_EARLY_EXIT_THRESHOLD: float = 0.9  # Label probability at which an intermediate head answers
+    INTENT_QUANTIZE_INT8: bool = False  # Dynamic int8 Linear layers (CPU only); onnx backend uses model.int8.onnx
     
     # TTS
     TTS_ENGINE: str = "gtts"  # gtts, pyttsx3, coqui
@@ -42,6 +125,7 @@ class Settings(BaseSettings):
     # Authentication
     OTP_EXPIRY_MINUTES: int = 5
     VOICE_PIN_ENABLED: bool = True
+    ADMIN_API_KEY: str = ""  # X-Admin-Key for /api/admin endpoints (empty disables them)
     
     # Gemini API
     GEMINI_API_KEY: str = ""
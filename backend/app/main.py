@@ -7,17 +7,34 @@ from fastapi.responses import JSONResponse
 import uvicorn
 from contextlib import asynccontextmanager
 
-from app.routers import auth, banking, voice
+from app.routers import admin, auth, banking, voice
 from app.core.config import settings
 from app.core.database import init_db
+from app.services.stt_scheduler import stt_scheduler
+from app.services.speech_to_text import stt_service
+from app.services.intent_scheduler import intent_scheduler
+from app.services.intent_recognition import get_intent_service
+from app.services.model_loading import FAILED, READY, UNAVAILABLE
+from app.services.long_audio import long_audio_transcriber
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize database and models on startup"""
     init_db()
+    # Models load in the background; requests are served (intents by the
+    # rule-based fallback) while they do
+    get_intent_service(background=True)
+    stt_service.loader.start()
+    if settings.STT_BATCHING_ENABLED:
+        stt_scheduler.start()
+    if settings.INTENT_BATCHING_ENABLED:
+        intent_scheduler.start()
     yield
     # Cleanup if needed
+    await stt_scheduler.stop()
+    await intent_scheduler.stop()
+    long_audio_transcriber.shutdown()
 
 
 app = FastAPI(
@@ -40,6 +57,7 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(banking.router, prefix="/api/banking", tags=["Banking"])
 app.include_router(voice.router, prefix="/api/voice", tags=["Voice"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/")
@@ -54,11 +72,22 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
+    """Detailed health check with per-model readiness and load time"""
+    models = {
+        "intent": get_intent_service(background=True).get_load_status(),
+        "whisper": stt_service.get_load_status(),
+    }
+    states = [model["state"] for model in models.values()]
+    if all(state in (READY, UNAVAILABLE) for state in states):
+        status = "healthy"
+    elif FAILED in states:
+        status = "degraded"
+    else:
+        status = "loading"
     return {
-        "status": "healthy",
+        "status": status,
         "database": "connected",
-        "models": "loaded"
+        "models": models
     }
 
 
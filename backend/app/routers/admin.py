@@ -0,0 +1,97 @@
+"""
+Operator endpoints, authenticated with the X-Admin-Key header
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import asyncio
+import hmac
+import logging
+
+from app.core.config import settings
+from app.services.intent_recognition import intent_service
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def require_admin_key(x_admin_key: str = Header(default="")):
+    """Reject requests without the configured ADMIN_API_KEY"""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Admin API is disabled (ADMIN_API_KEY is not set)"
+        )
+    if not hmac.compare_digest(x_admin_key.encode(), settings.ADMIN_API_KEY.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin key"
+        )
+
+
+class IntentExample(BaseModel):
+    text: str = Field(min_length=1)
+    label: str = Field(min_length=1)  # Application intent, Banking77 label or a new intent
+
+
+class IntentExamplesRequest(BaseModel):
+    examples: List[IntentExample] = Field(min_length=1)
+
+
+@router.post("/intent-examples")
+async def add_intent_examples(
+    request: IntentExamplesRequest,
+    _: None = Depends(require_admin_key)
+):
+    """Add labelled utterances to the kNN intent index; used by the next request"""
+    if len(request.examples) > settings.INTENT_BATCH_API_MAX_TEXTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.INTENT_BATCH_API_MAX_TEXTS} examples per request"
+        )
+    examples = [(example.text, example.label) for example in request.examples]
+    loop = asyncio.get_running_loop()
+    try:
+        stats = await loop.run_in_executor(None, intent_service.add_intent_examples, examples)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    logger.info(f"Added {len(examples)} intent examples ({stats['added_examples']} runtime examples in total)")
+    return {"added": len(examples), "index": stats}
+
+
+@router.get("/intent-examples")
+async def list_intent_examples(_: None = Depends(require_admin_key)):
+    """List the examples added at runtime"""
+    if intent_service.knn is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Intent examples are only available with INTENT_BACKEND=knn"
+        )
+    return {"examples": intent_service.knn.added_examples, "index": intent_service.knn.get_stats()}
+
+
+class IntentModelReloadRequest(BaseModel):
+    version: Optional[str] = None  # Registry version; default reloads the current one
+
+
+@router.get("/intent-model")
+async def get_intent_model(_: None = Depends(require_admin_key)):
+    """Serving intent model version, versions still draining and the registry contents"""
+    return {**intent_service.get_version_status(), "load": intent_service.get_load_status()}
+
+
+@router.post("/intent-model/reload")
+async def reload_intent_model(
+    request: IntentModelReloadRequest,
+    _: None = Depends(require_admin_key)
+):
+    """Load an intent model version beside the serving one and swap it in without downtime"""
+    loop = asyncio.get_running_loop()
+    try:
+        status_after = await loop.run_in_executor(None, intent_service.reload_model, request.version)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    logger.info(f"Intent model reloaded: {status_after['active']['version']}")
+    return status_after
@@ -4,16 +4,23 @@ Voice processing router
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+import asyncio
 import uuid
 import logging
 import base64
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.routers.auth import get_current_user
 from app.models.user import User
 from app.services.speech_to_text import stt_service
+from app.services.stt_scheduler import stt_scheduler
+from app.services.streaming_transcriber import StreamingTranscriber
+from app.services.batching import SchedulerOverloaded
+from app.services.vad import AudioTooLong, NoSpeechDetected
 from app.services.intent_recognition import intent_service
+from app.services.intent_scheduler import intent_scheduler
 from app.services.dialogue_manager import dialogue_manager
 from app.services.text_to_speech import tts_service
 from app.services.banking_service import banking_service
@@ -42,17 +49,44 @@ class VoiceResponse(BaseModel):
     session_id: str
 
 
+class IntentBatchRequest(BaseModel):
+    texts: List[str]
+
+
+class IntentScore(BaseModel):
+    intent: str
+    confidence: float
+
+
+class IntentResult(BaseModel):
+    text: str
+    intent: str
+    confidence: float
+    entities: dict
+    top_intents: List[IntentScore]  # INTENT_TOP_K application intents, most likely first
+
+
 @router.post("/transcribe")
 async def transcribe_audio(
     audio: UploadFile = File(...),
     language: Optional[str] = None,
+    model: Optional[str] = None,
+    profile: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     """Transcribe audio to text"""
     try:
         audio_bytes = await audio.read()
-        result = stt_service.transcribe_bytes(audio_bytes, language)
+        result = await stt_scheduler.transcribe_bytes(audio_bytes, language, model, profile)
         return result
+    except NoSpeechDetected as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except AudioTooLong as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SchedulerOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Transcription error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
@@ -71,7 +105,7 @@ async def process_voice_request(
     user_text = request.text
     
     # Step 1: Intent recognition
-    intent, confidence, entities = intent_service.recognize_intent(user_text)
+    intent, confidence, entities = await intent_scheduler.recognize_intent(user_text)
     
     # Step 2: Get user balance for context
     balance = banking_service.get_balance(db, current_user.id)
@@ -145,6 +179,43 @@ async def process_voice_request(
     )
 
 
+@router.post("/intents", response_model=List[IntentResult])
+async def recognize_intents(
+    request: IntentBatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Recognize intents for many utterances in batched forward passes"""
+    if len(request.texts) > settings.INTENT_BATCH_API_MAX_TEXTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.INTENT_BATCH_API_MAX_TEXTS} texts per request"
+        )
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, intent_service.rank_intents, request.texts)
+    return [
+        IntentResult(
+            text=text,
+            intent=intent,
+            confidence=confidence,
+            entities=entities,
+            top_intents=[IntentScore(intent=name, confidence=score) for name, score in ranked]
+        )
+        for text, (intent, confidence, entities, ranked) in zip(request.texts, results)
+    ]
+
+
+@router.get("/metrics")
+async def voice_metrics(current_user: User = Depends(get_current_user)):
+    """Voice pipeline performance metrics"""
+    return {
+        "stt": stt_service.get_stats(),
+        "stt_scheduler": stt_scheduler.get_stats(),
+        "intent": intent_service.get_stats(),
+        "intent_scheduler": intent_scheduler.get_stats(),
+        "language_pinning": dialogue_manager.language_stats
+    }
+
+
 @router.post("/synthesize")
 async def synthesize_speech(
     text: str,
@@ -173,6 +244,7 @@ async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)
     await websocket.accept()
     session_id = None
     current_user = None
+    stream = None
     
     try:
         # Receive authentication token
@@ -197,6 +269,7 @@ async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)
             return
         
         session_id = str(uuid.uuid4())
+        session = dialogue_manager.get_session(current_user.id, session_id)
         await websocket.send_json({
             "type": "connected",
             "session_id": session_id,
@@ -207,14 +280,105 @@ async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)
             # Receive audio or text
             data = await websocket.receive_json()
             
+            if data.get("language"):
+                dialogue_manager.set_language_preference(session, data["language"])
+            
             if data.get("type") == "audio":
                 # Process audio
                 audio_base64 = data.get("audio")
                 audio_bytes = base64.b64decode(audio_base64)
                 
                 # Transcribe
-                transcription = stt_service.transcribe_bytes(audio_bytes)
+                try:
+                    transcription = await stt_scheduler.transcribe_bytes(
+                        audio_bytes, dialogue_manager.stt_language(session), profile=data.get("profile")
+                    )
+                except NoSpeechDetected as e:
+                    await websocket.send_json({
+                        "type": "no_speech",
+                        "message": str(e)
+                    })
+                    continue
+                except ValueError as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": str(e)
+                    })
+                    continue
+                except SchedulerOverloaded as e:
+                    # Transient: the client may resend; the dialogue session stays open
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": str(e),
+                        "retryable": True
+                    })
+                    continue
+                dialogue_manager.observe_transcription(session, transcription)
+                user_text = transcription["text"]
+            elif data.get("type") in ("audio_chunk", "audio_end"):
+                # Streaming audio: buffer chunks, send partials, commit on trailing silence
+                if stream is None:
+                    try:
+                        stream = StreamingTranscriber(language=session.language, profile=data.get("profile"))
+                    except ValueError as e:
+                        await websocket.send_json({
+                            "type": "error",
+                            "message": str(e)
+                        })
+                        continue
+                
+                if data.get("type") == "audio_chunk":
+                    try:
+                        chunk = base64.b64decode(data.get("audio", ""))
+                        endpoint = stream.add_chunk(
+                            chunk,
+                            encoding=data.get("encoding", "pcm_s16le"),
+                            sample_rate=int(data.get("sample_rate", 16000))
+                        )
+                    except (TypeError, ValueError) as e:
+                        # Malformed chunk: report it and keep the stream and session
+                        await websocket.send_json({
+                            "type": "error",
+                            "message": str(e)
+                        })
+                        continue
+                    if not endpoint:
+                        if stream.partial_due():
+                            async def send_partial(result: dict):
+                                await websocket.send_json({
+                                    "type": "partial_transcript",
+                                    "text": result["text"]
+                                })
+                            stream.start_partial(send_partial)
+                        continue
+                
+                stream.language = dialogue_manager.stt_language(session)
+                try:
+                    transcription = await stream.commit()
+                except ValueError as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": str(e)
+                    })
+                    continue
+                except SchedulerOverloaded as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": str(e),
+                        "retryable": True
+                    })
+                    continue
+                finally:
+                    stream.language = session.language
+                dialogue_manager.observe_transcription(session, transcription)
                 user_text = transcription["text"]
+                await websocket.send_json({
+                    "type": "final_transcript",
+                    "text": user_text,
+                    "language": transcription.get("language")
+                })
+                if not user_text:
+                    continue
             elif data.get("type") == "text":
                 user_text = data.get("text", "")
             else:
@@ -222,7 +386,7 @@ async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)
             
             # Process request
             balance = banking_service.get_balance(db, current_user.id)
-            intent, confidence, entities = intent_service.recognize_intent(user_text)
+            intent, confidence, entities = await intent_scheduler.recognize_intent(user_text)
             response_text, action_data = dialogue_manager.process_intent(
                 user_id=current_user.id,
                 session_id=session_id,
@@ -330,4 +494,8 @@ async def websocket_endpoint(websocket: WebSocket, db: Session = Depends(get_db)
             })
         except:
             pass
+    finally:
+        # No partial transcript may outlive the connection
+        if stream is not None:
+            stream.cancel_partial()
 
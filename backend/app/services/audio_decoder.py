@@ -0,0 +1,262 @@
+"""
+In-memory audio decoding for the speech-to-text pipeline
+
+Turns uploaded audio bytes into the 16 kHz mono float32 array Whisper
+expects, without writing temp files or spawning an ffmpeg process per request.
+"""
+import io
+import os
+import tempfile
+import wave
+from typing import Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper operates on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except (ImportError, OSError):
+    SOUNDFILE_AVAILABLE = False
+    logger.warning("soundfile not available. Compressed audio will be decoded with PyAV or ffmpeg")
+
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    PYAV_AVAILABLE = False
+
+# Formats libsndfile can decode from memory
+SOUNDFILE_FORMATS = {"wav", "ogg", "flac", "mp3"}
+
+
+def detect_format(audio_bytes: bytes) -> Optional[str]:
+    """
+    Detect the container format of audio bytes from their magic numbers
+
+    Args:
+        audio_bytes: Raw audio file bytes
+
+    Returns:
+        Format name (e.g., 'wav', 'mp3') or None if unknown
+    """
+    header = audio_bytes[:12]
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0):
+        return "mp3"
+    if header[4:8] == b"ftyp":
+        return "m4a"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    return None
+
+
+def to_mono(audio: np.ndarray) -> np.ndarray:
+    """Downmix a (frames, channels) array to mono"""
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    return audio
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Resample mono audio with a windowed-sinc low-pass and linear interpolation
+
+    Args:
+        audio: Mono float32 samples
+        orig_sr: Source sample rate
+        target_sr: Target sample rate (default: 16 kHz)
+
+    Returns:
+        Resampled float32 samples
+    """
+    if orig_sr == target_sr or audio.size == 0:
+        return audio.astype(np.float32, copy=False)
+
+    kernel = lowpass_kernel(orig_sr, target_sr)
+    if kernel is not None:
+        audio = np.convolve(audio, kernel, mode="same")
+
+    n_out = int(round(len(audio) * target_sr / orig_sr))
+    positions = np.arange(n_out) * (orig_sr / target_sr)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def lowpass_kernel(orig_sr: int, target_sr: int) -> Optional[np.ndarray]:
+    """Windowed-sinc anti-aliasing filter at the new Nyquist frequency (None when not downsampling)"""
+    if target_sr >= orig_sr:
+        return None
+    cutoff = target_sr / orig_sr / 2
+    taps = np.arange(-32, 33)
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+    return kernel / kernel.sum()
+
+
+class StreamResampler:
+    """
+    Resample a chunked stream as one continuous signal
+
+    `resample` on each chunk would zero-pad the filter at every chunk edge
+    and round each chunk's length separately. This keeps the filter history
+    and the interpolation phase between chunks instead; output lags the
+    input by half the filter (2 ms at 16 kHz).
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int = SAMPLE_RATE):
+        """
+        Args:
+            orig_sr: Source sample rate
+            target_sr: Target sample rate (default: 16 kHz)
+        """
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self.step = orig_sr / target_sr
+        self.kernel = lowpass_kernel(orig_sr, target_sr)
+        self.half = len(self.kernel) // 2 if self.kernel is not None else 0
+        # Raw samples still needed, from absolute index _offset (zeros before the stream starts)
+        self._buffer = np.zeros(self.half, dtype=np.float32)
+        self._offset = -self.half
+        self._next = 0  # Index of the next output sample
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Resample the next chunk
+
+        Returns:
+            Output samples that are complete so far
+        """
+        if self.orig_sr == self.target_sr:
+            return audio.astype(np.float32, copy=False)
+        self._buffer = np.concatenate([self._buffer, audio.astype(np.float32, copy=False)])
+        if self.kernel is not None:
+            filtered = np.convolve(self._buffer, self.kernel, mode="valid")
+            first = self._offset + self.half  # Absolute index of filtered[0]
+        else:
+            filtered, first = self._buffer, self._offset
+        last = first + len(filtered) - 1
+        # Interpolating at position p needs filtered samples floor(p) and floor(p) + 1
+        end = int(np.floor((last - 1) / self.step)) + 1 if last >= 1 else 0
+        if end <= self._next:
+            return np.zeros(0, dtype=np.float32)
+        positions = np.arange(self._next, end) * self.step
+        out = np.interp(positions, first + np.arange(len(filtered)), filtered).astype(np.float32)
+        self._next = end
+
+        drop = int(np.floor(self._next * self.step)) - self.half - self._offset
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._offset += drop
+        return out
+
+
+class AudioDecoder:
+    """Decode audio bytes into 16 kHz mono float32 arrays in memory"""
+
+    def decode(self, audio_bytes: bytes) -> np.ndarray:
+        """
+        Decode audio bytes to a Whisper-ready array
+
+        Args:
+            audio_bytes: Audio file bytes (wav, mp3, m4a, ogg, ...)
+
+        Returns:
+            1-D float32 array sampled at 16 kHz
+        """
+        if not audio_bytes:
+            raise ValueError("Empty audio payload")
+
+        audio_format = detect_format(audio_bytes)
+
+        if audio_format == "wav":
+            try:
+                return self._decode_wav(audio_bytes)
+            except wave.Error:
+                # Float or extensible WAV - let libsndfile handle it
+                pass
+
+        if SOUNDFILE_AVAILABLE and audio_format in SOUNDFILE_FORMATS:
+            try:
+                return self._decode_soundfile(audio_bytes)
+            except Exception as e:
+                logger.debug(f"soundfile could not decode {audio_format}: {str(e)}")
+
+        if PYAV_AVAILABLE:
+            return self._decode_pyav(audio_bytes)
+
+        logger.debug(f"No in-memory decoder for format {audio_format}, falling back to ffmpeg")
+        return self._decode_ffmpeg(audio_bytes)
+
+    def _decode_wav(self, audio_bytes: bytes) -> np.ndarray:
+        """Decode integer PCM WAV natively"""
+        with wave.open(io.BytesIO(audio_bytes), "rb") as wav_file:
+            n_channels = wav_file.getnchannels()
+            sample_width = wav_file.getsampwidth()
+            sample_rate = wav_file.getframerate()
+            frames = wav_file.readframes(wav_file.getnframes())
+
+        if sample_width == 1:
+            audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif sample_width == 2:
+            audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+        elif sample_width == 3:
+            raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+            ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8)
+                    | (raw[:, 2].astype(np.int32) << 16))
+            ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+            audio = ints.astype(np.float32) / 8388608.0
+        elif sample_width == 4:
+            audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+        else:
+            raise wave.Error(f"Unsupported sample width: {sample_width}")
+
+        audio = to_mono(audio.reshape(-1, n_channels))
+        return resample(audio, sample_rate)
+
+    def _decode_soundfile(self, audio_bytes: bytes) -> np.ndarray:
+        """Decode with libsndfile (in-process)"""
+        audio, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+        return resample(to_mono(audio), sample_rate)
+
+    def _decode_pyav(self, audio_bytes: bytes) -> np.ndarray:
+        """Decode with the libav libraries linked into PyAV (in-process)"""
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+        chunks = []
+        with av.open(io.BytesIO(audio_bytes), mode="r") as container:
+            for frame in container.decode(audio=0):
+                frame.pts = None
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks).astype(np.float32, copy=False)
+
+    def _decode_ffmpeg(self, audio_bytes: bytes) -> np.ndarray:
+        """Last-resort decode through a temp file and Whisper's ffmpeg loader"""
+        import whisper
+
+        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
+            tmp_file.write(audio_bytes)
+            tmp_file_path = tmp_file.name
+
+        try:
+            return whisper.load_audio(tmp_file_path, sr=SAMPLE_RATE)
+        finally:
+            if os.path.exists(tmp_file_path):
+                os.remove(tmp_file_path)
+
+
+# Global instance
+audio_decoder = AudioDecoder()
@@ -0,0 +1,173 @@
+"""
+Asyncio micro-batching scheduler
+
+Collects requests that arrive within a short window and hands them to a
+batch function in a worker thread, resolving each caller's future with
+its own result.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when the scheduler queue is full"""
+
+
+class MicroBatchScheduler:
+    """Gather concurrent requests into batches for a blocking batch function"""
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_queue_size: int
+    ):
+        """
+        Args:
+            name: Scheduler name (used for logging and thread names)
+            batch_fn: Blocking function mapping a list of items to a list of results
+            max_batch_size: Maximum number of items per batch
+            max_wait_ms: Maximum time the oldest item waits for the batch to fill
+            max_queue_size: Maximum number of queued items before rejecting
+        """
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-batch")
+        self._stats = {
+            "requests": 0,
+            "rejected": 0,
+            "batches": 0,
+            "max_batch_size_seen": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms_seen": 0.0,
+            "total_batch_ms": 0.0,
+            "max_queue_depth_seen": 0,
+        }
+        self._batch_size_histogram: Dict[int, int] = {}
+
+    def start(self):
+        """Start the worker task on the running event loop"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"{self.name} scheduler started (batch={self.max_batch_size}, wait={self.max_wait_ms}ms)")
+
+    async def stop(self):
+        """Stop the worker task"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its result
+
+        Args:
+            item: Input passed to the batch function
+
+        Returns:
+            The batch function's result for this item
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future, time.monotonic()))
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            raise SchedulerOverloaded(f"{self.name} queue is full ({self.max_queue_size} pending)")
+
+        self._stats["requests"] += 1
+        self._stats["max_queue_depth_seen"] = max(self._stats["max_queue_depth_seen"], self._queue.qsize())
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        """Wait for the first item, then fill the batch until it is full or the window closes"""
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """Worker loop: collect a batch, run it off the event loop, resolve futures"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            self._record_batch(batch, started)
+            try:
+                results = await loop.run_in_executor(self._executor, self.batch_fn, [entry[0] for entry in batch])
+                for (_, future, _), result in zip(batch, results):
+                    if not future.done():
+                        if isinstance(result, Exception):
+                            future.set_exception(result)
+                        else:
+                            future.set_result(result)
+            except Exception as e:
+                logger.error(f"{self.name} batch failed: {str(e)}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self._stats["total_batch_ms"] += (time.monotonic() - started) * 1000
+
+    def _record_batch(self, batch: List[Tuple[Any, asyncio.Future, float]], started: float):
+        """Update batch size and wait-time metrics"""
+        size = len(batch)
+        self._stats["batches"] += 1
+        self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], size)
+        self._batch_size_histogram[size] = self._batch_size_histogram.get(size, 0) + 1
+        for _, _, enqueued in batch:
+            wait_ms = (started - enqueued) * 1000
+            self._stats["total_wait_ms"] += wait_ms
+            self._stats["max_wait_ms_seen"] = max(self._stats["max_wait_ms_seen"], wait_ms)
+
+    def get_stats(self) -> Dict:
+        """Return scheduler metrics"""
+        batches = self._stats["batches"]
+        batched_items = sum(size * count for size, count in self._batch_size_histogram.items())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "requests": self._stats["requests"],
+            "rejected": self._stats["rejected"],
+            "batches": batches,
+            "avg_batch_size": batched_items / batches if batches else 0.0,
+            "max_batch_size_seen": self._stats["max_batch_size_seen"],
+            "batch_size_histogram": dict(sorted(self._batch_size_histogram.items())),
+            "avg_wait_ms": self._stats["total_wait_ms"] / batched_items if batched_items else 0.0,
+            "max_wait_ms_seen": self._stats["max_wait_ms_seen"],
+            "avg_batch_ms": self._stats["total_batch_ms"] / batches if batches else 0.0,
+            "max_queue_depth_seen": self._stats["max_queue_depth_seen"],
+        }
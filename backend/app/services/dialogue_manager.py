@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 import uuid
 import difflib
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +24,8 @@ class DialogueState:
         self.history: List[Dict] = []
         self.requires_confirmation: bool = False
         self.requires_otp: bool = False
+        self.language: Optional[str] = None  # Pinned speech language for Whisper
+        self.language_source: Optional[str] = None  # "preference" or "detected"
     
     def add_to_history(self, user_text: str, intent: str, response: str):
         """Add interaction to history"""
@@ -44,6 +48,12 @@ class DialogueManager:
     
     def __init__(self):
         self.active_sessions: Dict[str, DialogueState] = {}
+        self.language_stats = {
+            "detections_run": 0,
+            "detections_skipped": 0,
+            "languages_pinned": 0,
+            "pins_released": 0,
+        }
     
     def get_session(self, user_id: int, session_id: Optional[str] = None) -> DialogueState:
         """Get or create dialogue session"""
@@ -57,6 +67,46 @@ class DialogueManager:
         self.active_sessions[session_id] = session
         return session
     
+    def set_language_preference(self, session: DialogueState, language: str):
+        """Pin the user's preferred language; it is never released on low confidence"""
+        session.language = language
+        session.language_source = "preference"
+    
+    def stt_language(self, session: DialogueState) -> Optional[str]:
+        """
+        Language to pass to Whisper for the next utterance
+        
+        Returns None (run language detection) until a language is pinned.
+        """
+        if session.language:
+            self.language_stats["detections_skipped"] += 1
+        else:
+            self.language_stats["detections_run"] += 1
+        return session.language
+    
+    def observe_transcription(self, session: DialogueState, transcription: Dict):
+        """
+        Pin the detected language after a confident utterance, or release a
+        detected pin when a transcription with it comes back unsure
+        """
+        segments = transcription.get("segments") or []
+        logprobs = [s["avg_logprob"] for s in segments if s.get("avg_logprob") is not None]
+        if not logprobs:
+            return
+        confident = sum(logprobs) / len(logprobs) >= settings.STT_LANGUAGE_PIN_MIN_LOGPROB
+        
+        if session.language is None:
+            if confident and transcription.get("language"):
+                session.language = transcription["language"]
+                session.language_source = "detected"
+                self.language_stats["languages_pinned"] += 1
+        elif session.language_source == "detected" and not confident:
+            # Possibly a language switch - detect again on the next utterance
+            logger.info(f"Releasing pinned language {session.language} for session {session.session_id}")
+            session.language = None
+            session.language_source = None
+            self.language_stats["pins_released"] += 1
+    
     def process_intent(
         self,
         user_id: int,
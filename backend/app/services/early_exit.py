@@ -0,0 +1,156 @@
+"""
+Layer-wise early exit for the intent transformer
+
+Lightweight classifier heads trained by scripts/fine_tune_intent_model.py
+(--early-exit) read the mean-pooled output of intermediate encoder layers.
+Forward hooks on those layers score each text as the forward pass runs;
+once every text in the batch has a head above the confidence threshold the
+pass is abandoned, so the remaining layers never execute. Texts that no
+head is sure about use the model's own classifier.
+"""
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+import logging
+
+import torch
+from torch import nn
+
+logger = logging.getLogger(__name__)
+
+EARLY_EXIT_FILE = "early_exit_heads.pt"
+
+
+def encoder_layers(model) -> Optional[nn.ModuleList]:
+    """Transformer blocks of a BERT/RoBERTa (encoder.layer) or DistilBERT (transformer.layer) model"""
+    base = model.base_model
+    for container in ("encoder", "transformer"):
+        layers = getattr(getattr(base, container, None), "layer", None)
+        if isinstance(layers, nn.ModuleList):
+            return layers
+    return None
+
+
+def mean_pool(hidden: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    """Average token states over the attention mask (must match the training script)"""
+    mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+    return (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+
+
+class _ExitReached(Exception):
+    """Raised from a hook to abandon the forward pass once the batch is decided"""
+
+
+class EarlyExitClassifier:
+    """Run a sequence classifier, stopping at the first confident exit head"""
+
+    def __init__(self, model, checkpoint_path: str, threshold: float, device: str):
+        """
+        Args:
+            model: Fine-tuned sequence classification model (already on device)
+            checkpoint_path: early_exit_heads.pt written by the training script
+            threshold: Max label probability at which a head answers
+            device: Device of the model
+        """
+        layers = encoder_layers(model)
+        if layers is None:
+            raise ValueError(f"Early exit is not supported for {type(model).__name__}")
+        checkpoint = torch.load(checkpoint_path, map_location=device)
+        if checkpoint["num_layers"] != len(layers):
+            raise ValueError(
+                f"Exit heads were trained for {checkpoint['num_layers']} layers, model has {len(layers)}"
+            )
+
+        self.model = model
+        self.threshold = threshold
+        self.num_layers = len(layers)
+        self.exit_layers: List[int] = sorted(checkpoint["exit_layers"])
+        self.heads = nn.ModuleDict()
+        for layer in self.exit_layers:
+            head = nn.Linear(checkpoint["hidden_size"], checkpoint["num_labels"])
+            head.load_state_dict(checkpoint["heads"][str(layer)])
+            self.heads[str(layer)] = head
+        self.heads.to(device).eval()
+
+        # Hooks stay registered; they only act while this thread is inside logits()
+        self._local = threading.local()
+        self._hooks = [
+            layers[layer - 1].register_forward_hook(self._make_hook(layer)) for layer in self.exit_layers
+        ]
+        self._lock = threading.Lock()
+        self._histogram: Counter = Counter()
+
+    def _make_hook(self, layer: int):
+        head = self.heads[str(layer)]
+
+        def hook(module, args, output):
+            state = getattr(self._local, "state", None)
+            if state is None:
+                return
+            hidden = output[0] if isinstance(output, (tuple, list)) else output
+            logits = head(mean_pool(hidden, state["attention_mask"]))
+            confident = state["pending"] & (torch.softmax(logits, dim=-1).max(dim=-1).values >= self.threshold)
+            if confident.any():
+                state["logits"][confident] = logits[confident].to(state["logits"].dtype)
+                state["exit_layer"][confident] = layer
+                state["pending"] &= ~confident
+                if not state["pending"].any():
+                    raise _ExitReached()
+
+        return hook
+
+    def logits(self, inputs) -> torch.Tensor:
+        """
+        Classify a tokenized batch, exiting early where a head is confident
+
+        Args:
+            inputs: Tokenizer output (input_ids, attention_mask, ...) on the model device
+
+        Returns:
+            (batch, num_labels) logits from the exit head or the final classifier
+        """
+        batch = inputs["input_ids"].shape[0]
+        device = inputs["input_ids"].device
+        state = {
+            "attention_mask": inputs["attention_mask"],
+            "pending": torch.ones(batch, dtype=torch.bool, device=device),
+            "logits": torch.zeros(batch, self.model.config.num_labels, device=device),
+            "exit_layer": torch.full((batch,), self.num_layers, dtype=torch.long, device=device),
+        }
+        self._local.state = state
+        try:
+            with torch.no_grad():
+                final = self.model(**inputs).logits
+            state["logits"][state["pending"]] = final[state["pending"]].float()
+        except _ExitReached:
+            pass
+        finally:
+            self._local.state = None
+
+        with self._lock:
+            self._histogram.update(state["exit_layer"].tolist())
+        return state["logits"]
+
+    def reset_stats(self):
+        """Clear the exit histogram (e.g. after warm-up traffic)"""
+        with self._lock:
+            self._histogram.clear()
+
+    def close(self):
+        """Remove the forward hooks from the model"""
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+
+    def get_stats(self) -> Dict:
+        """Return the per-layer exit histogram and average layers run"""
+        with self._lock:
+            histogram = dict(sorted(self._histogram.items()))
+        total = sum(histogram.values())
+        return {
+            "threshold": self.threshold,
+            "exit_layers": self.exit_layers,
+            "num_layers": self.num_layers,
+            "histogram": histogram,
+            "avg_layers": round(sum(layer * n for layer, n in histogram.items()) / total, 2) if total else None,
+        }
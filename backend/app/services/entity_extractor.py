@@ -0,0 +1,150 @@
+"""
+Precompiled entity extraction for recognized intents
+
+Patterns are compiled once, the text is lowercased once, and each pattern
+only runs when a cheap cue check shows it can match (no digits means no
+amount or account number; no currency word means no currency amount).
+Intent-specific entities are dispatched from a table instead of a chain of
+`if intent == ...` blocks. Outputs match the original per-call
+`re.search` implementation exactly, including its quirks.
+"""
+import re
+from typing import Callable, Dict, List
+
+_NUMBER = r"(\d+(?:,\d{3})*(?:\.\d{2})?)"
+_CURRENCY = r"(?:₹|rs\.?|rupees?)"
+
+# Tried in order; the first pattern that matches anywhere wins
+AMOUNT_PATTERNS = [
+    re.compile(_CURRENCY + r"\s*" + _NUMBER, re.IGNORECASE),
+    re.compile(_NUMBER + r"\s*" + _CURRENCY, re.IGNORECASE),
+    re.compile(r"amount\s*(?:of\s*)?" + _CURRENCY + r"?\s*" + _NUMBER, re.IGNORECASE),
+]
+# Cues without which the first two (currency) and the third ("amount") patterns cannot match
+CURRENCY_CUE = re.compile(r"₹|rs|rupee", re.IGNORECASE)
+AMOUNT_CUE = re.compile(r"amount", re.IGNORECASE)
+DIGIT = re.compile(r"\d")
+
+# "to Name" / "for Name". IGNORECASE makes [A-Z][a-z]+ match any word, so
+# every following word is captured; kept as-is for compatibility. The old
+# second pattern, r"transfer.*?to\s+(...)", can only match where this one
+# already does, so it is not needed.
+RECIPIENT_PATTERN = re.compile(r"(?:to|for)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", re.IGNORECASE)
+
+CATEGORY_PATTERNS = [
+    re.compile(r"(?:spent|spend|expenses?)\s+(?:on|for)\s+(\w+)", re.IGNORECASE),
+    re.compile(r"(\w+)\s+(?:spending|expenses?)", re.IGNORECASE),
+]
+
+# Equivalent to r"(?:account\s*)?(?:number\s*)?(\d{4,16})": the optional
+# prefixes are non-capturing, so the captured digits are always the first
+# run of 4+ digits (truncated to 16)
+ACCOUNT_NUMBER_PATTERN = re.compile(r"\d{4,16}")
+
+PERIODS = [
+    (("last month", "past month"), "last_month"),
+    (("last week", "past week"), "last_week"),
+    (("last year", "past year"), "last_year"),
+    (("this month",), "month"),
+    (("this week",), "week"),
+]
+
+BILL_TYPES = ["electricity", "phone", "water", "internet", "gas"]
+
+
+def _extract_recipient(text: str, lowered: str, entities: Dict):
+    match = RECIPIENT_PATTERN.search(text)
+    if match:
+        entities["recipient_name"] = match.group(1)
+
+
+def _extract_category(text: str, lowered: str, entities: Dict):
+    for pattern in CATEGORY_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            entities["category"] = match.group(1).lower()
+            break
+
+
+def _extract_period(text: str, lowered: str, entities: Dict):
+    for phrases, period in PERIODS:
+        if any(phrase in lowered for phrase in phrases):
+            entities["period"] = period
+            break
+
+
+def _extract_bill_type(text: str, lowered: str, entities: Dict):
+    for bill_type in BILL_TYPES:
+        if bill_type in lowered:
+            entities["bill_type"] = bill_type
+            break
+
+
+def _extract_card(text: str, lowered: str, entities: Dict):
+    # "block" is checked first, so "unblock" also reports "block"
+    if "block" in lowered:
+        entities["action"] = "block"
+    elif "unblock" in lowered:
+        entities["action"] = "unblock"
+    elif "limit" in lowered:
+        entities["action"] = "set_limit"
+
+    if "debit" in lowered:
+        entities["card_type"] = "debit"
+    elif "credit" in lowered:
+        entities["card_type"] = "credit"
+
+
+# Intent -> extractors, in the order their entities are added
+INTENT_EXTRACTORS: Dict[str, List[Callable[[str, str, Dict], None]]] = {
+    "transfer_funds": [_extract_recipient],
+    "category_spending": [_extract_category, _extract_period],
+    "spending_summary": [_extract_period],
+    "setup_auto_pay": [_extract_bill_type],
+    "manage_card": [_extract_card],
+}
+
+
+class EntityExtractor:
+    """Extract banking entities (amount, recipient, period, ...) for an intent"""
+
+    def extract(self, text: str, intent: str) -> Dict:
+        """
+        Extract entities from text based on intent
+
+        Args:
+            text: User input text
+            intent: Detected intent
+
+        Returns:
+            Dictionary with extracted entities
+        """
+        entities = {}
+        has_digit = DIGIT.search(text) is not None
+
+        if has_digit:
+            candidates = AMOUNT_PATTERNS[:2] if CURRENCY_CUE.search(text) else []
+            if AMOUNT_CUE.search(text):
+                candidates.append(AMOUNT_PATTERNS[2])
+            for pattern in candidates:
+                match = pattern.search(text)
+                if match:
+                    entities["amount"] = float(match.group(1).replace(",", ""))
+                    break
+
+        extractors = INTENT_EXTRACTORS.get(intent)
+        if extractors:
+            lowered = text.lower()
+            for extractor in extractors:
+                extractor(text, lowered, entities)
+
+        if has_digit:
+            match = ACCOUNT_NUMBER_PATTERN.search(text)
+            if match:
+                entities["account_number"] = match.group(0)
+
+        return entities
+
+
+# Global instance
+entity_extractor = EntityExtractor()
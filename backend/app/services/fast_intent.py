@@ -0,0 +1,194 @@
+"""
+Tier-one intent classifier for the confidence-gated cascade
+
+A linear model over word TF-IDF features plus compiled keyword-hit
+features, trained on banking77_train.csv at startup. It answers confident
+requests in well under a millisecond; the intent service escalates the
+rest to the transformer.
+"""
+import csv
+import re
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import SGDClassifier
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+    logger.warning("scikit-learn not available. Intent cascade disabled.")
+
+
+class FastIntentClassifier:
+    """TF-IDF + keyword linear classifier over Banking77 labels"""
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        """
+        Args:
+            keywords: Application intent -> keyword phrases; each intent's
+                keywords become one binary feature
+        """
+        self.keyword_patterns = [
+            re.compile(r"\b(?:" + "|".join(re.escape(k) for k in sorted(phrases, key=len, reverse=True)) + r")\b")
+            for phrases in keywords.values()
+        ]
+        self.vectorizer = None
+        self.analyzer = None
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = None
+        self.weights = None  # (TF-IDF features, labels) float32
+        self.keyword_weights = None  # (keyword features, labels) float32
+        self.bias = None
+        self.labels: List[str] = []
+        # (application intents, (labels, intents) one-hot summing label probabilities per intent),
+        # replaced as one tuple so rank() never pairs intents with another mapping's columns
+        self.intent_mapping: Tuple[List[str], object] = ([], None)
+
+    def _features(self, texts: List[str]):
+        """TF-IDF features with one keyword-hit column per application intent"""
+        tfidf = self.vectorizer.transform(texts)
+        hits = np.array(
+            [[1.0 if pattern.search(text.lower()) else 0.0 for pattern in self.keyword_patterns] for text in texts],
+            dtype=np.float32
+        )
+        return sparse.hstack([tfidf, sparse.csr_matrix(hits)], format="csr")
+
+    def train_from_csv(self, path: str):
+        """
+        Fit on a Banking77 CSV with text and label_text columns
+
+        Args:
+            path: banking77_train.csv
+        """
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        texts = [row["text"] for row in rows]
+        labels = [row["label_text"] for row in rows]
+
+        started = time.perf_counter()
+        self.vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, dtype=np.float32)
+        self.vectorizer.fit(texts)
+        classifier = SGDClassifier(loss="log_loss", alpha=1e-5, max_iter=50, random_state=0)
+        classifier.fit(self._features(texts), labels)
+
+        # Keep only the weights: scoring gathers the rows of the few terms in
+        # each text instead of going through sklearn's transform/predict_proba
+        coef = np.ascontiguousarray(classifier.coef_.T, dtype=np.float32)
+        n_terms = len(self.vectorizer.vocabulary_)
+        self.weights, self.keyword_weights = coef[:n_terms], coef[n_terms:]
+        self.bias = classifier.intercept_.astype(np.float32)
+        self.labels = list(classifier.classes_)
+        self.analyzer = self.vectorizer.build_analyzer()
+        self.vocabulary = self.vectorizer.vocabulary_
+        self.idf = self.vectorizer.idf_.astype(np.float32)
+        logger.info(f"Trained tier-one intent classifier on {len(texts)} utterances "
+                    f"in {time.perf_counter() - started:.1f}s")
+
+    def set_intent_mapping(self, label_intent: Callable[[str], str]):
+        """
+        Map Banking77 labels to application intents
+
+        Args:
+            label_intent: Banking77 label text -> application intent
+        """
+        mapped = [label_intent(label) for label in self.labels]
+        intents = sorted(set(mapped))
+        one_hot = np.zeros((len(self.labels), len(intents)), dtype=np.float32)
+        for row, intent in enumerate(mapped):
+            one_hot[row, intents.index(intent)] = 1.0
+        self.intent_mapping = (intents, one_hot)
+
+    def _scores(self, texts: List[str]):
+        """Linear scores, equal to `_features(texts) @ coef + bias`"""
+        scores = np.tile(self.bias, (len(texts), 1))
+        for row, text in enumerate(texts):
+            counts = Counter(
+                index for index in map(self.vocabulary.get, self.analyzer(text)) if index is not None
+            )
+            if counts:
+                indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                # Sublinear TF times IDF, L2-normalized, as TfidfVectorizer computes it
+                values = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))))
+                values *= self.idf[indices]
+                values /= np.sqrt(np.dot(values, values))
+                scores[row] += values @ self.weights[indices]
+            lowered = text.lower()
+            for column, pattern in enumerate(self.keyword_patterns):
+                if pattern.search(lowered):
+                    scores[row] += self.keyword_weights[column]
+        return scores
+
+    def rank(self, texts: List[str], k: int = 3) -> List[List[Tuple[str, float]]]:
+        """
+        Rank application intents for each text
+
+        Confidence is the summed probability of all Banking77 labels that
+        map to an intent.
+
+        Args:
+            texts: User input texts
+            k: Intents returned per text
+
+        Returns:
+            Per text, up to k (intent, confidence) pairs, most likely first
+        """
+        intents, label_to_intent = self.intent_mapping
+        scores = self._scores(texts)
+        # One-vs-rest log-loss probabilities, normalized across labels
+        probabilities = 1.0 / (1.0 + np.exp(-scores))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        intent_probabilities = probabilities @ label_to_intent
+        top = np.argsort(-intent_probabilities, axis=1)[:, :k]
+        return [
+            [(intents[column], float(intent_probabilities[row, column])) for column in columns]
+            for row, columns in enumerate(top)
+        ]
+
+    def classify(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Most likely (intent, confidence) per text"""
+        return [ranked[0] for ranked in self.rank(texts, k=1)]
+
+
+class CascadeStats:
+    """Thread-safe escalation and agreement counters for the intent cascade"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {
+            "tier_one": 0,  # Answered by the tier-one classifier
+            "escalated": 0,  # Below CONFIDENCE_THRESHOLD, sent to the transformer
+            "escalated_agree": 0,
+            "audited": 0,  # Confident, but also sent to the transformer to measure agreement
+            "audited_agree": 0,
+        }
+
+    def record(self, answered: int = 0, escalated: int = 0, escalated_agree: int = 0,
+               audited: int = 0, audited_agree: int = 0):
+        with self._lock:
+            self._counts["tier_one"] += answered
+            self._counts["escalated"] += escalated
+            self._counts["escalated_agree"] += escalated_agree
+            self._counts["audited"] += audited
+            self._counts["audited_agree"] += audited_agree
+
+    def get_stats(self) -> Dict:
+        """Return counts plus escalation rate and tier-one/transformer agreement"""
+        with self._lock:
+            stats = dict(self._counts)
+        total = stats["tier_one"] + stats["escalated"] + stats["audited"]
+        stats["escalation_rate"] = round(stats["escalated"] / total, 4) if total else 0.0
+        stats["agreement_escalated"] = (
+            round(stats["escalated_agree"] / stats["escalated"], 4) if stats["escalated"] else None
+        )
+        stats["agreement_confident"] = (
+            round(stats["audited_agree"] / stats["audited"], 4) if stats["audited"] else None
+        )
+        return stats
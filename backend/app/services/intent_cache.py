@@ -0,0 +1,198 @@
+"""
+Two-tier cache of intent classifications
+
+Voice users repeat a small set of phrases, so model results are cached by
+normalized text. The first tier is a static table pre-computed when the
+model loads (Banking77 training utterances plus frequent production
+phrases); the second is a bounded LRU with a TTL for everything else.
+Only the ranked (intent, confidence) list is cached: entities depend on the
+exact text and are always extracted per request.
+"""
+import csv
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Phrases that dominate production traffic, seeded alongside the train set
+FREQUENT_PHRASES = [
+    "what's my balance",
+    "what is my balance",
+    "check my balance",
+    "show my balance",
+    "show my transactions",
+    "show my recent transactions",
+    "transaction history",
+    "how much did I spend this month",
+    "show my spending summary",
+    "show my notifications",
+    "block my card",
+    "unblock my card",
+    "what is my credit limit",
+    "what is the interest rate",
+    "request a cheque book",
+    "hello",
+    "hi",
+    "thank you",
+    "goodbye",
+]
+
+TRAIN_SET_PATHS = [
+    "./banking77data/banking77_train.csv",
+    "../banking77data/banking77_train.csv",
+    os.path.join(os.path.dirname(__file__), "../../../banking77data/banking77_train.csv"),
+]
+
+
+def normalize(text: str) -> str:
+    """Cache key: lowercase, punctuation stripped, whitespace collapsed"""
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+def find_train_set() -> Optional[str]:
+    """Locate banking77_train.csv relative to the working directory or the repo"""
+    for path in TRAIN_SET_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_seed_phrases(seed_file: str = "", limit: int = 0) -> List[str]:
+    """
+    Collect the phrases pre-computed into the static tier
+
+    Args:
+        seed_file: Optional file of production phrases, one per line
+        limit: Maximum Banking77 training utterances, spread evenly over
+            the label-sorted file (0 = all)
+
+    Returns:
+        Phrases in seeding order (production phrases first)
+    """
+    phrases = list(FREQUENT_PHRASES)
+    if seed_file and os.path.exists(seed_file):
+        with open(seed_file, "r", encoding="utf-8") as f:
+            phrases.extend(line.strip() for line in f if line.strip())
+
+    path = find_train_set()
+    if path is not None:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            texts = [row["text"] for row in csv.DictReader(f)]
+        if limit and len(texts) > limit:
+            texts = [texts[i * len(texts) // limit] for i in range(limit)]
+        phrases.extend(texts)
+    return phrases
+
+
+class IntentCache:
+    """Static table plus TTL-bounded LRU, keyed by normalized text"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        """
+        Args:
+            max_size: LRU tier capacity
+            ttl_seconds: Lifetime of LRU entries
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._static: Dict[str, List[Tuple[str, float]]] = {}
+        self._lru: "OrderedDict[str, Tuple[List[Tuple[str, float]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._static_generation = 0  # Generation of the last model change; seeds from older models are refused
+        self._stats = {"static_hits": 0, "lru_hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    @property
+    def generation(self) -> int:
+        """Model generation; results computed under an older one are not stored"""
+        return self._generation
+
+    def get(self, text: str) -> Optional[List[Tuple[str, float]]]:
+        """
+        Look up a cached classification
+
+        Returns:
+            Ranked (intent, confidence) pairs, or None on a miss
+        """
+        key = normalize(text)
+        with self._lock:
+            result = self._static.get(key)
+            if result is not None:
+                self._stats["static_hits"] += 1
+                return result
+
+            entry = self._lru.get(key)
+            if entry is not None:
+                ranked, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._lru.move_to_end(key)
+                    self._stats["lru_hits"] += 1
+                    return ranked
+                del self._lru[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, text: str, ranked: List[Tuple[str, float]], generation: int):
+        """
+        Store a model result in the LRU tier
+
+        Args:
+            ranked: (intent, confidence) pairs, most likely first
+            generation: Value of `generation` when classification started
+        """
+        key = normalize(text)
+        with self._lock:
+            if generation != self._generation or key in self._static:
+                return
+            self._lru[key] = (ranked, time.monotonic() + self.ttl_seconds)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def seed(self, texts: Iterable[str], results: Iterable[List[Tuple[str, float]]], generation: int):
+        """Fill the static tier with pre-computed ranked results"""
+        table = {normalize(text): result for text, result in zip(texts, results)}
+        with self._lock:
+            if generation >= self._static_generation:
+                self._static.update(table)
+
+    def invalidate(self):
+        """Drop both tiers; called whenever the model changes"""
+        with self._lock:
+            self._generation += 1
+            self._static_generation = self._generation
+            self._static.clear()
+            self._lru.clear()
+
+    def invalidate_lru(self, texts: Iterable[str] = ()):
+        """
+        Drop the LRU tier but keep the static one; called when examples are added
+
+        Args:
+            texts: Phrases whose static entries are dropped too
+        """
+        keys = [normalize(text) for text in texts]
+        with self._lock:
+            self._generation += 1
+            self._lru.clear()
+            for key in keys:
+                self._static.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        """Return hit ratios and tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["static_size"] = len(self._static)
+            stats["lru_size"] = len(self._lru)
+        lookups = stats["static_hits"] + stats["lru_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["static_hits"] + stats["lru_hits"]) / lookups, 4) if lookups else 0.0
+        stats["static_hit_ratio"] = round(stats["static_hits"] / lookups, 4) if lookups else 0.0
+        stats["lru_hit_ratio"] = round(stats["lru_hits"] / lookups, 4) if lookups else 0.0
+        return stats
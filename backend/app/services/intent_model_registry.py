@@ -0,0 +1,156 @@
+"""
+Versioned intent model registry
+
+Layout (written by scripts/publish_intent_model.py):
+
+    models/intent-registry/
+        ACTIVE              name of the version to serve
+        v1/                 a complete model directory (config, weights,
+            manifest.json   tokenizer, intent/label mappings, onnx/, ...)
+        v2/
+            ...
+
+A version is complete once its manifest.json exists (it is written last),
+and the manifest lists a SHA-256 per file so a half-copied version is never
+loaded. ACTIVE is replaced atomically; every worker polls it, so activating
+a version (or rolling back) reloads the whole deployment without a restart.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FILE = "ACTIVE"
+MANIFEST_FILE = "manifest.json"
+VERSION_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def resolve_registry_dir(path: str) -> str:
+    """Find the registry relative to the working directory or the backend, like the model paths"""
+    candidates = [path, os.path.join("..", path), os.path.join(os.path.dirname(__file__), "../..", path)]
+    return next((candidate for candidate in candidates if os.path.isdir(candidate)), path)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IntentModelRegistry:
+    """Read versions, manifests and the ACTIVE pointer of a registry directory"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def version_dir(self, version: str) -> str:
+        """
+        Directory of a published version
+
+        Raises:
+            ValueError: Invalid name, or no complete version with that name
+        """
+        if not VERSION_NAME.match(version):
+            raise ValueError(f"Invalid model version name: {version!r}")
+        path = os.path.join(self.root, version)
+        if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            raise ValueError(f"Model version {version!r} is not published in {self.root}")
+        return path
+
+    def manifest(self, version: str) -> Dict:
+        with open(os.path.join(self.version_dir(version), MANIFEST_FILE), "r") as f:
+            return json.load(f)
+
+    def versions(self) -> List[Dict]:
+        """Manifests of all complete versions, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        manifests = []
+        for name in os.listdir(self.root):
+            if VERSION_NAME.match(name) and os.path.exists(os.path.join(self.root, name, MANIFEST_FILE)):
+                try:
+                    manifests.append(self.manifest(name))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Unreadable manifest for model version {name}: {e}")
+        return sorted(manifests, key=lambda manifest: manifest.get("created_at", ""))
+
+    def active_version(self) -> Optional[str]:
+        """Version named by ACTIVE, or None if nothing is published"""
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE), "r") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def activate(self, version: str):
+        """Point ACTIVE at a published version (atomic rename)"""
+        self.version_dir(version)
+        tmp_path = os.path.join(self.root, f".{ACTIVE_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp_path, os.path.join(self.root, ACTIVE_FILE))
+        logger.info(f"Activated intent model version {version}")
+
+    def verify(self, version: str):
+        """
+        Check every file listed in the manifest against its SHA-256
+
+        Raises:
+            ValueError: A file is missing or its checksum differs
+        """
+        path = self.version_dir(version)
+        for name, entry in self.manifest(version).get("files", {}).items():
+            file_path = os.path.join(path, name)
+            if not os.path.exists(file_path):
+                raise ValueError(f"Model version {version}: {name} is missing")
+            if file_sha256(file_path) != entry["sha256"]:
+                raise ValueError(f"Model version {version}: {name} does not match its manifest checksum")
+
+
+class RegistryWatcher:
+    """Poll ACTIVE and call back when it names a different version"""
+
+    def __init__(self, registry: IntentModelRegistry, on_change: Callable[[str], None], interval: float,
+                 last_seen: Optional[str] = None):
+        """
+        Args:
+            registry: Registry to watch
+            on_change: Called with the new version name (on the watcher thread)
+            interval: Seconds between polls
+            last_seen: Version already loaded (default: the current ACTIVE)
+        """
+        self.registry = registry
+        self.on_change = on_change
+        self.interval = interval
+        self.last_seen: Optional[str] = last_seen or registry.active_version()
+        self.lock = threading.Lock()  # Held while ACTIVE is compared with last_seen, and by in-process activations
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="intent-registry-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self.lock:
+                version = self.registry.active_version()
+                if version is None or version == self.last_seen:
+                    continue
+                self.last_seen = version
+            logger.info(f"Intent model registry now points at {version}; reloading")
+            try:
+                self.on_change(version)
+            except Exception as e:
+                logger.error(f"Reload of intent model version {version} failed: {e}")
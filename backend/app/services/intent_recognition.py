@@ -2,9 +2,22 @@
 Intent Recognition service using BERT-based models
 """
 from typing import Dict, List, Optional, Tuple
+import contextlib
+import gc
+import json
 import logging
-import re
 import os
+import random
+import threading
+import time
+from app.core.config import settings
+from app.services.entity_extractor import entity_extractor
+from app.services.fast_intent import SKLEARN_AVAILABLE, CascadeStats, FastIntentClassifier
+from app.services.intent_cache import FREQUENT_PHRASES, IntentCache, find_train_set, load_seed_phrases, normalize
+from app.services.intent_model_registry import IntentModelRegistry, RegistryWatcher, resolve_registry_dir
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.model_loading import BackgroundLoader
+from app.services.quantization import can_quantize, quantize_dynamic_int8
 
 logger = logging.getLogger(__name__)
 
@@ -12,11 +25,23 @@ try:
     from transformers import AutoTokenizer, AutoModelForSequenceClassification
     import torch
     import numpy as np
+    from app.services.early_exit import EARLY_EXIT_FILE, EarlyExitClassifier
+    from app.services.knn_intent import INFO_FILE as KNN_INFO_FILE, KnnIntentIndex, SentenceEncoder
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
     logger.warning("Transformers not available. Using rule-based fallback only.")
 
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# ONNX exports written by scripts/export_intent_onnx.py, inside the model directory
+ONNX_MODEL_FILE = os.path.join("onnx", "model.onnx")
+ONNX_INT8_MODEL_FILE = os.path.join("onnx", "model.int8.onnx")
+
 # Banking intents mapping
 BANKING_INTENTS = {
     "check_balance": 0,
@@ -41,6 +66,9 @@ BANKING_INTENTS = {
 
 REVERSE_INTENTS = {v: k for k, v in BANKING_INTENTS.items()}
 
+# Application intents with probabilities, most likely first
+RankedIntents = List[Tuple[str, float]]
+
 # Intent keywords for rule-based fallback
 INTENT_KEYWORDS = {
     "check_balance": ["balance", "account balance", "how much", "money in account"],
@@ -60,27 +88,241 @@ INTENT_KEYWORDS = {
     "manage_card": ["block card", "unblock card", "card limit", "card settings"]
 }
 
+GREETINGS = ["hello", "hi", "hey", "good morning", "good afternoon"]
 
-class IntentRecognitionService:
-    """Service for recognizing user intent from text"""
+# Keyword intents in priority order, greetings only when nothing else matches
+RULE_MATCHER = KeywordMatcher(list(INTENT_KEYWORDS.items()) + [("greeting", GREETINGS)])
+
+# Intents the rule-based fallback can answer
+RULE_INTENTS = frozenset(INTENT_KEYWORDS) | {"greeting"}
+
+
+class IntentModelVersion:
+    """A loaded intent model and the mappings it was trained with, swapped in as one unit"""
     
-    def __init__(self):
+    def __init__(self, name: str, path: Optional[str], manifest: Optional[Dict] = None):
+        """
+        Args:
+            name: Registry version, or "local"/"base"/"knn" outside the registry
+            path: Model directory it was loaded from
+            manifest: Registry manifest, if the version is published
+        """
+        self.name = name
+        self.path = path
+        self.manifest = manifest
         self.tokenizer = None
         self.model = None
-        self.device = "cpu"
+        self.onnx_session = None  # ONNX Runtime session when INTENT_BACKEND is "onnx"
+        self.onnx_inputs = []
+        self.early_exit = None  # Intermediate-layer exit heads, when trained and enabled
+        self.knn = None  # Embedding nearest-neighbour index when INTENT_BACKEND is "knn"
         self.banking77_mapping = {}  # Mapping from Banking77 labels to app intents
         self.label_to_text = {}  # Mapping from label index to label text
+        self.app_intents: List[str] = []  # Columns of the aggregated probabilities
+        self.label_intent_index = None  # Model label -> app_intents column, for scatter-add
+        self.quantization = None  # Memory saved by int8 quantization, when enabled
+        self.load_seconds = None
+        self.in_flight = 0  # Requests using this version (guarded by the service's version lock)
+        self.retired = False  # Replaced; released once in_flight reaches 0
+    
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None or self.onnx_session is not None or self.knn is not None
+    
+    def release(self):
+        """Drop the weights (and early-exit hooks) of a drained version"""
+        if self.early_exit is not None:
+            self.early_exit.close()
+        self.early_exit = None
+        self.model = None
+        self.onnx_session = None
+        self.knn = None
+        self.tokenizer = None
+        self.label_intent_index = None
+        gc.collect()
+        if TRANSFORMERS_AVAILABLE and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info(f"Released intent model version {self.name}")
+    
+    def get_status(self) -> Dict:
+        return {
+            "version": self.name,
+            "path": self.path,
+            "created_at": (self.manifest or {}).get("created_at"),
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+            "in_flight": self.in_flight,
+        }
+
+
+class IntentRecognitionService:
+    """Service for recognizing user intent from text"""
+    
+    def __init__(self, load_in_background: bool = False):
+        """
+        Args:
+            load_in_background: Load models on a background thread, answering
+                with rule-based intents until they are ready
+        """
+        self.device = "cpu"
+        self._active: Optional[IntentModelVersion] = None  # Version answering requests
+        self._draining: List[IntentModelVersion] = []  # Replaced versions with requests in flight
+        self._version_lock = threading.Lock()
+        self._reload_lock = threading.Lock()  # One load at a time
+        self.registry = IntentModelRegistry(resolve_registry_dir(settings.INTENT_MODEL_REGISTRY_DIR))
+        self.registry_watcher = None
+        self.cache = None  # Model results by normalized text
+        if settings.INTENT_CACHE_ENABLED:
+            self.cache = IntentCache(settings.INTENT_CACHE_SIZE, settings.INTENT_CACHE_TTL_SECONDS)
+        self.fast_classifier = None  # Tier one of the intent cascade
+        self.cascade_stats = CascadeStats()
         if TRANSFORMERS_AVAILABLE:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            self.load_model()
         else:
             logger.info("Using rule-based intent recognition (transformers not installed)")
+        self.loader = BackgroundLoader("intent", self._load_models)
+        if load_in_background:
+            self.loader.start()
+        else:
+            self.loader.run()
+    
+    # The serving version's components, for callers that inspect the model
+    @property
+    def active_version(self) -> Optional[IntentModelVersion]:
+        return self._active
+    
+    @property
+    def tokenizer(self):
+        return self._active.tokenizer if self._active is not None else None
+    
+    @property
+    def model(self):
+        return self._active.model if self._active is not None else None
+    
+    @property
+    def onnx_session(self):
+        return self._active.onnx_session if self._active is not None else None
+    
+    @property
+    def knn(self):
+        return self._active.knn if self._active is not None else None
+    
+    @property
+    def early_exit(self):
+        return self._active.early_exit if self._active is not None else None
     
-    def load_model(self):
-        """Load pre-trained BERT model for intent classification"""
+    @property
+    def quantization(self):
+        return self._active.quantization if self._active is not None else None
+    
+    def _load_models(self):
+        """Train tier one, then load the intent model; the fallback path answers meanwhile"""
+        if settings.INTENT_CASCADE_ENABLED:
+            self._load_fast_classifier()
         if not TRANSFORMERS_AVAILABLE:
             return
-        try:
+        self.load_model()
+        if settings.INTENT_REGISTRY_POLL_SECONDS > 0:
+            self.registry_watcher = RegistryWatcher(
+                self.registry, self._on_registry_change, settings.INTENT_REGISTRY_POLL_SECONDS,
+                last_seen=self._active.name if self._active is not None and self._active.manifest else None
+            )
+            self.registry_watcher.start()
+        if self._active is None:
+            raise RuntimeError("No intent model could be loaded; serving fallback intents")
+    
+    def _on_registry_change(self, version: str):
+        if not self.load_model(version):
+            raise RuntimeError(f"still serving {self._active.name if self._active else 'fallback intents'}")
+    
+    def load_model(self, version: Optional[str] = None, activate: bool = False) -> bool:
+        """
+        Load an intent model beside the serving one and swap it in
+        
+        The model comes from the given registry version, else the version
+        named by the registry's ACTIVE file, else models/banking77-intent
+        (or the kNN index with INTENT_BACKEND=knn). It is warmed up and its
+        cache seed computed while the current version keeps answering; the
+        swap is a single reference change, and the old weights are released
+        once the requests still using them finish.
+        
+        Args:
+            version: Registry version to load (default: ACTIVE)
+            activate: Also point the registry's ACTIVE at version before it serves
+        
+        Returns:
+            True if the new model is serving, False if loading failed (the
+            previous version, if any, keeps serving)
+        """
+        if not TRANSFORMERS_AVAILABLE:
+            return False
+        with self._reload_lock:
+            started = time.perf_counter()
+            try:
+                loaded = self._load_version(version)
+            except Exception as e:
+                logger.warning(f"Could not load intent model: {str(e)}")
+                loaded = None
+            if loaded is None:
+                if self._active is None:
+                    logger.warning("Using rule-based fallback.")
+                return False
+            self._warm_up(loaded)
+            seed = self._seed_results(loaded)
+            if loaded.early_exit is not None:
+                loaded.early_exit.reset_stats()  # Count request traffic only, not warm-up and seeding
+            loaded.load_seconds = time.perf_counter() - started
+            seen = version if activate else loaded.name if loaded.manifest else None
+            watcher = self.registry_watcher
+            # Before the swap and atomic with the watcher's ACTIVE check, so the
+            # watcher never takes this change for a new version and loads it again
+            with watcher.lock if watcher is not None else contextlib.nullcontext():
+                if activate and version is not None and self.registry.active_version() != version:
+                    self.registry.activate(version)
+                if watcher is not None and seen is not None:
+                    watcher.last_seen = seen
+            self._swap(loaded, seed)
+            logger.info(f"Intent model version {loaded.name} serving (loaded in {loaded.load_seconds:.1f}s)")
+            return True
+    
+    def reload_model(self, version: Optional[str] = None) -> Dict:
+        """
+        Load a model version and, once it serves, make it the registry's ACTIVE one
+        
+        Other workers pick the new ACTIVE up through their registry watchers.
+        
+        Args:
+            version: Registry version (default: reload the current one)
+        
+        Returns:
+            Version status after the swap
+        
+        Raises:
+            ValueError: Unknown version
+            RuntimeError: The version could not be loaded (the previous one keeps serving)
+        """
+        if version is not None:
+            self.registry.version_dir(version)
+        if not self.load_model(version, activate=version is not None):
+            serving = self._active.name if self._active is not None else "fallback intents"
+            raise RuntimeError(f"Could not load intent model {version or 'version'}; still serving {serving}")
+        return self.get_version_status()
+    
+    def _load_version(self, version: Optional[str]) -> Optional[IntentModelVersion]:
+        """Load the selected model into a new, not yet serving, version"""
+        if settings.INTENT_BACKEND == "knn":
+            loaded = IntentModelVersion("knn", None)
+            if self._load_knn(loaded):
+                return loaded
+        
+        candidates = []  # (name, path, manifest)
+        registry_version = version or self.registry.active_version()
+        if registry_version is not None:
+            # A requested or published version must load; it never silently falls back
+            path = self.registry.version_dir(registry_version)
+            if settings.INTENT_REGISTRY_VERIFY_CHECKSUMS:
+                self.registry.verify(registry_version)
+            candidates.append((registry_version, path, self.registry.manifest(registry_version)))
+        else:
             # Try to load fine-tuned Banking77 model first
             model_paths = [
                 "./models/banking77-intent",
@@ -88,68 +330,353 @@ class IntentRecognitionService:
                 "models/banking77-intent",
                 os.path.join(os.path.dirname(__file__), "../../models/banking77-intent"),
             ]
-            
-            model_loaded = False
-            for model_path in model_paths:
-                if os.path.exists(model_path) and os.path.exists(os.path.join(model_path, "config.json")):
-                    logger.info(f"Loading fine-tuned Banking77 model from: {model_path}")
-                    try:
-                        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-                        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
-                        
-                        # Load intent mapping if available
-                        mapping_file = os.path.join(model_path, "intent_mapping.json")
-                        if os.path.exists(mapping_file):
-                            import json
-                            with open(mapping_file, "r") as f:
-                                mapping_data = json.load(f)
-                                self.banking77_mapping = mapping_data.get("banking77_to_app", {})
-                                logger.info(f"Loaded intent mapping with {len(self.banking77_mapping)} mappings")
-                        else:
-                            self.banking77_mapping = {}
-                        
-                        # Load label mapping if available
-                        label_mapping_file = os.path.join(model_path, "..", "label_mapping.json")
-                        if not os.path.exists(label_mapping_file):
-                            label_mapping_file = os.path.join(os.path.dirname(model_path), "label_mapping.json")
-                        if os.path.exists(label_mapping_file):
-                            import json
-                            with open(label_mapping_file, "r") as f:
-                                self.label_to_text = json.load(f)
-                                logger.info(f"Loaded label mapping with {len(self.label_to_text)} labels")
-                        else:
-                            self.label_to_text = {}
-                        
-                        self.model.to(self.device)
-                        self.model.eval()
-                        model_loaded = True
-                        logger.info("✓ Fine-tuned Banking77 model loaded successfully")
-                        break
-                    except Exception as e:
-                        logger.warning(f"Could not load model from {model_path}: {e}")
-                        continue
-            
-            if not model_loaded:
-                # Fallback to base model
-                model_name = "distilbert-base-uncased"
-                logger.info(f"Fine-tuned model not found. Loading base model: {model_name}")
-                logger.warning("Consider training the model with Banking77 dataset for better accuracy")
-                
-                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                self.model = AutoModelForSequenceClassification.from_pretrained(
-                    model_name,
-                    num_labels=len(BANKING_INTENTS)
-                )
-                self.banking77_mapping = {}
-                self.label_to_text = {}
-                self.model.to(self.device)
-                self.model.eval()
-                logger.info("Base intent model loaded successfully")
+            candidates.extend(("local", path, None) for path in model_paths)
+        
+        for name, model_path, manifest in candidates:
+            if os.path.exists(model_path) and os.path.exists(os.path.join(model_path, "config.json")):
+                logger.info(f"Loading fine-tuned Banking77 model from: {model_path}")
+                loaded = IntentModelVersion(name, model_path, manifest)
+                try:
+                    self._load_model_dir(loaded, model_path)
+                    logger.info(f"✓ Fine-tuned Banking77 model {name} loaded successfully")
+                    return loaded
+                except Exception as e:
+                    logger.warning(f"Could not load model from {model_path}: {e}")
+                    loaded.release()
+                    if registry_version is not None:
+                        raise
+        if registry_version is not None:
+            raise ValueError(f"Model version {registry_version} has no config.json")
+        if self._active is not None:
+            return None  # Keep serving rather than downgrading to the base model
+        
+        # Fallback to base model
+        model_name = "distilbert-base-uncased"
+        logger.info(f"Fine-tuned model not found. Loading base model: {model_name}")
+        logger.warning("Consider training the model with Banking77 dataset for better accuracy")
+        
+        loaded = IntentModelVersion("base", model_name)
+        loaded.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        loaded.model = AutoModelForSequenceClassification.from_pretrained(
+            model_name,
+            num_labels=len(BANKING_INTENTS)
+        )
+        self._prepare_model(loaded)
+        self._compile_intent_index(loaded)
+        logger.info("Base intent model loaded successfully")
+        return loaded
+    
+    def _load_model_dir(self, version: IntentModelVersion, model_path: str):
+        """Load tokenizer, weights and the intent/label mappings of a fine-tuned model directory"""
+        version.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        if not (settings.INTENT_BACKEND == "onnx" and self._load_onnx(version, model_path)):
+            version.model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        
+        # Load intent mapping if available
+        mapping_file = os.path.join(model_path, "intent_mapping.json")
+        if os.path.exists(mapping_file):
+            with open(mapping_file, "r") as f:
+                mapping_data = json.load(f)
+                version.banking77_mapping = mapping_data.get("banking77_to_app", {})
+                logger.info(f"Loaded intent mapping with {len(version.banking77_mapping)} mappings")
+        
+        # Load label mapping if available (fine_tune_intent_model.py writes
+        # it into the model directory; older layouts keep it alongside)
+        label_mapping_file = os.path.join(model_path, "label_mapping.json")
+        if not os.path.exists(label_mapping_file):
+            label_mapping_file = os.path.join(model_path, "..", "label_mapping.json")
+        if os.path.exists(label_mapping_file):
+            with open(label_mapping_file, "r") as f:
+                # JSON object keys are strings; model classes are ints
+                version.label_to_text = {int(k): v for k, v in json.load(f).items()}
+                logger.info(f"Loaded label mapping with {len(version.label_to_text)} labels")
+        
+        if version.model is not None:
+            self._prepare_model(version)
+        self._load_early_exit(version, model_path)
+        self._compile_intent_index(version)
+    
+    def _warm_up(self, version: IntentModelVersion):
+        """Run a few batches so the first real requests do not pay for lazy initialization"""
+        try:
+            for size in (1, 8):
+                self._classify(FREQUENT_PHRASES[:size], version)
         except Exception as e:
-            logger.warning(f"Could not load model: {str(e)}. Using rule-based fallback.")
-            self.model = None
-            self.banking77_mapping = {}
-            self.label_to_text = {}
+            logger.warning(f"Intent model warm-up failed: {e}")
+    
+    def _swap(self, version: IntentModelVersion, seed: Optional[Tuple[List[str], List[RankedIntents]]]):
+        """Make version the serving one and retire the previous version"""
+        with self._version_lock:
+            previous = self._active
+            self._active = version
+            generation = 0
+            if self.cache is not None:
+                # Bumped with the swap: requests leasing the previous version hold the old
+                # generation, so the results they compute are dropped instead of cached
+                self.cache.invalidate()
+                generation = self.cache.generation
+            release_now = False
+            if previous is not None:
+                previous.retired = True
+                release_now = previous.in_flight == 0
+                if not release_now:
+                    self._draining.append(previous)
+        if self.cache is not None and seed is not None:
+            self.cache.seed(seed[0], seed[1], generation)
+        if self.fast_classifier is not None:
+            self.fast_classifier.set_intent_mapping(self._app_intent_for_label)
+        if release_now:
+            previous.release()
+        elif previous is not None:
+            logger.info(f"Intent model version {previous.name} draining ({previous.in_flight} requests in flight)")
+    
+    def _acquire_version(self) -> Tuple[Optional[IntentModelVersion], int]:
+        """
+        Lease the serving version for one request
+        
+        Returns:
+            (version or None, cache generation its results may be stored under)
+        """
+        with self._version_lock:
+            version = self._active
+            if version is not None:
+                version.in_flight += 1
+            return version, self.cache.generation if self.cache is not None else 0
+    
+    def _release_version(self, version: IntentModelVersion):
+        with self._version_lock:
+            version.in_flight -= 1
+            drained = version.retired and version.in_flight == 0 and version in self._draining
+            if drained:
+                self._draining.remove(version)
+        if drained:
+            version.release()
+    
+    def _load_knn(self, version: IntentModelVersion) -> bool:
+        """
+        Open the embedding kNN index built by scripts/build_intent_knn_index.py
+        
+        Returns:
+            True if the index was loaded, False to fall back to the transformer
+        """
+        index_dir = settings.INTENT_KNN_INDEX_DIR
+        candidates = [
+            index_dir,
+            os.path.join("..", index_dir),
+            os.path.join(os.path.dirname(__file__), "../..", index_dir),
+        ]
+        index_dir = next((path for path in candidates if os.path.exists(os.path.join(path, KNN_INFO_FILE))), None)
+        if index_dir is None:
+            logger.warning(f"{settings.INTENT_KNN_INDEX_DIR} not found (run scripts/build_intent_knn_index.py); "
+                           "using the transformer")
+            return False
+        try:
+            with open(os.path.join(index_dir, KNN_INFO_FILE), "r") as f:
+                info = json.load(f)
+            encoder = SentenceEncoder(info["encoder"], self.device, info.get("max_length", settings.INTENT_MAX_LENGTH))
+            version.knn = KnnIntentIndex(index_dir, encoder, settings.INTENT_KNN_K, settings.INTENT_KNN_TEMPERATURE)
+        except Exception as e:
+            logger.warning(f"Could not load kNN intent index from {index_dir}: {e}; using the transformer")
+            version.knn = None
+            return False
+        
+        version.path = index_dir
+        mapping_file = os.path.join(index_dir, "intent_mapping.json")
+        if os.path.exists(mapping_file):
+            with open(mapping_file, "r") as f:
+                version.banking77_mapping = json.load(f).get("banking77_to_app", {})
+        version.knn.set_intent_mapping(lambda label: self._knn_intent_for_label(label, version))
+        logger.info(f"Loaded kNN intent index from {index_dir} ({version.knn.get_stats()['base_examples']} examples)")
+        return True
+    
+    def _knn_intent_for_label(self, label: str, version: IntentModelVersion) -> str:
+        """kNN labels are Banking77 labels, application intents or new intents added at runtime"""
+        if label in version.knn.base_labels or label in version.banking77_mapping:
+            return self._app_intent_for_label(label, version)
+        return label
+    
+    def add_intent_examples(self, examples: List[Tuple[str, str]]) -> Dict:
+        """
+        Add labelled utterances to the kNN index, effective for the next request
+        
+        Args:
+            examples: (text, label) pairs; label is an application intent,
+                a Banking77 label or a new intent name
+        
+        Returns:
+            Index statistics after the addition
+        
+        Raises:
+            RuntimeError: If the kNN backend is not active
+        """
+        knn = self.knn
+        if knn is None:
+            raise RuntimeError("Intent examples can only be added with INTENT_BACKEND=knn")
+        knn.add_examples(examples)
+        if self.cache is not None:
+            # Cached answers may now be wrong; the static seeds stay except for the added phrases
+            self.cache.invalidate_lru(text for text, _ in examples)
+        return knn.get_stats()
+    
+    def _load_onnx(self, version: IntentModelVersion, model_path: str) -> bool:
+        """
+        Open an ONNX Runtime session for an exported model
+        
+        Args:
+            version: Version being loaded
+            model_path: Fine-tuned model directory containing onnx/model.onnx
+        
+        Returns:
+            True if the session was created, False to fall back to PyTorch
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            logger.warning("INTENT_BACKEND=onnx but onnxruntime is not installed; using PyTorch")
+            return False
+        fp32_path = os.path.join(model_path, ONNX_MODEL_FILE)
+        int8_path = os.path.join(model_path, ONNX_INT8_MODEL_FILE)
+        onnx_path = int8_path if settings.INTENT_QUANTIZE_INT8 else fp32_path
+        if not os.path.exists(onnx_path):
+            logger.warning(f"{onnx_path} not found (run scripts/export_intent_onnx.py); using PyTorch")
+            return False
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = settings.INTENT_ONNX_THREADS
+        options.inter_op_num_threads = 1
+        version.onnx_session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        version.onnx_inputs = [model_input.name for model_input in version.onnx_session.get_inputs()]
+        
+        if onnx_path == int8_path and os.path.exists(fp32_path):
+            fp32_mb = os.path.getsize(fp32_path) / 1024 ** 2
+            int8_mb = os.path.getsize(int8_path) / 1024 ** 2
+            version.quantization = {
+                "fp32_mb": round(fp32_mb, 1),
+                "int8_mb": round(int8_mb, 1),
+                "saved_mb": round(fp32_mb - int8_mb, 1),
+            }
+        logger.info(f"Loaded ONNX intent model: {onnx_path}")
+        return True
+    
+    def _compile_intent_index(self, version: IntentModelVersion):
+        """Precompute each model label's application intent as an index tensor"""
+        if version.knn is not None:
+            return  # kNN votes are mapped per label by the index itself
+        if version.model is not None:
+            num_labels = version.model.config.num_labels
+            device = self.device
+        elif version.onnx_session is not None:
+            num_labels = version.onnx_session.get_outputs()[0].shape[-1]
+            device = "cpu"
+        else:
+            return
+        label_intents = [self._predicted_intent(label, version) for label in range(num_labels)]
+        version.app_intents = sorted(set(label_intents))
+        version.label_intent_index = torch.tensor(
+            [version.app_intents.index(intent) for intent in label_intents], device=device
+        )
+    
+    def _load_fast_classifier(self):
+        """Train the tier-one TF-IDF classifier on banking77_train.csv"""
+        train_path = find_train_set()
+        if not SKLEARN_AVAILABLE or train_path is None:
+            logger.info("Intent cascade disabled (scikit-learn or banking77_train.csv missing)")
+            return
+        try:
+            classifier = FastIntentClassifier(INTENT_KEYWORDS)
+            classifier.train_from_csv(train_path)
+            classifier.set_intent_mapping(self._app_intent_for_label)
+            self.fast_classifier = classifier
+        except Exception as e:
+            logger.warning(f"Could not train tier-one intent classifier: {e}")
+    
+    def _seed_results(self, version: IntentModelVersion) -> Optional[Tuple[List[str], List[RankedIntents]]]:
+        """Pre-compute the static cache tier with a freshly loaded version, before it serves"""
+        if self.cache is None or not version.loaded:
+            return None
+        phrases = load_seed_phrases(settings.INTENT_CACHE_SEED_FILE, settings.INTENT_CACHE_SEED_LIMIT)
+        texts = list({normalize(text): text for text in phrases}.values())
+        started = time.perf_counter()
+        results = []
+        try:
+            batch_size = settings.INTENT_MAX_BATCH_SIZE
+            for start in range(0, len(texts), batch_size):
+                results.extend(self._classify(texts[start:start + batch_size], version))
+        except Exception as e:
+            logger.warning(f"Could not seed intent cache: {e}")
+            return None
+        logger.info(f"Computed {len(texts)} intent cache seeds in {time.perf_counter() - started:.1f}s")
+        return texts, results
+    
+    def _load_early_exit(self, version: IntentModelVersion, model_path: str):
+        """Attach early-exit heads trained by scripts/fine_tune_intent_model.py --early-exit"""
+        if not settings.INTENT_EARLY_EXIT_ENABLED or version.model is None:
+            return
+        heads_path = os.path.join(model_path, EARLY_EXIT_FILE)
+        if not os.path.exists(heads_path):
+            logger.warning(f"{heads_path} not found (train with --early-exit); early exit disabled")
+            return
+        try:
+            version.early_exit = EarlyExitClassifier(
+                version.model, heads_path, settings.INTENT_EARLY_EXIT_THRESHOLD, self.device
+            )
+            logger.info(f"Early exit enabled at layers {version.early_exit.exit_layers}")
+        except Exception as e:
+            logger.warning(f"Could not load early-exit heads: {e}")
+    
+    def _prepare_model(self, version: IntentModelVersion):
+        """Move the loaded model to the device for inference, quantizing it if enabled"""
+        version.model.to(self.device)
+        version.model.eval()
+        if settings.INTENT_QUANTIZE_INT8:
+            if can_quantize(self.device):
+                version.model, version.quantization = quantize_dynamic_int8(version.model, "intent model")
+            else:
+                logger.warning("INTENT_QUANTIZE_INT8 ignored: int8 kernels are CPU-only")
+    
+    @property
+    def backend(self) -> str:
+        """Engine currently answering requests"""
+        version = self._active
+        if version is None:
+            return "rule_based"
+        if version.knn is not None:
+            return "knn"
+        return "onnx" if version.onnx_session is not None else "transformer"
+    
+    def get_load_status(self) -> Dict:
+        """Loading state, load time and the engine serving meanwhile"""
+        status = {**self.loader.get_status(), "backend": self.backend}
+        status["version"] = self._active.name if self._active is not None else None
+        return status
+    
+    def get_version_status(self) -> Dict:
+        """Serving version, versions still draining and the registry's ACTIVE pointer"""
+        with self._version_lock:
+            active = self._active.get_status() if self._active is not None else None
+            draining = [version.get_status() for version in self._draining]
+        return {
+            "active": active,
+            "draining": draining,
+            "registry": {
+                "root": self.registry.root,
+                "active": self.registry.active_version(),
+                "versions": [manifest.get("version") for manifest in self.registry.versions()],
+            },
+        }
+    
+    def get_stats(self) -> Dict:
+        """Return intent service metrics"""
+        version = self._active
+        return {
+            "backend": self.backend,
+            "version": self.get_version_status(),
+            "quantization": version.quantization if version is not None else None,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "cascade": self.cascade_stats.get_stats() if self.fast_classifier is not None else None,
+            "early_exit": version.early_exit.get_stats() if version is not None and version.early_exit is not None else None,
+            "knn": version.knn.get_stats() if version is not None and version.knn is not None else None,
+        }
     
     def extract_entities(self, text: str, intent: str) -> Dict:
         """
@@ -162,95 +689,7 @@ class IntentRecognitionService:
         Returns:
             Dictionary with extracted entities
         """
-        entities = {}
-        
-        # Extract amount
-        amount_patterns = [
-            r'(?:₹|rs\.?|rupees?)\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',
-            r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:₹|rs\.?|rupees?)',
-            r'amount\s*(?:of\s*)?(?:₹|rs\.?|rupees?)?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)'
-        ]
-        for pattern in amount_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                amount_str = match.group(1).replace(',', '')
-                entities["amount"] = float(amount_str)
-                break
-        
-        # Extract recipient name for transfers
-        if intent == "transfer_funds":
-            # Simple pattern: "to [Name]" or "transfer [amount] to [Name]"
-            to_patterns = [
-                r'(?:to|for)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-                r'transfer.*?to\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            ]
-            for pattern in to_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    entities["recipient_name"] = match.group(1)
-                    break
-        
-        # Extract category for spending queries
-        if intent == "category_spending":
-            category_patterns = [
-                r'(?:spent|spend|expenses?)\s+(?:on|for)\s+(\w+)',
-                r'(\w+)\s+(?:spending|expenses?)',
-            ]
-            for pattern in category_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    entities["category"] = match.group(1).lower()
-                    break
-        
-        # Extract period for spending queries
-        if intent in ["spending_summary", "category_spending"]:
-            period_patterns = [
-                r'(?:last|past)\s+(?:week|month|year)',
-                r'this\s+(?:week|month|year)',
-            ]
-            text_lower = text.lower()
-            if "last month" in text_lower or "past month" in text_lower:
-                entities["period"] = "last_month"
-            elif "last week" in text_lower or "past week" in text_lower:
-                entities["period"] = "last_week"
-            elif "last year" in text_lower or "past year" in text_lower:
-                entities["period"] = "last_year"
-            elif "this month" in text_lower:
-                entities["period"] = "month"
-            elif "this week" in text_lower:
-                entities["period"] = "week"
-        
-        # Extract bill type for auto-pay
-        if intent == "setup_auto_pay":
-            bill_types = ["electricity", "phone", "water", "internet", "gas"]
-            text_lower = text.lower()
-            for bill_type in bill_types:
-                if bill_type in text_lower:
-                    entities["bill_type"] = bill_type
-                    break
-        
-        # Extract card action
-        if intent == "manage_card":
-            text_lower = text.lower()
-            if "block" in text_lower:
-                entities["action"] = "block"
-            elif "unblock" in text_lower:
-                entities["action"] = "unblock"
-            elif "limit" in text_lower:
-                entities["action"] = "set_limit"
-            
-            if "debit" in text_lower:
-                entities["card_type"] = "debit"
-            elif "credit" in text_lower:
-                entities["card_type"] = "credit"
-        
-        # Extract account number
-        account_pattern = r'(?:account\s*)?(?:number\s*)?(\d{4,16})'
-        match = re.search(account_pattern, text, re.IGNORECASE)
-        if match:
-            entities["account_number"] = match.group(1)
-        
-        return entities
+        return entity_extractor.extract(text, intent)
     
     def recognize_intent(self, text: str) -> Tuple[str, float, Dict]:
         """
@@ -262,48 +701,199 @@ class IntentRecognitionService:
         Returns:
             Tuple of (intent, confidence, entities)
         """
-        if self.model is None:
-            # Fallback to rule-based
-            return self._rule_based_intent(text)
+        return self.recognize_intents([text])[0]
+    
+    def recognize_intents(self, texts: List[str]) -> List[Tuple[str, float, Dict]]:
+        """
+        Recognize intents for several texts with batched forward passes
+        
+        Cached texts skip the model. The rest go to the tier-one TF-IDF
+        classifier, and only those below CONFIDENCE_THRESHOLD escalate to the
+        transformer, tokenized together and padded to the longest item in
+        each batch of INTENT_MAX_BATCH_SIZE. Entities are always extracted
+        from the original text.
+        
+        Args:
+            texts: User input texts
+        
+        Returns:
+            List of (intent, confidence, entities) tuples, one per text
+        """
+        return [result[:3] for result in self.rank_intents(texts)]
+    
+    def rank_intents(self, texts: List[str]) -> List[Tuple[str, float, Dict, RankedIntents]]:
+        """
+        Recognize intents, also returning the top INTENT_TOP_K application intents
+        
+        Args:
+            texts: User input texts
+        
+        Returns:
+            List of (intent, confidence, entities, ranked intents) tuples
+        """
+        if not texts:
+            return []
+        version, generation = self._acquire_version()
+        if version is None:
+            # Fallback to keyword rules (no model, or still loading)
+            return self._fallback_intents(texts)
         
         try:
-            # Tokenize and predict
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-                padding=True
-            ).to(self.device)
+            ranked: List[Optional[RankedIntents]] = [None] * len(texts)
+            pending = []
+            for i, text in enumerate(texts):
+                ranked[i] = self.cache.get(text) if self.cache is not None else None
+                if ranked[i] is None:
+                    pending.append(i)
             
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=-1)
-                predicted_class = torch.argmax(probabilities, dim=-1).item()
-                confidence = probabilities[0][predicted_class].item()
+            tier_one = {}
+            # Tier one does not know runtime kNN examples, so it would shadow them
+            if self.fast_classifier is not None and version.knn is None and pending:
+                escalate = []
+                audited = set()
+                tier_one_ranked = self.fast_classifier.rank([texts[i] for i in pending], settings.INTENT_TOP_K)
+                for i, candidates in zip(pending, tier_one_ranked):
+                    tier_one[i] = candidates[0][0]
+                    if candidates[0][1] < settings.CONFIDENCE_THRESHOLD:
+                        escalate.append(i)
+                    elif random.random() < settings.INTENT_CASCADE_AUDIT_RATE:
+                        escalate.append(i)
+                        audited.add(i)
+                    else:
+                        ranked[i] = candidates
+                self.cascade_stats.record(answered=len(pending) - len(escalate))
+                pending = escalate
             
-            # Map Banking77 intent to application intent
-            if self.label_to_text and predicted_class in self.label_to_text:
-                banking77_intent = self.label_to_text[predicted_class]
-                # Map to application intent
-                if banking77_intent in self.banking77_mapping:
-                    intent = self.banking77_mapping[banking77_intent]
-                else:
-                    # Try to infer from Banking77 intent name
-                    intent = self._map_banking77_intent(banking77_intent)
-            else:
-                # Fallback to direct mapping (for base model)
-                intent = REVERSE_INTENTS.get(predicted_class, "other")
+            batch_size = settings.INTENT_MAX_BATCH_SIZE
+            for start in range(0, len(pending), batch_size):
+                indices = pending[start:start + batch_size]
+                for i, candidates in zip(indices, self._classify([texts[i] for i in indices], version)):
+                    if self.cache is not None:
+                        self.cache.put(texts[i], candidates, generation)
+                    ranked[i] = candidates
             
-            # Extract entities
-            entities = self.extract_entities(text, intent)
+            results = []
+            for text, candidates in zip(texts, ranked):
+                intent, confidence = candidates[0]
+                results.append((intent, confidence, self.extract_entities(text, intent), candidates))
             
-            return intent, confidence, entities
+            if tier_one:
+                escalated = [i for i in pending if i not in audited]
+                self.cascade_stats.record(
+                    escalated=len(escalated),
+                    escalated_agree=sum(tier_one[i] == results[i][0] for i in escalated),
+                    audited=len(audited),
+                    audited_agree=sum(tier_one[i] == results[i][0] for i in audited),
+                )
+            return results
             
         except Exception as e:
             logger.error(f"Error in intent recognition: {str(e)}")
-            return self._rule_based_intent(text)
+            return self._fallback_intents(texts)
+        finally:
+            # A replaced version is released by its last request
+            self._release_version(version)
+    
+    def _fallback_intents(self, texts: List[str]) -> List[Tuple[str, float, Dict, RankedIntents]]:
+        """
+        Answer without the transformer: keyword rules first
+        
+        Tier one only fills in texts no rule matched, and only with a
+        confident intent the rules also cover; its Banking77-mapped labels
+        cannot express fraud, greetings, spending or cheque books.
+        """
+        results = []
+        for text in texts:
+            intent, confidence, entities = self._rule_based_intent(text)
+            results.append((intent, confidence, entities, [(intent, confidence)]))
+        
+        unmatched = [i for i, result in enumerate(results) if result[0] == "other"]
+        if self.fast_classifier is not None and unmatched:
+            try:
+                ranked = self.fast_classifier.rank([texts[i] for i in unmatched], settings.INTENT_TOP_K)
+                for i, candidates in zip(unmatched, ranked):
+                    intent, confidence = candidates[0]
+                    if intent in RULE_INTENTS and confidence >= settings.CONFIDENCE_THRESHOLD:
+                        results[i] = (intent, confidence, self.extract_entities(texts[i], intent), candidates)
+            except Exception as e:
+                logger.error(f"Error in tier-one intent recognition: {str(e)}")
+        return results
+    
+    def fallback_intent(self, text: str) -> Tuple[str, float, Dict]:
+        """Recognize intent with the keyword rules, without waiting for the transformer"""
+        return self._rule_based_intent(text)
+    
+    def _classify(self, texts: List[str], version: Optional[IntentModelVersion] = None) -> List[RankedIntents]:
+        """
+        Run one forward pass padded to the longest text
+        
+        Label probabilities are scatter-added into application intents
+        through the precomputed label index, so each confidence is the total
+        probability of its intent rather than of a single Banking77 label.
+        The kNN backend votes neighbours into application intents instead.
+        
+        Args:
+            texts: User input texts
+            version: Model version to run (default: the serving one)
+        
+        Returns:
+            Top INTENT_TOP_K (intent, probability) pairs per text
+        """
+        version = version or self._active
+        if version.knn is not None:
+            return version.knn.rank(texts, settings.INTENT_TOP_K)
+        if version.onnx_session is not None:
+            inputs = version.tokenizer(
+                texts,
+                return_tensors="np",
+                truncation=True,
+                max_length=settings.INTENT_MAX_LENGTH,
+                padding="longest"
+            )
+            feeds = {name: inputs[name].astype(np.int64) for name in version.onnx_inputs}
+            logits = torch.from_numpy(version.onnx_session.run(["logits"], feeds)[0])
+        else:
+            inputs = version.tokenizer(
+                texts,
+                return_tensors="pt",
+                truncation=True,
+                max_length=settings.INTENT_MAX_LENGTH,
+                padding="longest"
+            ).to(self.device)
+            if version.early_exit is not None:
+                logits = version.early_exit.logits(inputs)
+            else:
+                with torch.no_grad():
+                    logits = version.model(**inputs).logits
+        
+        probabilities = torch.softmax(logits.float(), dim=-1)
+        app_probabilities = torch.zeros(
+            len(texts), len(version.app_intents), device=probabilities.device
+        ).scatter_add_(1, version.label_intent_index.expand(len(texts), -1), probabilities)
+        top_probabilities, top_columns = app_probabilities.topk(
+            min(settings.INTENT_TOP_K, len(version.app_intents)), dim=-1
+        )
+        return [
+            [(version.app_intents[column], probability) for column, probability in zip(columns, row)]
+            for columns, row in zip(top_columns.tolist(), top_probabilities.tolist())
+        ]
+    
+    def _predicted_intent(self, predicted_class: int, version: IntentModelVersion) -> str:
+        """Map a model output class to an application intent, with the mappings of version"""
+        # Map Banking77 intent to application intent
+        if version.label_to_text and predicted_class in version.label_to_text:
+            return self._app_intent_for_label(version.label_to_text[predicted_class], version)
+        # Fallback to direct mapping (for base model)
+        return REVERSE_INTENTS.get(predicted_class, "other")
+    
+    def _app_intent_for_label(self, banking77_intent: str, version: Optional[IntentModelVersion] = None) -> str:
+        """Map a Banking77 label name to an application intent (default: serving version's mapping)"""
+        version = version or self._active
+        mapping = version.banking77_mapping if version is not None else {}
+        if banking77_intent in mapping:
+            return mapping[banking77_intent]
+        # Try to infer from Banking77 intent name
+        return self._map_banking77_intent(banking77_intent)
     
     def _map_banking77_intent(self, banking77_intent: str) -> str:
         """Map Banking77 intent to application intent"""
@@ -342,19 +932,12 @@ class IntentRecognitionService:
     
     def _rule_based_intent(self, text: str) -> Tuple[str, float, Dict]:
         """Fallback rule-based intent recognition"""
-        text_lower = text.lower()
-        
-        # Check for keywords
-        for intent, keywords in INTENT_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    entities = self.extract_entities(text, intent)
-                    return intent, 0.8, entities
-        
-        # Check for greetings
-        greetings = ["hello", "hi", "hey", "good morning", "good afternoon"]
-        if any(g in text_lower for g in greetings):
+        intent = RULE_MATCHER.first(text.lower())
+        if intent == "greeting":
             return "greeting", 0.9, {}
+        if intent is not None:
+            entities = self.extract_entities(text, intent)
+            return intent, 0.8, entities
         
         # Default
         entities = self.extract_entities(text, "other")
@@ -363,19 +946,28 @@ class IntentRecognitionService:
 
 # Global instance - lazy initialization
 _intent_service = None
+_intent_service_lock = threading.Lock()
 
-def get_intent_service():
-    """Get or create intent service instance (lazy initialization)"""
+def get_intent_service(background: bool = False):
+    """
+    Get or create intent service instance (lazy initialization)
+    
+    Args:
+        background: If the service is created now, load its models on a
+            background thread (the application lifespan does this) instead
+            of blocking the caller
+    """
     global _intent_service
     if _intent_service is None:
-        try:
-            _intent_service = IntentRecognitionService()
-        except Exception as e:
-            logger.warning(f"Failed to initialize intent service: {e}. Using rule-based fallback only.")
-            # Create a minimal service that only uses rule-based
-            _intent_service = IntentRecognitionService()
-            _intent_service.model = None
-            _intent_service.tokenizer = None
+        with _intent_service_lock:
+            if _intent_service is None:
+                try:
+                    _intent_service = IntentRecognitionService(load_in_background=background)
+                except Exception as e:
+                    logger.warning(f"Failed to initialize intent service: {e}. Using rule-based fallback only.")
+                    # Create a minimal service that only uses rule-based
+                    _intent_service = IntentRecognitionService()
+                    _intent_service._active = None
     return _intent_service
 
 # Backward compatibility - will be initialized on first access
@@ -0,0 +1,68 @@
+"""
+Micro-batching scheduler for intent classification
+"""
+import asyncio
+from typing import Dict, List, Tuple
+import logging
+
+from app.core.config import settings
+from app.services.batching import MicroBatchScheduler, SchedulerOverloaded
+from app.services.intent_recognition import intent_service
+
+logger = logging.getLogger(__name__)
+
+
+class IntentScheduler(MicroBatchScheduler):
+    """Batch concurrent intent requests into padded forward passes"""
+
+    def __init__(self):
+        super().__init__(
+            name="intent",
+            batch_fn=self._recognize_batch,
+            max_batch_size=settings.INTENT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.INTENT_BATCH_MAX_WAIT_MS,
+            max_queue_size=settings.INTENT_BATCH_MAX_QUEUE
+        )
+        self._fallbacks = {"timeout": 0, "overloaded": 0}
+
+    def _recognize_batch(self, texts: List[str]) -> List[Tuple[str, float, Dict]]:
+        """Run one batch through the intent service"""
+        return intent_service.recognize_intents(texts)
+
+    async def recognize_intent(self, text: str) -> Tuple[str, float, Dict]:
+        """
+        Recognize intent, batching the text with concurrent requests
+
+        If the model result is not back within INTENT_MAX_LATENCY_MS, or the
+        queue is full, the rule-based classifier answers instead.
+
+        Args:
+            text: User input text
+
+        Returns:
+            Tuple of (intent, confidence, entities)
+        """
+        loop = asyncio.get_running_loop()
+        if not settings.INTENT_BATCHING_ENABLED:
+            return await loop.run_in_executor(None, intent_service.recognize_intent, text)
+
+        try:
+            return await asyncio.wait_for(self.submit(text), settings.INTENT_MAX_LATENCY_MS / 1000)
+        except asyncio.TimeoutError:
+            self._fallbacks["timeout"] += 1
+            logger.warning(f"Intent model exceeded {settings.INTENT_MAX_LATENCY_MS}ms; using fallback result")
+        except SchedulerOverloaded:
+            self._fallbacks["overloaded"] += 1
+        return intent_service.fallback_intent(text)
+
+    def get_stats(self) -> Dict:
+        """Return scheduler metrics, including model fallbacks"""
+        stats = super().get_stats()
+        stats["max_latency_ms"] = settings.INTENT_MAX_LATENCY_MS
+        stats["fallback_timeout"] = self._fallbacks["timeout"]
+        stats["fallback_overloaded"] = self._fallbacks["overloaded"]
+        return stats
+
+
+# Global instance
+intent_scheduler = IntentScheduler()
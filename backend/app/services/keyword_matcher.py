@@ -0,0 +1,118 @@
+"""
+Multi-pattern keyword matching with an Aho-Corasick automaton
+
+The rule-based intent fallback and spending categorization both ask "which
+label, in table order, has a keyword occurring in this text?". Instead of
+one substring scan per keyword, the keyword tables are compiled once into a
+deterministic automaton that finds every hit in a single pass over the text.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over an ordered label -> keywords table"""
+
+    def __init__(self, table: Sequence[Tuple[str, Iterable[str]]]):
+        """
+        Args:
+            table: (label, keywords) pairs; earlier labels take priority when
+                several labels have hits, like a first-match loop over the table
+        """
+        self.labels = [label for label, _ in table]
+        # Trie: goto edges, and the labels whose keywords end at each node
+        goto: List[Dict[str, int]] = [{}]
+        ends: List[Set[int]] = [set()]
+        for priority, (_, keywords) in enumerate(table):
+            for keyword in keywords:
+                node = 0
+                for ch in keyword:
+                    if ch not in goto[node]:
+                        goto.append({})
+                        ends.append(set())
+                        goto[node][ch] = len(goto) - 1
+                    node = goto[node][ch]
+                ends[node].add(priority)
+
+        # Breadth-first: failure links, then a full transition table (DFA) so
+        # scanning never walks failure chains
+        self._delta: List[Dict[str, int]] = [dict(goto[0])]
+        self._hits: List[frozenset] = [frozenset(ends[0])]
+        self._delta.extend({} for _ in range(len(goto) - 1))
+        self._hits.extend(frozenset() for _ in range(len(goto) - 1))
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            self._hits[node] = frozenset(ends[node] | self._hits[fail[node]])
+            transitions = dict(self._delta[fail[node]]) if node else {}
+            for ch, child in goto[node].items():
+                fail[child] = self._delta[fail[node]].get(ch, 0) if node else 0
+                transitions[ch] = child
+                queue.append(child)
+            self._delta[node] = transitions
+        # Highest-priority (lowest index) label ending at each state
+        self._best = [min(hits) if hits else len(self.labels) for hits in self._hits]
+
+    def first(self, text: str) -> Optional[str]:
+        """
+        Highest-priority label with a keyword in `text`
+
+        Args:
+            text: Already lowercased text
+
+        Returns:
+            Label, or None when no keyword occurs
+        """
+        delta, best_at = self._delta, self._best
+        best = len(self.labels)
+        node = 0
+        for ch in text:
+            node = delta[node].get(ch, 0)
+            if best_at[node] < best:
+                best = best_at[node]
+                if best == 0:
+                    break
+        return self.labels[best] if best < len(self.labels) else None
+
+    def matches(self, text: str) -> List[str]:
+        """All labels with a keyword in `text`, in priority order"""
+        delta, hits = self._delta, self._hits
+        found: Set[int] = set()
+        node = 0
+        for ch in text:
+            node = delta[node].get(ch, 0)
+            if hits[node]:
+                found |= hits[node]
+        return [self.labels[priority] for priority in sorted(found)]
+
+    def first_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        """
+        `first` over a batch, scanning each distinct text once
+
+        The same per-character automaton walk as `first`, run inline for the
+        whole batch; duplicate texts (recurring merchants) reuse the label
+        found for their first occurrence.
+
+        Args:
+            texts: Already lowercased texts
+
+        Returns:
+            One label (or None) per text
+        """
+        delta, best_at = self._delta, self._best
+        no_match = len(self.labels)
+        labels: Dict[str, Optional[str]] = {}
+        for text in texts:
+            if text in labels:
+                continue
+            best = no_match
+            node = 0
+            for ch in text:
+                node = delta[node].get(ch, 0)
+                if best_at[node] < best:
+                    best = best_at[node]
+                    if best == 0:
+                        break
+            labels[text] = self.labels[best] if best < no_match else None
+        return [labels[text] for text in texts]
@@ -0,0 +1,314 @@
+"""
+Embedding nearest-neighbour intent classification
+
+Utterances are encoded by a small sentence encoder (mean-pooled, L2
+normalized) and classified by cosine kNN against a matrix of labelled
+example embeddings built by scripts/build_intent_knn_index.py. The matrix is
+memory-mapped, so the index costs no load time and only the pages actually
+scanned stay resident. Examples added at runtime are encoded once, appended
+to an in-memory matrix searched alongside it and persisted to
+added_examples.jsonl, so new phrasings and new intents take effect without
+retraining or a restart. An added phrasing itself is always answered with
+its own label rather than being outvoted by its neighbours.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from transformers import AutoModel, AutoTokenizer
+
+from app.services.early_exit import mean_pool
+from app.services.intent_cache import normalize
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_FILE = "embeddings.npy"
+LABELS_FILE = "labels.json"
+INFO_FILE = "index_info.json"
+ADDED_EXAMPLES_FILE = "added_examples.jsonl"
+
+# Rows scored per matrix product; bounds the score buffer for large indexes
+SEARCH_CHUNK_ROWS = 65536
+
+
+class SentenceEncoder:
+    """Mean-pooled, L2-normalized sentence embeddings from a Hugging Face encoder"""
+
+    def __init__(self, model_name: str, device: str = "cpu", max_length: int = 128):
+        """
+        Args:
+            model_name: Encoder name or path (e.g. sentence-transformers/all-MiniLM-L6-v2)
+            device: Device to run the encoder on
+            max_length: Tokens per utterance
+        """
+        self.model_name = model_name
+        self.device = device
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).to(device).eval()
+
+    @property
+    def dim(self) -> int:
+        return self.model.config.hidden_size
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Encode texts into unit vectors
+
+        Returns:
+            (len(texts), dim) float32 array
+        """
+        outputs = []
+        with torch.no_grad():
+            for start in range(0, len(texts), batch_size):
+                inputs = self.tokenizer(
+                    texts[start:start + batch_size],
+                    return_tensors="pt",
+                    truncation=True,
+                    max_length=self.max_length,
+                    padding="longest"
+                ).to(self.device)
+                hidden = self.model(**inputs).last_hidden_state
+                pooled = F.normalize(mean_pool(hidden, inputs["attention_mask"]).float(), dim=-1)
+                outputs.append(pooled.cpu().numpy())
+        if not outputs:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.concatenate(outputs).astype(np.float32, copy=False)
+
+
+def build_index(index_dir: str, encoder: SentenceEncoder, texts: List[str], labels: List[str],
+                source: str = "") -> Dict:
+    """
+    Encode labelled examples and write the index files
+
+    Args:
+        index_dir: Output directory
+        encoder: Sentence encoder (its name is recorded for query time)
+        texts: Example utterances
+        labels: Label of each utterance (Banking77 label or application intent)
+        source: Description of where the examples came from
+
+    Returns:
+        The index_info.json contents
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    embeddings = encoder.encode(texts)
+    np.save(os.path.join(index_dir, EMBEDDINGS_FILE), embeddings)
+    with open(os.path.join(index_dir, LABELS_FILE), "w") as f:
+        json.dump(labels, f)
+    info = {
+        "encoder": encoder.model_name,
+        "dim": int(embeddings.shape[1]),
+        "count": len(texts),
+        "labels": len(set(labels)),
+        "max_length": encoder.max_length,
+        "source": source,
+    }
+    with open(os.path.join(index_dir, INFO_FILE), "w") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def top_k_rows(queries: np.ndarray, matrix: np.ndarray, k: int,
+               best_scores: Optional[np.ndarray] = None, best_rows: Optional[np.ndarray] = None,
+               row_offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge the k most similar rows of matrix into a running top-k
+
+    Args:
+        queries: (n, dim) unit vectors
+        matrix: (rows, dim) unit vectors; may be a memory map, read in chunks
+        k: Neighbours to keep
+        best_scores, best_rows: Running (n, <=k) top-k from earlier matrices
+        row_offset: Global id of the first row of matrix
+
+    Returns:
+        (scores, rows) of shape (n, <=k), unsorted
+    """
+    n = queries.shape[0]
+    if best_scores is None:
+        best_scores = np.zeros((n, 0), dtype=np.float32)
+        best_rows = np.zeros((n, 0), dtype=np.int64)
+    for start in range(0, matrix.shape[0], SEARCH_CHUNK_ROWS):
+        chunk = np.asarray(matrix[start:start + SEARCH_CHUNK_ROWS])
+        scores = np.concatenate([best_scores, queries @ chunk.T], axis=1)
+        rows = np.concatenate([
+            best_rows,
+            np.broadcast_to(np.arange(row_offset + start, row_offset + start + chunk.shape[0]), (n, chunk.shape[0]))
+        ], axis=1)
+        if scores.shape[1] > k:
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, keep, axis=1)
+            rows = np.take_along_axis(rows, keep, axis=1)
+        best_scores, best_rows = scores, rows
+    return best_scores, best_rows
+
+
+class KnnIntentIndex:
+    """Cosine kNN over a memory-mapped example matrix plus runtime additions"""
+
+    def __init__(self, index_dir: str, encoder: SentenceEncoder, k: int = 10, temperature: float = 0.05):
+        """
+        Args:
+            index_dir: Directory written by build_index
+            encoder: Encoder the index was built with
+            k: Neighbours voting per utterance
+            temperature: Softmax temperature over neighbour similarities
+        """
+        self.index_dir = index_dir
+        self.encoder = encoder
+        self.k = k
+        self.temperature = temperature
+        self.embeddings = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        if self.embeddings.shape[1] != encoder.dim:
+            raise ValueError(f"Index has dimension {self.embeddings.shape[1]}, encoder {encoder.dim}")
+        with open(os.path.join(index_dir, LABELS_FILE), "r") as f:
+            labels = json.load(f)
+
+        # Label ids are append-only, so concurrent queries never see an id change meaning
+        self.base_labels = frozenset(labels)
+        self.label_names: List[str] = sorted(self.base_labels)
+        self._label_ids = {name: i for i, name in enumerate(self.label_names)}
+        self._intent_for_label: Callable[[str], str] = lambda label: label
+        self._label_intents: List[str] = list(self.label_names)
+        self.base_label_ids = np.array([self._label_ids[label] for label in labels], dtype=np.int64)
+
+        # (embeddings, label ids, examples, normalized text -> label id), replaced as a whole on every addition
+        self._added: Tuple[np.ndarray, np.ndarray, List[Dict], Dict[str, int]] = (
+            np.zeros((0, encoder.dim), dtype=np.float32), np.zeros(0, dtype=np.int64), [], {}
+        )
+        self._lock = threading.Lock()
+        self._load_added_examples()
+
+    def _load_added_examples(self):
+        path = os.path.join(self.index_dir, ADDED_EXAMPLES_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            examples = [json.loads(line) for line in f if line.strip()]
+        if examples:
+            self.add_examples([(e["text"], e["label"]) for e in examples], persist=False)
+            logger.info(f"Loaded {len(examples)} runtime intent examples from {path}")
+
+    def _label_id(self, label: str) -> int:
+        if label not in self._label_ids:
+            self._label_ids[label] = len(self.label_names)
+            self.label_names.append(label)
+            self._label_intents.append(self._intent_for_label(label))
+        return self._label_ids[label]
+
+    def set_intent_mapping(self, intent_for_label: Callable[[str], str]):
+        """Map index labels (Banking77 names or application intents) to application intents"""
+        with self._lock:
+            self._intent_for_label = intent_for_label
+            self._label_intents = [intent_for_label(label) for label in self.label_names]
+
+    def add_examples(self, examples: List[Tuple[str, str]], persist: bool = True) -> int:
+        """
+        Add labelled examples; they are used by the next query
+
+        Args:
+            examples: (text, label) pairs
+            persist: Append them to added_examples.jsonl
+
+        Returns:
+            Number of runtime examples after the addition
+        """
+        embeddings = self.encoder.encode([text for text, _ in examples])
+        with self._lock:
+            label_ids = np.array([self._label_id(label) for _, label in examples], dtype=np.int64)
+            added_embeddings, added_ids, added_examples, exact = self._added
+            new_examples = added_examples + [{"text": text, "label": label} for text, label in examples]
+            exact = dict(exact)
+            for (text, _), label_id in zip(examples, label_ids.tolist()):
+                exact[normalize(text)] = label_id
+            self._added = (
+                np.concatenate([added_embeddings, embeddings]),
+                np.concatenate([added_ids, label_ids]),
+                new_examples,
+                exact,
+            )
+            if persist:
+                with open(os.path.join(self.index_dir, ADDED_EXAMPLES_FILE), "a", encoding="utf-8") as f:
+                    for text, label in examples:
+                        f.write(json.dumps({"text": text, "label": label}) + "\n")
+        return len(new_examples)
+
+    @property
+    def added_examples(self) -> List[Dict]:
+        return list(self._added[2])
+
+    def search(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest examples of each query
+
+        Returns:
+            (similarities, label ids), each (n, <=k), most similar first
+        """
+        added_embeddings, added_ids, _, _ = self._added
+        base_size = self.embeddings.shape[0]
+        scores, rows = top_k_rows(queries, self.embeddings, self.k)
+        scores, rows = top_k_rows(queries, added_embeddings, self.k, scores, rows, row_offset=base_size)
+        order = np.argsort(-scores, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        rows = np.take_along_axis(rows, order, axis=1)
+        is_added = rows >= base_size
+        label_ids = np.where(
+            is_added,
+            added_ids[np.where(is_added, rows - base_size, 0)] if len(added_ids) else 0,
+            self.base_label_ids[np.where(is_added, 0, rows)]
+        )
+        return scores, label_ids
+
+    def rank(self, texts: List[str], top_k: int) -> List[List[Tuple[str, float]]]:
+        """
+        Classify texts by similarity-weighted neighbour votes
+
+        Neighbour weights are a softmax of similarity / temperature, summed
+        per application intent, so confidences are probabilities comparable
+        to the transformer's. Texts equal to an added example (after
+        normalization) get that example's intent with probability 1.
+
+        Returns:
+            Top top_k (intent, probability) pairs per text
+        """
+        exact = self._added[3]
+        label_intents = self._label_intents
+        ranked: List[Optional[List[Tuple[str, float]]]] = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            label_id = exact.get(normalize(text))
+            if label_id is None:
+                pending.append(i)
+            else:
+                ranked[i] = [(label_intents[label_id], 1.0)]
+        if not pending:
+            return ranked
+
+        scores, label_ids = self.search(self.encoder.encode([texts[i] for i in pending]))
+        weights = np.exp((scores - scores[:, :1]) / self.temperature)
+        weights /= weights.sum(axis=1, keepdims=True)
+        for i, row_weights, row_labels in zip(pending, weights, label_ids):
+            votes: Dict[str, float] = {}
+            for weight, label in zip(row_weights.tolist(), row_labels.tolist()):
+                intent = label_intents[label]
+                votes[intent] = votes.get(intent, 0.0) + weight
+            ranked[i] = sorted(votes.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return ranked
+
+    def get_stats(self) -> Dict:
+        """Return index sizes and settings"""
+        return {
+            "encoder": self.encoder.model_name,
+            "index_dir": self.index_dir,
+            "base_examples": int(self.embeddings.shape[0]),
+            "added_examples": len(self._added[2]),
+            "labels": len(self.label_names),
+            "k": self.k,
+            "temperature": self.temperature,
+        }
@@ -0,0 +1,235 @@
+"""
+Parallel chunked transcription for long recordings
+
+Long clips are split at VAD-detected pauses into overlapping chunks that
+fit one Whisper window, transcribed in parallel on a process pool, and
+stitched back together with absolute timestamps. Each worker keeps one
+Whisper model; the pool is sized so its copies fit the Whisper memory budget
+and is reserved against it, so LRU eviction accounts for them.
+"""
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.audio_decoder import SAMPLE_RATE
+from app.services.quantization import can_quantize, quantize_dynamic_int8
+from app.services.vad import FRAME_LENGTH, speech_frames
+from app.services.whisper_registry import WhisperModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Per-process model cache for pool workers (at most one model each)
+_worker_models: Dict[str, object] = {}
+
+# Whisper registry reservation key for the pool's model copies
+POOL_RESERVATION = "long-audio-pool"
+
+
+def _init_worker(threads: int):
+    """Pool initializer: keep each worker to its share of the cores"""
+    import torch
+    torch.set_num_threads(threads)
+
+
+def _transcribe_chunk(model_name: str, audio: np.ndarray, language: Optional[str], decode_options: dict) -> dict:
+    """Transcribe one chunk inside a pool worker"""
+    import whisper
+    if model_name not in _worker_models:
+        _worker_models.clear()  # Bound each worker to one resident model
+        model = whisper.load_model(model_name)
+        if settings.STT_QUANTIZE_INT8 and can_quantize(model.device):
+            model, _ = quantize_dynamic_int8(model, f"whisper-{model_name}")
+        _worker_models[model_name] = model
+    # Stitching needs segment timestamps whatever the profile asks for
+    options = dict(decode_options, without_timestamps=False)
+    result = _worker_models[model_name].transcribe(
+        audio,
+        language=language,
+        task="transcribe",
+        **options
+    )
+    return {
+        "language": result.get("language", language),
+        "segments": result.get("segments", []),
+    }
+
+
+def split_on_pauses(audio: np.ndarray, max_seconds: float, overlap_seconds: float) -> List[Tuple[int, int, int, int]]:
+    """
+    Split audio into chunks no longer than max_seconds, cutting in pauses
+
+    Each cut is placed in the longest silent run within the last third of the
+    window; if there is none, the chunk is cut at the window edge. Chunks are
+    extended by overlap_seconds on each side so words at the cut are not lost.
+
+    Args:
+        audio: 16 kHz mono float32 samples
+        max_seconds: Maximum chunk length including overlap
+        overlap_seconds: Audio shared with each neighbouring chunk
+
+    Returns:
+        List of (start, end, core_start, core_end) sample offsets. The core
+        range excludes the overlap and tiles the clip without gaps.
+    """
+    flags = speech_frames(audio, settings.STT_VAD_ENERGY_THRESHOLD_DB, settings.STT_VAD_MAX_ZCR)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    window_frames = max(1, (int(max_seconds * SAMPLE_RATE) - 2 * overlap) // FRAME_LENGTH)
+    n_frames = len(flags)
+
+    cuts = [0]
+    position = 0
+    while n_frames - position > window_frames:
+        search_from = position + window_frames * 2 // 3
+        search_to = position + window_frames
+        cut = search_to
+        best_run = 0
+        run_start = None
+        for frame in range(search_from, search_to + 1):
+            silent = frame < search_to and not flags[frame]
+            if silent and run_start is None:
+                run_start = frame
+            elif not silent and run_start is not None:
+                if frame - run_start > best_run:
+                    best_run = frame - run_start
+                    cut = (run_start + frame) // 2
+                run_start = None
+        cuts.append(cut)
+        position = cut
+    cuts = [c * FRAME_LENGTH for c in cuts] + [len(audio)]
+
+    chunks = []
+    for core_start, core_end in zip(cuts[:-1], cuts[1:]):
+        chunks.append((max(0, core_start - overlap), min(len(audio), core_end + overlap), core_start, core_end))
+    return chunks
+
+
+def stitch_segments(chunk_results: List[dict], chunks: List[Tuple[int, int, int, int]]) -> List[dict]:
+    """
+    Merge per-chunk segments into one timeline
+
+    Segment times are shifted by the chunk offset. A segment is kept only by
+    the chunk whose core range contains its midpoint, which drops the
+    duplicate transcription of the overlap.
+    """
+    segments = []
+    for result, (start, _, core_start, core_end) in zip(chunk_results, chunks):
+        offset = start / SAMPLE_RATE
+        for segment in result["segments"]:
+            seg_start = segment["start"] + offset
+            seg_end = segment["end"] + offset
+            midpoint = (seg_start + seg_end) / 2 * SAMPLE_RATE
+            if core_start <= midpoint < core_end:
+                segments.append({
+                    "id": len(segments),
+                    "start": round(seg_start, 2),
+                    "end": round(seg_end, 2),
+                    "text": segment["text"],
+                    "avg_logprob": segment.get("avg_logprob"),
+                    "no_speech_prob": segment.get("no_speech_prob"),
+                })
+    return segments
+
+
+class LongAudioTranscriber:
+    """Transcribe long recordings across a pool of worker processes"""
+
+    def __init__(self, registry: Optional[WhisperModelRegistry] = None):
+        """
+        Args:
+            registry: Whisper registry whose memory budget covers the pool's model copies
+        """
+        self.registry = registry
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+        self._model_bytes = 0  # Largest model the pool has been sized for
+        self._lock = threading.Lock()  # Guards the pool; request threads share it
+
+    def _get_pool(self, model_name: str) -> ProcessPoolExecutor:
+        """
+        Start the pool, or replace it with a smaller one when a larger model no longer fits the budget
+
+        Call with the lock held. A replaced pool finishes the chunks already
+        submitted to it before its workers exit.
+        """
+        workers = settings.STT_LONG_AUDIO_WORKERS or max(1, multiprocessing.cpu_count() // 2)
+        if self.registry is not None:
+            model_bytes = max(self._model_bytes, self.registry.model_bytes(model_name))
+            budget_workers = max(1, self.registry.memory_budget_bytes // model_bytes)
+            if budget_workers < workers:
+                logger.info(f"Long-audio pool limited to {budget_workers} workers by STT_MODEL_MEMORY_BUDGET_MB")
+            workers = min(workers, budget_workers)
+            self._model_bytes = model_bytes
+            if self._pool is not None and workers < self._workers:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+        if self._pool is None:
+            threads = max(1, multiprocessing.cpu_count() // workers)
+            logger.info(f"Starting long-audio pool with {workers} workers x {threads} threads")
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,)
+            )
+            self._workers = workers
+        if self.registry is not None:
+            self.registry.reserve(POOL_RESERVATION, self._workers * self._model_bytes)
+        return self._pool
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        model_name: str,
+        language: Optional[str] = None,
+        decode_options: Optional[dict] = None
+    ) -> dict:
+        """
+        Transcribe a long clip in parallel chunks
+
+        Args:
+            audio: 16 kHz mono float32 samples
+            model_name: Whisper model size or checkpoint path
+            language: Optional language code
+            decode_options: Keyword arguments for whisper's transcribe (a decoding profile)
+
+        Returns:
+            Dictionary with 'text', 'language', 'segments' (absolute timestamps) and 'chunks'
+        """
+        chunks = split_on_pauses(audio, settings.STT_LONG_CHUNK_SECONDS, settings.STT_LONG_OVERLAP_SECONDS)
+        with self._lock:
+            # Submitting under the lock keeps another request from replacing the pool in between
+            pool = self._get_pool(model_name)
+            futures = [
+                pool.submit(_transcribe_chunk, model_name, audio[start:end], language, decode_options or {})
+                for start, end, _, _ in chunks
+            ]
+        chunk_results = [future.result() for future in futures]
+
+        segments = stitch_segments(chunk_results, chunks)
+        languages = Counter(result["language"] for result in chunk_results if result["language"])
+        return {
+            "text": " ".join(segment["text"].strip() for segment in segments).strip(),
+            "language": languages.most_common(1)[0][0] if languages else (language or "en"),
+            "segments": segments,
+            "chunks": len(chunks),
+        }
+
+    def shutdown(self):
+        """Stop the worker processes (application shutdown: queued chunks are cancelled)"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                self._workers = 0
+                if self.registry is not None:
+                    self.registry.reserve(POOL_RESERVATION, 0)
+
+
+# Global instance; speech_to_text attaches its Whisper registry
+long_audio_transcriber = LongAudioTranscriber()
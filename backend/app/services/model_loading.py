@@ -0,0 +1,107 @@
+"""
+Background model loading
+
+Models are loaded on a daemon thread started from the application lifespan,
+so the first request does not pay for loading them and the server accepts
+traffic immediately. Services keep answering with their fallback path (rule
+based intents) until their loader reports ready. Each loader
+records its state and load time for /health.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+NOT_STARTED = "not_started"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+UNAVAILABLE = "unavailable"  # Dependency not installed; the service runs without a model
+
+
+class BackgroundLoader:
+    """Run a service's load function once, in the background or inline"""
+
+    def __init__(self, name: str, load: Callable[[], None], available: bool = True):
+        """
+        Args:
+            name: Model name reported by /health
+            load: Function loading the model(s); exceptions mark the load failed
+            available: False if the model's dependency is missing (nothing to load)
+        """
+        self.name = name
+        self._load = load
+        self.state = NOT_STARTED if available else UNAVAILABLE
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        if not available:
+            self._done.set()
+
+    def _claim(self) -> bool:
+        with self._lock:
+            if self.state != NOT_STARTED:
+                return False
+            self.state = LOADING
+            self._started_at = time.monotonic()
+            return True
+
+    def start(self) -> bool:
+        """
+        Load on a daemon thread
+
+        Returns:
+            False if loading already started (or there is nothing to load)
+        """
+        if not self._claim():
+            return False
+        threading.Thread(target=self._run, name=f"load-{self.name}", daemon=True).start()
+        return True
+
+    def run(self):
+        """Load on the calling thread (scripts, or a service used before startup)"""
+        if self._claim():
+            self._run()
+        else:
+            self._done.wait()
+
+    def _run(self):
+        logger.info(f"Loading {self.name} model...")
+        try:
+            self._load()
+            state, error = READY, None
+        except Exception as e:
+            logger.error(f"Could not load {self.name} model: {e}")
+            state, error = FAILED, str(e)
+        with self._lock:
+            self.state = state
+            self.error = error
+            self.load_seconds = time.monotonic() - self._started_at
+        self._done.set()
+        if state == READY:
+            logger.info(f"{self.name} model ready in {self.load_seconds:.1f}s")
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until loading finished (successfully or not); False on timeout"""
+        return self._done.wait(timeout)
+
+    def get_status(self) -> Dict:
+        """Return the state and load time (elapsed so far while loading)"""
+        with self._lock:
+            load_seconds = self.load_seconds
+            if self.state == LOADING:
+                load_seconds = time.monotonic() - self._started_at
+            return {
+                "state": self.state,
+                "ready": self.state == READY,
+                "load_seconds": round(load_seconds, 2) if load_seconds is not None else None,
+                "error": self.error,
+            }
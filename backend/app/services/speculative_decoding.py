@@ -0,0 +1,208 @@
+"""
+Speculative greedy decoding for Whisper
+
+A small draft model proposes a few tokens at a time and the main model
+checks them all in one decoder pass. Draft tokens are kept only while they
+match the main model's own greedy choice, so the transcript is the same as
+plain greedy decoding while the main decoder runs far fewer times.
+"""
+from typing import Dict, List
+import logging
+
+import torch
+import torch.nn.functional as F
+from whisper.decoding import DecodingResult, DecodingTask
+from whisper.utils import compression_ratio
+
+logger = logging.getLogger(__name__)
+
+
+def can_draft_for(draft_model, main_model) -> bool:
+    """Whether two Whisper models share a tokenizer and mel front end"""
+    return (
+        draft_model is not main_model
+        and draft_model.is_multilingual == main_model.is_multilingual
+        and draft_model.num_languages == main_model.num_languages
+        and draft_model.dims.n_mels == main_model.dims.n_mels
+        and draft_model.dims.n_vocab == main_model.dims.n_vocab
+    )
+
+
+class _CachedDecoder:
+    """A Whisper text decoder with a kv-cache that can be rolled back"""
+
+    def __init__(self, model, audio_features: torch.Tensor):
+        self.model = model
+        self.audio_features = audio_features
+        self.cache, self.hooks = model.install_kv_cache_hooks()
+        # Self-attention caches grow with the text; cross-attention caches hold the audio
+        self.self_attn = [m for block in model.decoder.blocks for m in (block.attn.key, block.attn.value)]
+        self.length = 0
+
+    def forward(self, tokens: List[int]) -> torch.Tensor:
+        """Feed tokens after the cached prefix and return their logits"""
+        decoder = self.model.decoder
+        offset, n_new = self.length, len(tokens)
+        x = torch.tensor([tokens], device=self.audio_features.device)
+        x = decoder.token_embedding(x) + decoder.positional_embedding[offset:offset + n_new]
+        x = x.to(self.audio_features.dtype)
+        # Whisper's own attention aligns the causal mask to the first cached key, which
+        # is only right for one new token at a time; use the rows for these positions
+        mask = decoder.mask[offset:offset + n_new, :offset + n_new]
+        for block in decoder.blocks:
+            x = x + self._self_attention(block.attn, block.attn_ln(x), mask)
+            x = x + block.cross_attn(block.cross_attn_ln(x), self.audio_features, kv_cache=self.cache)[0]
+            x = x + block.mlp(block.mlp_ln(x))
+        x = decoder.ln(x)
+        logits = (x @ torch.transpose(decoder.token_embedding.weight.to(x.dtype), 0, 1)).float()
+        self.length += n_new
+        return logits[0]
+
+    @staticmethod
+    def _self_attention(attn, x: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+        """Masked self-attention over the cached prefix plus the new positions"""
+        # The kv-cache hooks return the keys and values for every position so far
+        q, k, v = attn.query(x), attn.key(x), attn.value(x)
+        q, k, v = (t.view(*t.shape[:2], attn.n_head, -1).permute(0, 2, 1, 3) for t in (q, k, v))
+        out = F.scaled_dot_product_attention(q, k, v, attn_mask=mask.to(q.dtype))
+        return attn.out(out.permute(0, 2, 1, 3).flatten(start_dim=2))
+
+    def truncate(self, length: int):
+        """Forget cached positions from length onwards"""
+        if length < self.length:
+            for module in self.self_attn:
+                if module in self.cache:
+                    self.cache[module] = self.cache[module][:, :length]
+            self.length = length
+
+    def close(self):
+        for hook in self.hooks:
+            hook.remove()
+        self.cache.clear()
+
+
+class SpeculativeDecoder:
+    """Greedy Whisper decoding accelerated by a draft model"""
+
+    def __init__(self, draft_tokens: int = 4):
+        """
+        Args:
+            draft_tokens: Tokens the draft model proposes per verification pass
+        """
+        self.draft_tokens = draft_tokens
+        self.stats = {
+            "decodes": 0,
+            "tokens": 0,
+            "drafted": 0,
+            "accepted": 0,
+            "main_passes": 0,
+            "draft_passes": 0,
+        }
+
+    def _select(self, task: DecodingTask, logits: torch.Tensor, tokens: List[int]):
+        """Apply the task's logit filters and pick the greedy token and its log-probability"""
+        logits = logits[None].clone()
+        for logit_filter in task.logit_filters:
+            logit_filter.apply(logits, torch.tensor([tokens]))
+        token = int(logits[0].argmax())
+        return token, float(F.log_softmax(logits[0].float(), dim=-1)[token])
+
+    @torch.no_grad()
+    def decode(self, main_model, draft_model, mel: torch.Tensor, options) -> DecodingResult:
+        """
+        Decode one mel window, matching whisper.decode with greedy options
+
+        Args:
+            main_model: Whisper model whose output is reproduced
+            draft_model: Smaller Whisper model with the same tokenizer
+            mel: Log-mel spectrogram of one clip, shape (n_mels, frames)
+            options: whisper.DecodingOptions with temperature 0, no beam search and a language
+
+        Returns:
+            whisper DecodingResult
+        """
+        task = DecodingTask(main_model, options)
+        tokenizer = task.tokenizer
+        mel = mel[None].half() if options.fp16 else mel[None]
+        main = _CachedDecoder(main_model, main_model.encoder(mel))
+        draft = _CachedDecoder(draft_model, draft_model.encoder(mel))
+
+        tokens = list(task.initial_tokens)
+        sum_logprobs = 0.0
+        no_speech_prob = float("nan")
+        finished = False
+        try:
+            while not finished:
+                # Draft: catch up on committed tokens, then propose greedily
+                proposals = []
+                draft_input = tokens[draft.length:]
+                budget = min(
+                    self.draft_tokens,
+                    task.sample_len - (len(tokens) - task.sample_begin) - 1,
+                    task.n_ctx - len(tokens)
+                )
+                for _ in range(max(0, budget)):
+                    logits = draft.forward(draft_input)[-1]
+                    self.stats["draft_passes"] += 1
+                    token, _ = self._select(task, logits, tokens + proposals)
+                    proposals.append(token)
+                    if token == tokenizer.eot:
+                        break
+                    draft_input = [token]
+
+                # Verify: one main pass over the unfed tokens and all proposals
+                base = len(tokens)
+                logits = main.forward(tokens[main.length:] + proposals)
+                self.stats["main_passes"] += 1
+                self.stats["drafted"] += len(proposals)
+                if base == len(task.initial_tokens):
+                    probs_at_sot = logits[task.sot_index].float().softmax(dim=-1)
+                    if tokenizer.no_speech is not None:
+                        no_speech_prob = float(probs_at_sot[tokenizer.no_speech])
+
+                # Row `first` holds the prediction after the last committed token
+                first = logits.shape[0] - len(proposals) - 1
+                accepted = 0
+                for i in range(len(proposals) + 1):
+                    token, logprob = self._select(task, logits[first + i], tokens)
+                    tokens.append(token)
+                    sum_logprobs += logprob
+                    generated = len(tokens) - task.sample_begin
+                    if token == tokenizer.eot or generated >= task.sample_len or len(tokens) > task.n_ctx:
+                        finished = True
+                        break
+                    if i == len(proposals) or token != proposals[i]:
+                        break
+                    accepted += 1
+                self.stats["accepted"] += accepted
+
+                # Roll back cache entries for rejected proposals
+                main.truncate(base + accepted)
+                draft.truncate(min(draft.length, base + accepted))
+        finally:
+            main.close()
+            draft.close()
+
+        output = tokens[task.sample_begin:]
+        if tokenizer.eot in output:
+            output = output[:output.index(tokenizer.eot)]
+        text = tokenizer.decode(output).strip()
+        self.stats["decodes"] += 1
+        self.stats["tokens"] += len(tokens) - task.sample_begin
+        return DecodingResult(
+            audio_features=main.audio_features[0],
+            language=options.language,
+            tokens=output,
+            text=text,
+            avg_logprob=sum_logprobs / (len(output) + 1),
+            no_speech_prob=no_speech_prob,
+            temperature=0.0,
+            compression_ratio=compression_ratio(text),
+        )
+
+    def get_stats(self) -> Dict:
+        """Return draft acceptance and pass counts"""
+        stats = dict(self.stats)
+        stats["acceptance_rate"] = stats["accepted"] / stats["drafted"] if stats["drafted"] else 0.0
+        stats["tokens_per_main_pass"] = stats["tokens"] / stats["main_passes"] if stats["main_passes"] else 0.0
+        return stats
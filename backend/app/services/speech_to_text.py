@@ -3,43 +3,166 @@ Speech-to-Text service using Whisper
 """
 import tempfile
 import os
-from typing import Optional
+import math
+import types
+from typing import List, Optional, Union
+import numpy as np
 from app.core.config import settings
+from app.services.audio_decoder import SAMPLE_RATE, audio_decoder
+from app.services.long_audio import long_audio_transcriber
+from app.services.model_loading import BackgroundLoader
+from app.services.quantization import can_quantize, quantization_summary, quantize_dynamic_int8
+from app.services.vad import vad
+from app.services.whisper_registry import WhisperModelRegistry
 import logging
 
 logger = logging.getLogger(__name__)
 
 try:
     import whisper
+    import torch
+    import torch.nn.functional as F
+    from app.services.speculative_decoding import SpeculativeDecoder, can_draft_for
     WHISPER_AVAILABLE = True
 except ImportError:
     WHISPER_AVAILABLE = False
     logger.warning("Whisper not available. Install with: pip install openai-whisper")
 
+# Whisper's default compression-ratio threshold for detecting repetitive output
+COMPRESSION_RATIO_THRESHOLD = 2.4
+
+# Audio covered by one Whisper mel window
+WINDOW_SECONDS = 30
+
+# Whisper's default average log-probability below which decoding is retried hotter
+LOGPROB_THRESHOLD = -1.0
+
+# Initial prompt that primes the decoder with banking vocabulary
+BANKING_PROMPT = (
+    "Voice banking: check my balance, transfer 500 rupees to Rahul, show recent transactions, "
+    "account statement, credit card limit, loan, interest rate, cheque book, auto pay, UPI, "
+    "spending summary."
+)
+
+# Named decoding profiles, from lowest latency to highest accuracy. Only
+# "fast" is primed with BANKING_PROMPT: on short or noisy clips Whisper can
+# copy prompt text into the transcript, which the heavier profiles avoid.
+# condition_on_previous_text applies where a clip spans several Whisper
+# windows (sliding-window and long-audio chunk transcription).
+DECODING_PROFILES = {
+    "fast": {
+        "temperature": (0.0,),
+        "beam_size": None,
+        "best_of": None,
+        "without_timestamps": True,
+        "condition_on_previous_text": False,
+        "initial_prompt": BANKING_PROMPT,
+    },
+    "balanced": {
+        "temperature": (0.0, 0.4, 0.8),
+        "beam_size": None,
+        "best_of": 3,
+        "without_timestamps": True,
+        "condition_on_previous_text": True,
+        "initial_prompt": None,
+    },
+    "accurate": {
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "beam_size": 5,
+        "best_of": 5,
+        "without_timestamps": False,
+        "condition_on_previous_text": True,
+        "initial_prompt": None,
+    },
+}
+
+
+def resolve_profile(profile: Optional[str] = None) -> str:
+    """Validate a decoding profile name, defaulting to STT_DECODING_PROFILE"""
+    profile = profile or settings.STT_DECODING_PROFILE
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile '{profile}'. Choose from: {list(DECODING_PROFILES)}")
+    return profile
+
+
+def _variable_ctx_encoder_forward(self, x):
+    """AudioEncoder.forward that accepts mel inputs shorter than 30 seconds"""
+    x = F.gelu(self.conv1(x))
+    x = F.gelu(self.conv2(x))
+    x = x.permute(0, 2, 1)
+    n_ctx = x.shape[1]
+    assert n_ctx <= self.positional_embedding.shape[0], "audio longer than the encoder context"
+    x = (x + self.positional_embedding[:n_ctx]).to(x.dtype)
+    for block in self.blocks:
+        x = block(x)
+    return self.ln_post(x)
+
+
+def enable_variable_audio_ctx(model):
+    """
+    Let a Whisper model's encoder run over fewer than 1500 audio frames
+    
+    Full-length inputs produce exactly the same output as the stock encoder.
+    """
+    if not getattr(model.encoder, "variable_audio_ctx", False):
+        model.encoder.forward = types.MethodType(_variable_ctx_encoder_forward, model.encoder)
+        model.encoder.variable_audio_ctx = True
+    return model
+
+
 class SpeechToTextService:
     """Service for converting speech to text using Whisper"""
     
     def __init__(self):
-        self.model = None
         self.model_name = settings.WHISPER_MODEL
+        self.registry = WhisperModelRegistry(self._load_whisper, settings.STT_MODEL_MEMORY_BUDGET_MB)
+        long_audio_transcriber.registry = self.registry  # Pool model copies count against the budget
+        self.stats = {
+            "short_utterance_decodes": 0,
+            "short_utterance_fallbacks": 0,
+            "cascade_draft_accepted": 0,
+            "cascade_escalated": 0,
+            "cascade_too_long": 0,
+        }
+        self.quantization = {}
+        self.speculative = SpeculativeDecoder(settings.STT_SPECULATIVE_DRAFT_TOKENS) if WHISPER_AVAILABLE else None
+        # Started from the application lifespan; requests for the default model
+        # that arrive mid-load wait on the same registry slot instead of loading it again
+        self.loader = BackgroundLoader(f"whisper-{self.model_name}", self.load_model, available=WHISPER_AVAILABLE)
+    
+    def _load_whisper(self, name: str):
+        """Registry loader: a model size name or a checkpoint path"""
+        model = whisper.load_model(name)
+        if settings.STT_QUANTIZE_INT8:
+            if can_quantize(model.device):
+                model, self.quantization[name] = quantize_dynamic_int8(model, f"whisper-{name}")
+            else:
+                logger.warning(f"STT_QUANTIZE_INT8 ignored for whisper-{name}: int8 kernels are CPU-only")
+        return enable_variable_audio_ctx(model)
     
     def load_model(self):
-        """Load Whisper model"""
+        """Load the default Whisper model"""
         if not WHISPER_AVAILABLE:
             logger.warning("Whisper not installed. Text input will be used directly.")
             return
-        if self.model is None:
-            logger.info(f"Loading Whisper model: {self.model_name}")
-            self.model = whisper.load_model(self.model_name)
-            logger.info("Whisper model loaded successfully")
+        with self.registry.acquire(self.model_name):
+            pass
     
-    def transcribe(self, audio_file_path: str, language: Optional[str] = None) -> dict:
+    def transcribe(
+        self,
+        audio: Union[str, np.ndarray],
+        language: Optional[str] = None,
+        model_name: Optional[str] = None,
+        profile: Optional[str] = None
+    ) -> dict:
         """
-        Transcribe audio file to text
+        Transcribe audio to text
         
         Args:
-            audio_file_path: Path to audio file
+            audio: Path to audio file or 16 kHz mono float32 array
             language: Optional language code (e.g., 'en', 'hi')
+            model_name: Optional Whisper model override (must be allowed)
+            profile: Optional decoding profile ('fast', 'balanced', 'accurate')
         
         Returns:
             Dictionary with 'text' and 'language' keys
@@ -47,16 +170,43 @@ class SpeechToTextService:
         if not WHISPER_AVAILABLE:
             raise Exception("Whisper not installed. Please use text input or install: pip install openai-whisper")
         
-        if self.model is None:
-            self.load_model()
+        if isinstance(audio, np.ndarray):
+            audio = self.prepare_audio(audio)
+        
+        if (settings.STT_SHORT_UTTERANCE_MODE and isinstance(audio, np.ndarray)
+                and len(audio) <= settings.STT_SHORT_UTTERANCE_MAX_SECONDS * whisper.audio.SAMPLE_RATE):
+            return self.transcribe_batch([audio], [language], [model_name], [profile])[0]
+        return self._transcribe_prepared(audio, language, model_name, profile)
+    
+    def _transcribe_prepared(
+        self,
+        audio: Union[str, np.ndarray],
+        language: Optional[str],
+        model_name: Optional[str],
+        profile: Optional[str]
+    ) -> dict:
+        """Sliding-window or parallel long-audio transcription of a clip that already went through VAD"""
+        name = self.registry.resolve(model_name, language)
+        options = DECODING_PROFILES[resolve_profile(profile)]
+        
+        if (settings.STT_LONG_AUDIO_ENABLED and isinstance(audio, np.ndarray)
+                and len(audio) > settings.STT_LONG_AUDIO_THRESHOLD_SECONDS * SAMPLE_RATE):
+            try:
+                return long_audio_transcriber.transcribe(audio, name, language, options)
+            except Exception as e:
+                logger.error(f"Error transcribing long audio: {str(e)}")
+                raise Exception(f"Transcription failed: {str(e)}")
         
         try:
             # Transcribe audio
-            result = self.model.transcribe(
-                audio_file_path,
-                language=language,
-                task="transcribe"
-            )
+            with self.registry.acquire(name) as model:
+                result = model.transcribe(
+                    audio,
+                    language=language,
+                    task="transcribe",
+                    fp16=model.device.type == "cuda",
+                    **options
+                )
             
             return {
                 "text": result["text"].strip(),
@@ -67,13 +217,329 @@ class SpeechToTextService:
             logger.error(f"Error transcribing audio: {str(e)}")
             raise Exception(f"Transcription failed: {str(e)}")
     
-    def transcribe_bytes(self, audio_bytes: bytes, language: Optional[str] = None) -> dict:
+    def prepare_audio(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Trim silence and validate speech length before the model sees the clip
+        
+        Raises:
+            NoSpeechDetected: The clip contains no speech
+            AudioTooLong: The speech exceeds MAX_AUDIO_DURATION
+        """
+        if not settings.STT_VAD_ENABLED:
+            return audio
+        return vad.trim(audio)
+    
+    def transcribe_batch(
+        self,
+        audios: List[np.ndarray],
+        languages: List[Optional[str]],
+        model_names: Optional[List[Optional[str]]] = None,
+        profiles: Optional[List[Optional[str]]] = None
+    ) -> List[dict]:
+        """
+        Transcribe several clips with one padded Whisper forward pass per language, model and profile
+        
+        Args:
+            audios: 16 kHz mono float32 arrays
+            languages: Optional language code per clip
+            model_names: Optional Whisper model override per clip
+            profiles: Optional decoding profile per clip
+        
+        Returns:
+            List of transcription dictionaries, one per clip
+        
+        Clips are expected to have been through prepare_audio() already.
+        """
+        if not WHISPER_AVAILABLE:
+            raise Exception("Whisper not installed. Please use text input or install: pip install openai-whisper")
+        
+        model_names = model_names or [None] * len(audios)
+        profiles = profiles or [None] * len(audios)
+        results: List[Optional[dict]] = [None] * len(audios)
+        groups = {}
+        for index, (audio, language, model_name, profile) in enumerate(zip(audios, languages, model_names, profiles)):
+            if len(audio) > whisper.audio.N_SAMPLES:
+                # Longer than one window - needs the sliding-window transcribe (already trimmed by VAD)
+                results[index] = self._transcribe_prepared(audio, language, model_name, profile)
+            else:
+                name = self.registry.resolve(model_name, language)
+                groups.setdefault((language, name, resolve_profile(profile)), []).append(index)
+        
+        for (language, name, profile), indices in groups.items():
+            clips = [audios[i] for i in indices]
+            decoded = self._decode_cascade(clips, language, name, profile)
+            for index, clip, result in zip(indices, clips, decoded):
+                results[index] = self._format_decoding(clip, result, language)
+        
+        return results
+    
+    def _decode_cascade(self, clips: List[np.ndarray], language: Optional[str], name: str, profile: str) -> list:
+        """
+        Decode clips with the small cascade model first, escalating uncertain ones
+        
+        A draft result is kept when its average log-probability and no-speech
+        probability pass the configured thresholds; anything else, and any clip
+        longer than STT_CASCADE_MAX_SECONDS, is decoded by the requested model.
+        """
+        decoded = [None] * len(clips)
+        
+        if settings.STT_CASCADE_ENABLED and settings.STT_CASCADE_DRAFT_MODEL != name:
+            max_samples = settings.STT_CASCADE_MAX_SECONDS * whisper.audio.SAMPLE_RATE
+            eligible = [i for i, clip in enumerate(clips) if len(clip) <= max_samples]
+            self.stats["cascade_too_long"] += len(clips) - len(eligible)
+            
+            if eligible:
+                with self.registry.acquire(settings.STT_CASCADE_DRAFT_MODEL) as draft_model:
+                    drafts = self._decode_clips(draft_model, [clips[i] for i in eligible], language, profile)
+                for i, result in zip(eligible, drafts):
+                    if (result.avg_logprob >= settings.STT_CASCADE_MIN_LOGPROB
+                            and result.no_speech_prob <= settings.STT_CASCADE_MAX_NO_SPEECH_PROB):
+                        decoded[i] = result
+                        self.stats["cascade_draft_accepted"] += 1
+                    else:
+                        self.stats["cascade_escalated"] += 1
+        
+        pending = [i for i, result in enumerate(decoded) if result is None]
+        if pending:
+            with self.registry.acquire(name) as model:
+                for i, result in zip(pending, self._decode_clips(model, [clips[i] for i in pending], language, profile)):
+                    decoded[i] = result
+        return decoded
+    
+    def _decode_clips(self, model, clips: List[np.ndarray], language: Optional[str], profile: str) -> list:
+        """
+        Decode clips of at most 30 seconds, using short-utterance mode when enabled
+        
+        Clips whose reduced-context result looks unreliable are decoded again
+        with full 30 s padding. Without a language, each clip's language is
+        detected on the full window first, since Whisper's detection cannot
+        run on reduced-context features.
+        """
+        audio_ctx = None
+        if settings.STT_SHORT_UTTERANCE_MODE:
+            duration = max(len(clip) for clip in clips) / whisper.audio.SAMPLE_RATE
+            if duration <= settings.STT_SHORT_UTTERANCE_MAX_SECONDS:
+                audio_ctx = self.audio_ctx_for(duration, model)
+        
+        if audio_ctx is not None and language is None:
+            detected = self.detect_languages(model, clips)
+            decoded = [None] * len(clips)
+            for clip_language in set(detected):
+                indices = [i for i, code in enumerate(detected) if code == clip_language]
+                for i, result in zip(indices, self._decode_clips(model, [clips[i] for i in indices], clip_language, profile)):
+                    decoded[i] = result
+            return decoded
+        
+        decoded = self._decode(model, clips, language, profile, audio_ctx)
+        if audio_ctx is None:
+            return decoded
+        
+        for i, result in enumerate(decoded):
+            self.stats["short_utterance_decodes"] += 1
+            if (result.avg_logprob < settings.STT_SHORT_FALLBACK_LOGPROB
+                    or result.compression_ratio > COMPRESSION_RATIO_THRESHOLD):
+                # Reduced context hurt accuracy - redo with full 30 s padding
+                self.stats["short_utterance_fallbacks"] += 1
+                decoded[i] = self._decode(model, [clips[i]], language, profile)[0]
+        return decoded
+    
+    def detect_languages(self, model, clips: List[np.ndarray]) -> List[str]:
+        """
+        Detect each clip's language on a full 30 s mel, as whisper.transcribe does
+        
+        Returns:
+            Language code per clip
+        """
+        enable_variable_audio_ctx(model)
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), model.dims.n_mels)
+            for clip in clips
+        ]).to(model.device)
+        if model.device.type == "cuda":
+            mel = mel.half()
+        _, probabilities = model.detect_language(mel)
+        return [max(clip_probabilities, key=clip_probabilities.get) for clip_probabilities in probabilities]
+    
+    def audio_ctx_for(self, duration: float, model) -> int:
+        """
+        Choose the encoder context (in 20 ms audio frames) for a clip duration
+        
+        Args:
+            duration: Clip duration in seconds
+            model: Whisper model the clip will be encoded with
+        
+        Returns:
+            Number of encoder positions, aligned and clamped to the model's context
+        """
+        n_audio_ctx = model.dims.n_audio_ctx
+        frames = math.ceil(duration * whisper.audio.FRAMES_PER_SECOND / 2)
+        frames += settings.STT_SHORT_CTX_MARGIN
+        align = settings.STT_SHORT_CTX_ALIGN
+        frames = math.ceil(frames / align) * align
+        return max(settings.STT_SHORT_MIN_AUDIO_CTX, min(frames, n_audio_ctx))
+    
+    def _decode(
+        self,
+        model,
+        clips: List[np.ndarray],
+        language: Optional[str],
+        profile: str = "fast",
+        audio_ctx: Optional[int] = None
+    ):
+        """
+        Run Whisper's decoder over a batch of clips of at most 30 seconds
+        
+        Clips whose result looks degenerate are retried at the profile's next
+        fallback temperature, like whisper.transcribe does.
+        
+        Args:
+            model: Whisper model
+            clips: 16 kHz mono float32 arrays
+            language: Optional language code shared by the batch
+            profile: Decoding profile name
+            audio_ctx: Encoder positions to use (None pads to the full 30 s window)
+        
+        Returns:
+            List of whisper DecodingResult objects
+        """
+        enable_variable_audio_ctx(model)
+        n_samples = whisper.audio.N_SAMPLES
+        if audio_ctx is not None:
+            n_samples = audio_ctx * 2 * whisper.audio.HOP_LENGTH
+        
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(clip, n_samples), model.dims.n_mels)
+            for clip in clips
+        ]).to(model.device)
+        profile_options = DECODING_PROFILES[profile]
+        temperatures = profile_options["temperature"]
+        
+        try:
+            results = self._run_decode(model, mel, self._decoding_options(profile_options, temperatures[0], language, audio_ctx))
+            for temperature in temperatures[1:]:
+                retry = [
+                    i for i, result in enumerate(results)
+                    if result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+                ]
+                if not retry:
+                    break
+                options = self._decoding_options(profile_options, temperature, language, audio_ctx)
+                for i, result in zip(retry, self._run_decode(model, mel[retry], options)):
+                    results[i] = result
+            return results
+        except Exception as e:
+            logger.error(f"Error transcribing batch: {str(e)}")
+            raise Exception(f"Transcription failed: {str(e)}")
+    
+    def _run_decode(self, model, mel, options) -> list:
+        """Decode a mel batch, one clip at a time when beam search or best-of sampling is on"""
+        if (settings.STT_SPECULATIVE_ENABLED and len(mel) == 1 and options.temperature == 0
+                and options.beam_size is None and options.language is not None):
+            with self.registry.acquire(settings.STT_SPECULATIVE_DRAFT_MODEL) as draft_model:
+                if can_draft_for(draft_model, model):
+                    return [self.speculative.decode(model, draft_model, mel[0], options)]
+        if (options.beam_size or options.best_of or 1) > 1 and len(mel) > 1:
+            # whisper's grouped decoding only broadcasts audio features for a single clip
+            return [whisper.decode(model, mel[i:i + 1], options)[0] for i in range(len(mel))]
+        return whisper.decode(model, mel, options)
+    
+    @staticmethod
+    def _decoding_options(profile_options: dict, temperature: float, language: Optional[str], audio_ctx: Optional[int]):
+        """Build DecodingOptions for one temperature of a profile"""
+        return whisper.DecodingOptions(
+            language=language,
+            task="transcribe",
+            temperature=temperature,
+            beam_size=profile_options["beam_size"] if temperature == 0 else None,
+            best_of=profile_options["best_of"] if temperature > 0 else None,
+            prompt=profile_options["initial_prompt"],
+            without_timestamps=profile_options["without_timestamps"] or audio_ctx is not None,
+            fp16=torch.cuda.is_available()
+        )
+    
+    def _format_decoding(self, clip: np.ndarray, result, language: Optional[str]) -> dict:
+        """Convert a DecodingResult into the transcribe() response shape"""
+        text = result.text.strip()
+        return {
+            "text": text,
+            "language": result.language or language or "en",
+            "segments": [{
+                "id": 0,
+                "start": 0.0,
+                "end": len(clip) / whisper.audio.SAMPLE_RATE,
+                "text": text,
+                "avg_logprob": result.avg_logprob,
+                "no_speech_prob": result.no_speech_prob,
+                "compression_ratio": result.compression_ratio,
+                "temperature": result.temperature,
+            }] if text else []
+        }
+    
+    def get_load_status(self) -> dict:
+        """Loading state and load time of the default model, and whether it is still resident"""
+        status = self.loader.get_status()
+        status["model"] = self.model_name
+        status["resident"] = WHISPER_AVAILABLE and self.registry.is_loaded(self.model_name)
+        return status
+    
+    def get_stats(self) -> dict:
+        """Return STT service metrics, including per-tier cascade hit rates"""
+        stats = dict(self.stats)
+        stats["vad"] = vad.get_stats()
+        stats["models"] = self.registry.get_stats()
+        stats["quantization"] = quantization_summary(self.quantization)
+        cascaded = stats["cascade_draft_accepted"] + stats["cascade_escalated"]
+        stats["cascade_draft_hit_rate"] = stats["cascade_draft_accepted"] / cascaded if cascaded else 0.0
+        stats["cascade_escalation_rate"] = stats["cascade_escalated"] / cascaded if cascaded else 0.0
+        if self.speculative is not None:
+            stats["speculative"] = self.speculative.get_stats()
+        return stats
+    
+    def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        model_name: Optional[str] = None,
+        profile: Optional[str] = None
+    ) -> dict:
         """
         Transcribe audio bytes to text
         
         Args:
             audio_bytes: Audio file bytes
             language: Optional language code
+            model_name: Optional Whisper model override
+            profile: Optional decoding profile
+        
+        Returns:
+            Dictionary with transcription results
+        """
+        if not settings.STT_IN_MEMORY_DECODE:
+            return self.transcribe_bytes_via_tempfile(audio_bytes, language, model_name, profile)
+        
+        try:
+            audio = audio_decoder.decode(audio_bytes)
+        except Exception as e:
+            logger.error(f"Error decoding audio: {str(e)}")
+            raise Exception(f"Audio decoding failed: {str(e)}")
+        
+        return self.transcribe(audio, language, model_name, profile)
+    
+    def transcribe_bytes_via_tempfile(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        model_name: Optional[str] = None,
+        profile: Optional[str] = None
+    ) -> dict:
+        """
+        Transcribe audio bytes by writing them to a temp file for ffmpeg
+        
+        Args:
+            audio_bytes: Audio file bytes
+            language: Optional language code
+            model_name: Optional Whisper model override
+            profile: Optional decoding profile
         
         Returns:
             Dictionary with transcription results
@@ -84,7 +550,7 @@ class SpeechToTextService:
             tmp_file_path = tmp_file.name
         
         try:
-            result = self.transcribe(tmp_file_path, language)
+            result = self.transcribe(tmp_file_path, language, model_name, profile)
             return result
         finally:
             # Clean up temporary file
@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from app.models.transaction import Transaction, TransactionType
+from app.services.keyword_matcher import KeywordMatcher
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,11 @@ SPENDING_CATEGORIES = {
     "other": []
 }
 
+# Categories in table order; "other" is the no-match default
+CATEGORY_MATCHER = KeywordMatcher(
+    [(category, keywords) for category, keywords in SPENDING_CATEGORIES.items() if category != "other"]
+)
+
 
 class SpendingTracker:
     """Track and categorize spending"""
@@ -38,19 +44,35 @@ class SpendingTracker:
         Returns:
             Category name
         """
+        return CATEGORY_MATCHER.first(self._match_text(description, recipient)) or "other"
+    
+    def categorize_transactions(
+        self,
+        descriptions: List[Optional[str]],
+        recipients: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """
+        Categorize many transactions at once
+        
+        Args:
+            descriptions: Transaction descriptions
+            recipients: Recipient names, aligned with descriptions (optional)
+        
+        Returns:
+            Category name per transaction
+        """
+        if recipients is None:
+            recipients = [None] * len(descriptions)
+        texts = [self._match_text(d, r) for d, r in zip(descriptions, recipients)]
+        return [category or "other" for category in CATEGORY_MATCHER.first_many(texts)]
+    
+    @staticmethod
+    def _match_text(description: Optional[str], recipient: Optional[str]) -> str:
+        """Lowercased description and recipient, as matched against category keywords"""
         text = (description or "").lower()
         if recipient:
             text += " " + recipient.lower()
-        
-        # Check each category
-        for category, keywords in SPENDING_CATEGORIES.items():
-            if category == "other":
-                continue
-            for keyword in keywords:
-                if keyword in text:
-                    return category
-        
-        return "other"
+        return text
     
     def get_spending_by_category(
         self,
@@ -94,12 +116,12 @@ class SpendingTracker:
         )
         
         category_totals = {}
+        categories = self.categorize_transactions(
+            [transaction.description for transaction in transactions],
+            [transaction.recipient_name for transaction in transactions]
+        )
         
-        for transaction in transactions:
-            category = self.categorize_transaction(
-                transaction.description,
-                transaction.recipient_name
-            )
+        for transaction, category in zip(transactions, categories):
             category_totals[category] = category_totals.get(category, 0) + transaction.amount
         
         return category_totals
@@ -0,0 +1,182 @@
+"""
+Incremental transcription for streamed audio chunks
+"""
+import asyncio
+from typing import Awaitable, Callable, Optional
+import logging
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.audio_decoder import SAMPLE_RATE, StreamResampler
+from app.services.speech_to_text import resolve_profile
+from app.services.stt_scheduler import stt_scheduler
+from app.services.vad import FRAME_LENGTH, Endpointer, NoSpeechDetected, speech_frames
+
+logger = logging.getLogger(__name__)
+
+# Raw sample encodings accepted for streamed chunks
+CHUNK_ENCODINGS = {
+    "pcm_s16le": ("<i2", 32768.0),
+    "pcm_f32le": ("<f4", 1.0),
+}
+
+# Audio kept before speech onset so the first word is not clipped
+PRE_ROLL_FRAMES = 10
+
+
+class StreamingTranscriber:
+    """Rolling audio buffer with VAD endpointing and partial transcripts"""
+
+    def __init__(self, language: Optional[str] = None, profile: Optional[str] = None):
+        """
+        Args:
+            language: Optional language code
+            profile: Decoding profile for the committed transcript (partials use STT_STREAM_PARTIAL_PROFILE)
+        """
+        self.language = language
+        self.profile = resolve_profile(profile)
+        self.endpointer = Endpointer(
+            threshold_db=settings.STT_VAD_ENERGY_THRESHOLD_DB,
+            silence_ms=settings.STT_STREAM_ENDPOINT_SILENCE_MS,
+            min_speech_ms=settings.STT_STREAM_MIN_SPEECH_MS
+        )
+        self.max_samples = int(settings.STT_STREAM_MAX_SECONDS * SAMPLE_RATE)
+        self.partial_interval = int(settings.STT_STREAM_PARTIAL_INTERVAL_MS * SAMPLE_RATE / 1000)
+        self._partial_task: Optional[asyncio.Task] = None
+        # Kept across utterances: the client's stream is one continuous signal
+        self._resampler: Optional[StreamResampler] = None
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance"""
+        self._chunks = []
+        self._samples = 0
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._last_partial_samples = 0
+        self.endpointer.reset()
+        self.cancel_partial()
+
+    @property
+    def duration(self) -> float:
+        """Buffered audio in seconds"""
+        return self._samples / SAMPLE_RATE
+
+    def add_chunk(self, chunk: bytes, encoding: str = "pcm_s16le", sample_rate: int = SAMPLE_RATE) -> bool:
+        """
+        Append a raw audio chunk to the buffer
+
+        Args:
+            chunk: Raw little-endian samples
+            encoding: 'pcm_s16le' or 'pcm_f32le'
+            sample_rate: Sample rate of the chunk
+
+        Returns:
+            True when the utterance should be committed (trailing silence or buffer full)
+
+        Raises:
+            ValueError: Unknown encoding, invalid sample rate or partial sample
+        """
+        if encoding not in CHUNK_ENCODINGS:
+            raise ValueError(f"Unsupported chunk encoding: {encoding}")
+        if sample_rate <= 0:
+            raise ValueError(f"Invalid chunk sample rate: {sample_rate}")
+        dtype, scale = CHUNK_ENCODINGS[encoding]
+        if len(chunk) % np.dtype(dtype).itemsize:
+            raise ValueError(f"{encoding} chunk of {len(chunk)} bytes is not a whole number of samples")
+        audio = np.frombuffer(chunk, dtype=dtype).astype(np.float32) / scale
+        if self._resampler is None or self._resampler.orig_sr != sample_rate:
+            self._resampler = StreamResampler(sample_rate)
+        audio = self._resampler.process(audio)
+
+        # VAD runs on whole frames; keep the tail for the next chunk
+        audio = np.concatenate([self._remainder, audio])
+        n_whole = len(audio) // FRAME_LENGTH * FRAME_LENGTH
+        frames, self._remainder = audio[:n_whole], audio[n_whole:]
+        if len(frames) == 0:
+            return False
+
+        flags = speech_frames(frames, self.endpointer.threshold_db, settings.STT_VAD_MAX_ZCR)
+        endpoint = self.endpointer.update(flags)
+
+        self._chunks.append(frames)
+        self._samples += len(frames)
+        if not self.endpointer.speech_started:
+            self._trim_pre_roll()
+
+        return endpoint or self._samples >= self.max_samples
+
+    def _trim_pre_roll(self):
+        """Drop leading silence beyond the pre-roll while waiting for speech"""
+        keep = PRE_ROLL_FRAMES * FRAME_LENGTH
+        if self._samples > keep:
+            audio = np.concatenate(self._chunks)[-keep:]
+            self._chunks = [audio]
+            self._samples = len(audio)
+            self._last_partial_samples = 0
+
+    def audio(self) -> np.ndarray:
+        """Return the buffered utterance"""
+        if not self._chunks:
+            return np.zeros(0, dtype=np.float32)
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        return self._chunks[0]
+
+    def partial_due(self) -> bool:
+        """Whether enough new speech arrived for another partial transcript"""
+        return (
+            self.endpointer.speech_started
+            and self._samples - self._last_partial_samples >= self.partial_interval
+            and (self._partial_task is None or self._partial_task.done())
+        )
+
+    def start_partial(self, send: Callable[[dict], Awaitable[None]]):
+        """
+        Transcribe the current buffer in the background and send the result
+
+        Args:
+            send: Coroutine function receiving the partial transcription
+        """
+        self._last_partial_samples = self._samples
+        audio = self.audio().copy()
+
+        async def run():
+            try:
+                result = await stt_scheduler.transcribe(
+                    audio, self.language, profile=settings.STT_STREAM_PARTIAL_PROFILE
+                )
+                await send(result)
+            except asyncio.CancelledError:
+                raise
+            except NoSpeechDetected:
+                pass
+            except Exception as e:
+                logger.warning(f"Partial transcription failed: {str(e)}")
+
+        self._partial_task = asyncio.get_running_loop().create_task(run())
+
+    def cancel_partial(self):
+        """Cancel an in-flight partial transcription"""
+        if self._partial_task is not None and not self._partial_task.done():
+            self._partial_task.cancel()
+        self._partial_task = None
+
+    async def commit(self) -> dict:
+        """
+        Transcribe the buffered utterance and reset for the next one
+
+        Returns:
+            Dictionary with transcription results
+        """
+        self.cancel_partial()
+        audio = self.audio()
+        speech = self.endpointer.speech_started
+        self.reset()
+        empty = {"text": "", "language": self.language or "en", "segments": []}
+        if not speech or len(audio) == 0:
+            return empty
+        try:
+            return await stt_scheduler.transcribe(audio, self.language, profile=self.profile)
+        except NoSpeechDetected:
+            return empty
@@ -0,0 +1,109 @@
+"""
+Micro-batching scheduler for Whisper transcription
+"""
+import asyncio
+from typing import List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.audio_decoder import audio_decoder
+from app.services.batching import MicroBatchScheduler
+from app.services.audio_decoder import SAMPLE_RATE
+from app.services.speech_to_text import WINDOW_SECONDS, resolve_profile, stt_service
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionScheduler(MicroBatchScheduler):
+    """Batch concurrent transcription requests onto the shared Whisper model"""
+
+    def __init__(self):
+        super().__init__(
+            name="stt",
+            batch_fn=self._transcribe_batch,
+            max_batch_size=settings.STT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.STT_BATCH_MAX_WAIT_MS,
+            max_queue_size=settings.STT_BATCH_MAX_QUEUE
+        )
+
+    def _transcribe_batch(self, items: List[Tuple[np.ndarray, Optional[str], Optional[str], str]]) -> List[dict]:
+        """Run one batch through the STT service"""
+        audios = [audio for audio, _, _, _ in items]
+        languages = [language for _, language, _, _ in items]
+        model_names = [model_name for _, _, model_name, _ in items]
+        profiles = [profile for _, _, _, profile in items]
+        return stt_service.transcribe_batch(audios, languages, model_names, profiles)
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        model_name: Optional[str] = None,
+        profile: Optional[str] = None
+    ) -> dict:
+        """
+        Transcribe a decoded clip, batching it with concurrent requests
+
+        Args:
+            audio: 16 kHz mono float32 array
+            language: Optional language code
+            model_name: Optional Whisper model override
+            profile: Optional decoding profile ('fast', 'balanced', 'accurate')
+
+        Returns:
+            Dictionary with transcription results
+        """
+        # Reject unknown models, profiles and non-speech clips before they can fail a whole batch
+        stt_service.registry.resolve(model_name, language)
+        profile = resolve_profile(profile)
+        loop = asyncio.get_running_loop()
+        if not settings.STT_BATCHING_ENABLED:
+            return await loop.run_in_executor(None, stt_service.transcribe, audio, language, model_name, profile)
+        audio = await loop.run_in_executor(None, stt_service.prepare_audio, audio)
+        if len(audio) > WINDOW_SECONDS * SAMPLE_RATE:
+            # Long recordings are chunked across processes; keep them out of the batch worker
+            results = await loop.run_in_executor(
+                None, stt_service.transcribe_batch, [audio], [language], [model_name], [profile]
+            )
+            return results[0]
+        return await self.submit((audio, language, model_name, profile))
+
+    async def transcribe_bytes(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None,
+        model_name: Optional[str] = None,
+        profile: Optional[str] = None
+    ) -> dict:
+        """
+        Decode audio bytes off the event loop and transcribe them
+
+        Args:
+            audio_bytes: Audio file bytes
+            language: Optional language code
+            model_name: Optional Whisper model override
+            profile: Optional decoding profile
+
+        Returns:
+            Dictionary with transcription results
+        """
+        loop = asyncio.get_running_loop()
+        if not settings.STT_BATCHING_ENABLED or not settings.STT_IN_MEMORY_DECODE:
+            stt_service.registry.resolve(model_name, language)
+            profile = resolve_profile(profile)
+            return await loop.run_in_executor(
+                None, stt_service.transcribe_bytes, audio_bytes, language, model_name, profile
+            )
+
+        try:
+            audio = await loop.run_in_executor(None, audio_decoder.decode, audio_bytes)
+        except Exception as e:
+            logger.error(f"Error decoding audio: {str(e)}")
+            raise Exception(f"Audio decoding failed: {str(e)}")
+        return await self.transcribe(audio, language, model_name, profile)
+
+
+# Global instance
+stt_scheduler = TranscriptionScheduler()
@@ -0,0 +1,198 @@
+"""
+Lightweight energy and zero-crossing voice activity detection
+"""
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.audio_decoder import SAMPLE_RATE
+
+FRAME_MS = 30
+FRAME_LENGTH = SAMPLE_RATE * FRAME_MS // 1000
+
+# Frames this far above the energy threshold count as speech whatever their ZCR
+LOUD_MARGIN_DB = 15.0
+
+
+class NoSpeechDetected(ValueError):
+    """Raised when a clip contains no speech"""
+
+
+class AudioTooLong(ValueError):
+    """Raised when the speech in a clip exceeds MAX_AUDIO_DURATION"""
+
+
+def frame_energy_db(audio: np.ndarray, frame_length: int = FRAME_LENGTH) -> np.ndarray:
+    """
+    Compute per-frame RMS energy in dBFS
+
+    Args:
+        audio: Mono float32 samples
+        frame_length: Samples per frame (trailing partial frame is dropped)
+
+    Returns:
+        Array of frame energies in dB
+    """
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+    rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def frame_zero_crossing_rate(audio: np.ndarray, frame_length: int = FRAME_LENGTH) -> np.ndarray:
+    """
+    Compute the fraction of sign changes per frame
+
+    Args:
+        audio: Mono float32 samples
+        frame_length: Samples per frame (trailing partial frame is dropped)
+
+    Returns:
+        Array of zero-crossing rates in [0, 1]
+    """
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    signs = np.signbit(audio[:n_frames * frame_length].reshape(n_frames, frame_length))
+    return np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_length - 1)
+
+
+def speech_frames(
+    audio: np.ndarray,
+    threshold_db: float,
+    max_zcr: Optional[float] = None,
+    frame_length: int = FRAME_LENGTH
+) -> np.ndarray:
+    """
+    Return a boolean speech flag per frame
+
+    A frame is speech when its energy is above the threshold and, if max_zcr is
+    given, its zero-crossing rate is speech-like or it is clearly loud. High-ZCR
+    frames near the threshold are usually hiss or broadband noise.
+    """
+    energy = frame_energy_db(audio, frame_length)
+    flags = energy > threshold_db
+    if max_zcr is not None:
+        zcr = frame_zero_crossing_rate(audio, frame_length)
+        flags &= (zcr <= max_zcr) | (energy > threshold_db + LOUD_MARGIN_DB)
+    return flags
+
+
+class VoiceActivityDetector:
+    """Trim silence and reject non-speech clips before they reach Whisper"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "clips": 0,
+            "rejected_no_speech": 0,
+            "rejected_too_long": 0,
+            "input_seconds": 0.0,
+            "speech_seconds": 0.0,
+        }
+
+    def trim(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Cut leading and trailing silence, keeping a little padding around speech
+
+        Args:
+            audio: 16 kHz mono float32 samples
+
+        Returns:
+            The speech region of the clip
+
+        Raises:
+            NoSpeechDetected: Less than STT_VAD_MIN_SPEECH_MS of speech
+            AudioTooLong: Speech longer than MAX_AUDIO_DURATION seconds
+        """
+        flags = speech_frames(audio, settings.STT_VAD_ENERGY_THRESHOLD_DB, settings.STT_VAD_MAX_ZCR)
+        speech_indices = np.flatnonzero(flags)
+        min_frames = max(1, settings.STT_VAD_MIN_SPEECH_MS // FRAME_MS)
+        input_seconds = len(audio) / SAMPLE_RATE
+
+        if len(speech_indices) < min_frames:
+            self._record(input_seconds, 0.0, "rejected_no_speech")
+            raise NoSpeechDetected("No speech detected in audio")
+
+        padding = settings.STT_VAD_PADDING_MS * SAMPLE_RATE // 1000
+        start = max(0, int(speech_indices[0]) * FRAME_LENGTH - padding)
+        end = min(len(audio), (int(speech_indices[-1]) + 1) * FRAME_LENGTH + padding)
+        speech_seconds = float(end - start) / SAMPLE_RATE
+
+        if speech_seconds > settings.MAX_AUDIO_DURATION:
+            self._record(input_seconds, 0.0, "rejected_too_long")
+            raise AudioTooLong(
+                f"Speech is {speech_seconds:.1f}s long; the limit is {settings.MAX_AUDIO_DURATION}s"
+            )
+
+        self._record(input_seconds, speech_seconds)
+        return audio[start:end]
+
+    def _record(self, input_seconds: float, speech_seconds: float, rejection: Optional[str] = None):
+        with self._lock:
+            self._stats["clips"] += 1
+            self._stats["input_seconds"] += input_seconds
+            self._stats["speech_seconds"] += speech_seconds
+            if rejection:
+                self._stats[rejection] += 1
+
+    def get_stats(self) -> Dict:
+        """Return VAD metrics, including the audio that never reached the model"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["trimmed_seconds"] = stats["input_seconds"] - stats["speech_seconds"]
+        stats["trimmed_ratio"] = (
+            stats["trimmed_seconds"] / stats["input_seconds"] if stats["input_seconds"] else 0.0
+        )
+        return stats
+
+
+class Endpointer:
+    """Track speech onset and trailing silence over a stream of frames"""
+
+    def __init__(self, threshold_db: float, silence_ms: int, min_speech_ms: int):
+        """
+        Args:
+            threshold_db: Frame energy above which a frame counts as speech
+            silence_ms: Trailing silence that ends an utterance
+            min_speech_ms: Speech needed before an endpoint can fire
+        """
+        self.threshold_db = threshold_db
+        self.silence_frames = max(1, silence_ms // FRAME_MS)
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.reset()
+
+    def reset(self):
+        """Forget the current utterance"""
+        self.speech_frames = 0
+        self.trailing_silence = 0
+
+    @property
+    def speech_started(self) -> bool:
+        return self.speech_frames >= self.min_speech_frames
+
+    def update(self, flags: np.ndarray) -> bool:
+        """
+        Feed frame speech flags
+
+        Args:
+            flags: Boolean speech flag per new frame
+
+        Returns:
+            True when speech has started and trailing silence reached the limit
+        """
+        for is_speech in flags:
+            if is_speech:
+                self.speech_frames += 1
+                self.trailing_silence = 0
+            else:
+                self.trailing_silence += 1
+        return self.speech_started and self.trailing_silence >= self.silence_frames
+
+
+# Global instance
+vad = VoiceActivityDetector()
@@ -0,0 +1,260 @@
+"""
+Whisper model residency manager
+
+Keeps several Whisper sizes and language-tuned checkpoints in memory,
+loading them lazily and evicting least-recently-used models when the
+configured memory budget is exceeded. Models are reference counted so a
+model is never evicted while a request is using it. Copies held outside this
+process (the long-audio worker pool) are reserved against the same budget.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+import logging
+
+from app.core.config import settings
+from app.services.quantization import model_size_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def model_memory_bytes(model) -> int:
+    """Estimate the resident size of a torch model, including packed int8 weights"""
+    return model_size_bytes(model)
+
+
+def checkpoint_model_bytes(name: str) -> int:
+    """
+    Size a Whisper model will have once loaded, read from its checkpoint without loading it
+
+    The checkpoint is memory-mapped, so only tensor metadata is read; named
+    models are downloaded first if needed (their pool workers would download
+    them anyway). Weights load as float32 whatever the checkpoint stores.
+
+    Args:
+        name: Model size name or checkpoint path
+    """
+    import torch
+    import whisper
+
+    path = name
+    if name in whisper._MODELS:
+        cache = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+        path = whisper._download(whisper._MODELS[name], os.path.join(cache, "whisper"), False)
+    checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=False)
+    return sum(tensor.numel() * 4 for tensor in checkpoint["model_state_dict"].values())
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, if the platform exposes it"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _ResidentModel:
+    """A registry slot: the model plus its bookkeeping"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.model = None
+        self.size_bytes = 0
+        self.refcount = 0
+        self.load_seconds = 0.0
+        self.last_used = time.monotonic()
+        self.ready = threading.Event()
+        self.error: Optional[Exception] = None
+
+
+class WhisperModelRegistry:
+    """LRU registry of loaded Whisper models with a memory budget"""
+
+    def __init__(self, loader: Callable[[str], object], memory_budget_mb: float):
+        """
+        Args:
+            loader: Function loading a model from a size name or checkpoint path
+            memory_budget_mb: Total size of resident models before LRU eviction
+        """
+        self.loader = loader
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self._models: "OrderedDict[str, _ResidentModel]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}  # Measured size of every model loaded so far
+        self._reserved: Dict[str, int] = {}  # Budget held by models in other processes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "load_failures": 0}
+
+    def resolve(self, model_name: Optional[str] = None, language: Optional[str] = None) -> str:
+        """
+        Pick the model for a request
+
+        Args:
+            model_name: Explicitly requested model size (must be allowed)
+            language: Request language, used to select a language-tuned checkpoint
+
+        Returns:
+            Registry key (model size name or checkpoint path)
+        """
+        if model_name:
+            if model_name not in settings.STT_ALLOWED_MODELS:
+                raise ValueError(f"Model '{model_name}' is not available. Choose from: {settings.STT_ALLOWED_MODELS}")
+            return model_name
+        if language and language in settings.STT_LANGUAGE_MODELS:
+            return settings.STT_LANGUAGE_MODELS[language]
+        return settings.WHISPER_MODEL
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a model is resident and ready"""
+        with self._lock:
+            slot = self._models.get(name)
+            return slot is not None and slot.model is not None
+
+    @contextmanager
+    def acquire(self, name: str):
+        """
+        Lease a model for the duration of a request, loading it if needed
+
+        Args:
+            name: Registry key from resolve()
+
+        Yields:
+            The loaded Whisper model
+        """
+        slot = self._checkout(name)
+        try:
+            yield slot.model
+        finally:
+            with self._lock:
+                slot.refcount -= 1
+                slot.last_used = time.monotonic()
+
+    def _checkout(self, name: str) -> _ResidentModel:
+        """Increment the model's refcount, loading it outside the lock on a miss"""
+        with self._lock:
+            slot = self._models.get(name)
+            if slot is not None:
+                slot.refcount += 1
+                self._models.move_to_end(name)
+                self._stats["hits"] += 1
+                is_loader = False
+            else:
+                slot = _ResidentModel(name)
+                slot.refcount = 1
+                self._models[name] = slot
+                self._stats["misses"] += 1
+                is_loader = True
+
+        if is_loader:
+            self._load(slot)
+        else:
+            slot.ready.wait()
+
+        if slot.error is not None:
+            with self._lock:
+                slot.refcount -= 1
+            raise slot.error
+        return slot
+
+    def _load(self, slot: _ResidentModel):
+        """Load a model into its slot and enforce the memory budget"""
+        logger.info(f"Loading Whisper model: {slot.name}")
+        started = time.monotonic()
+        try:
+            model = self.loader(slot.name)
+        except Exception as e:
+            logger.error(f"Could not load Whisper model {slot.name}: {str(e)}")
+            with self._lock:
+                self._models.pop(slot.name, None)
+                self._stats["load_failures"] += 1
+            slot.error = e
+            slot.ready.set()
+            return
+
+        with self._lock:
+            slot.model = model
+            slot.size_bytes = model_memory_bytes(model)
+            self._sizes[slot.name] = slot.size_bytes
+            slot.load_seconds = time.monotonic() - started
+            self._evict_over_budget()
+        slot.ready.set()
+        logger.info(f"Whisper model {slot.name} loaded ({slot.size_bytes / 1024 ** 2:.0f} MB, {slot.load_seconds:.1f}s)")
+
+    def model_bytes(self, name: str) -> int:
+        """
+        Resident size of a model: measured if it was loaded, else read from its checkpoint
+
+        Args:
+            name: Registry key from resolve()
+        """
+        with self._lock:
+            size = self._sizes.get(name)
+        if size is None:
+            size = checkpoint_model_bytes(name)
+            with self._lock:
+                self._sizes.setdefault(name, size)
+        return size
+
+    def reserve(self, key: str, size_bytes: int):
+        """
+        Count memory held outside this process against the budget, evicting idle models to fit
+
+        Args:
+            key: Reservation name (replaces an earlier reservation with the same key)
+            size_bytes: Bytes reserved (0 removes the reservation)
+        """
+        with self._lock:
+            if size_bytes > 0:
+                self._reserved[key] = size_bytes
+            else:
+                self._reserved.pop(key, None)
+            self._evict_over_budget()
+
+    def _evict_over_budget(self):
+        """Evict idle models, least recently used first, until under budget (lock held)"""
+        resident = sum(slot.size_bytes for slot in self._models.values()) + sum(self._reserved.values())
+        for name in list(self._models):
+            if resident <= self.memory_budget_bytes:
+                break
+            slot = self._models[name]
+            if slot.refcount > 0 or slot.model is None:
+                continue
+            del self._models[name]
+            resident -= slot.size_bytes
+            self._stats["evictions"] += 1
+            logger.info(f"Evicted Whisper model {name} ({slot.size_bytes / 1024 ** 2:.0f} MB)")
+
+        if resident > self.memory_budget_bytes:
+            logger.warning(
+                f"Whisper models use {resident / 1024 ** 2:.0f} MB, over the "
+                f"{self.memory_budget_bytes / 1024 ** 2:.0f} MB budget; all are in use"
+            )
+
+    def get_stats(self) -> Dict:
+        """Return residency metrics"""
+        with self._lock:
+            models = {
+                name: {
+                    "loaded": slot.model is not None,
+                    "size_mb": round(slot.size_bytes / 1024 ** 2, 1),
+                    "in_use": slot.refcount,
+                    "load_seconds": round(slot.load_seconds, 2),
+                }
+                for name, slot in self._models.items()
+            }
+            resident = sum(slot.size_bytes for slot in self._models.values())
+            reserved = {key: round(size / 1024 ** 2, 1) for key, size in self._reserved.items()}
+            stats = dict(self._stats)
+
+        rss = process_rss_bytes()
+        stats.update({
+            "models": models,
+            "resident_mb": round(resident / 1024 ** 2, 1),
+            "reserved_mb": reserved,
+            "budget_mb": round(self.memory_budget_bytes / 1024 ** 2, 1),
+            "process_rss_mb": round(rss / 1024 ** 2, 1) if rss is not None else None,
+        })
+        return stats
@@ -0,0 +1,109 @@
+"""
+Benchmark in-memory audio decoding against the temp-file + ffmpeg path
+
+Usage (from the backend directory):
+    python scripts/benchmark_audio_decoding.py --duration 3 --iterations 50
+    python scripts/benchmark_audio_decoding.py --with-model   # include Whisper inference
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audio_decoder import audio_decoder, SOUNDFILE_AVAILABLE, PYAV_AVAILABLE
+
+
+def make_wav(duration: float, sample_rate: int) -> bytes:
+    """Create a synthetic 16-bit PCM WAV clip (speech-band tone with noise)"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * np.random.randn(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def make_ogg(wav_bytes: bytes) -> bytes:
+    """Re-encode a WAV clip as Ogg Vorbis with libsndfile"""
+    import soundfile as sf
+    audio, sample_rate = sf.read(io.BytesIO(wav_bytes), dtype="float32")
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format="OGG", subtype="VORBIS")
+    return buffer.getvalue()
+
+
+def tempfile_decode(audio_bytes: bytes) -> np.ndarray:
+    """The previous path: write bytes to disk and let ffmpeg decode them"""
+    import whisper
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
+        tmp_file.write(audio_bytes)
+        tmp_file_path = tmp_file.name
+    try:
+        return whisper.load_audio(tmp_file_path)
+    finally:
+        os.remove(tmp_file_path)
+
+
+def time_it(fn, iterations: int):
+    """Return (mean_ms, p95_ms) over iterations after one warm-up call"""
+    fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.mean(timings)), float(np.percentile(timings, 95))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audio decoding paths")
+    parser.add_argument("--duration", type=float, default=3.0, help="Clip duration in seconds (default: 3)")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed iterations (default: 50)")
+    parser.add_argument("--sample-rate", type=int, default=48000, help="Source sample rate (default: 48000)")
+    parser.add_argument("--with-model", action="store_true", help="Also time end-to-end Whisper transcription")
+    args = parser.parse_args()
+
+    wav_bytes = make_wav(args.duration, args.sample_rate)
+    clips = {"wav": wav_bytes}
+    if SOUNDFILE_AVAILABLE:
+        clips["ogg"] = make_ogg(wav_bytes)
+
+    ffmpeg_available = shutil.which("ffmpeg") is not None
+    print(f"Clip: {args.duration:.1f}s @ {args.sample_rate} Hz, {args.iterations} iterations")
+    print(f"soundfile: {SOUNDFILE_AVAILABLE}, PyAV: {PYAV_AVAILABLE}, ffmpeg: {ffmpeg_available}\n")
+
+    print(f"{'format':<8}{'path':<22}{'mean ms':>10}{'p95 ms':>10}")
+    print("-" * 50)
+    for audio_format, audio_bytes in clips.items():
+        mean, p95 = time_it(lambda: audio_decoder.decode(audio_bytes), args.iterations)
+        print(f"{audio_format:<8}{'in-memory':<22}{mean:>10.2f}{p95:>10.2f}")
+        if ffmpeg_available:
+            mean, p95 = time_it(lambda: tempfile_decode(audio_bytes), args.iterations)
+            print(f"{audio_format:<8}{'temp file + ffmpeg':<22}{mean:>10.2f}{p95:>10.2f}")
+
+    if args.with_model:
+        from app.services.speech_to_text import stt_service
+        stt_service.load_model()
+        iterations = max(1, args.iterations // 10)
+        print(f"\nEnd-to-end transcription (wav, {iterations} iterations)")
+        mean, p95 = time_it(lambda: stt_service.transcribe_bytes(wav_bytes), iterations)
+        print(f"{'in-memory':<22}{mean:>10.2f}{p95:>10.2f}")
+        if ffmpeg_available:
+            mean, p95 = time_it(lambda: stt_service.transcribe_bytes_via_tempfile(wav_bytes), iterations)
+            print(f"{'temp file + ffmpeg':<22}{mean:>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark Whisper decoding profiles (fast / balanced / accurate)
+
+Transcribes a set of banking utterances with each profile and reports
+latency and word error rate. Clips come from --audio-dir (pairs of
+name.wav and name.txt holding the reference transcript) or, without it,
+are synthesized from a built-in phrase list with the TTS service.
+
+Usage (from the backend directory):
+    python scripts/benchmark_decoding_profiles.py --model base
+    python scripts/benchmark_decoding_profiles.py --audio-dir recordings/ --iterations 3
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audio_decoder import audio_decoder
+from app.services.speech_to_text import DECODING_PROFILES, SpeechToTextService
+
+BANKING_PHRASES = [
+    "What is my account balance",
+    "Transfer five hundred rupees to Rahul",
+    "Show my recent transactions",
+    "How much did I spend on food this month",
+    "Block my credit card",
+    "What is the interest rate on my home loan",
+    "Pay my electricity bill",
+    "I want to order a new cheque book",
+]
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase and strip punctuation before scoring"""
+    return re.sub(r"[^a-z0-9' ]", " ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """Return (edit distance in words, reference length)"""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_clips(audio_dir: str) -> List[Tuple[np.ndarray, str]]:
+    """Load (audio, reference) pairs from a directory or synthesize them"""
+    clips = []
+    if audio_dir:
+        for wav_path in sorted(glob.glob(os.path.join(audio_dir, "*.wav"))):
+            txt_path = os.path.splitext(wav_path)[0] + ".txt"
+            if not os.path.exists(txt_path):
+                continue
+            with open(wav_path, "rb") as f:
+                audio = audio_decoder.decode(f.read())
+            with open(txt_path) as f:
+                clips.append((audio, f.read().strip()))
+        return clips
+
+    from app.services.text_to_speech import tts_service
+    for phrase in BANKING_PHRASES:
+        clips.append((audio_decoder.decode(tts_service.synthesize(phrase, "en")), phrase))
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Whisper decoding profiles")
+    parser.add_argument("--model", type=str, default="base", help="Whisper model size (default: base)")
+    parser.add_argument("--audio-dir", type=str, default=None, help="Directory of .wav files with .txt references")
+    parser.add_argument("--iterations", type=int, default=1, help="Passes over the clip set per profile (default: 1)")
+    args = parser.parse_args()
+
+    clips = load_clips(args.audio_dir)
+    if not clips:
+        print("No clips to benchmark")
+        sys.exit(1)
+
+    service = SpeechToTextService()
+    # Warm up: load the model and run one decode
+    service.transcribe(clips[0][0], "en", args.model, "fast")
+
+    print(f"Model: {args.model}, {len(clips)} clips x {args.iterations} iterations\n")
+    print(f"{'profile':<10}{'mean ms':>10}{'p95 ms':>10}{'WER':>8}")
+    print("-" * 38)
+
+    for profile in DECODING_PROFILES:
+        latencies = []
+        errors = words = 0
+        for _ in range(args.iterations):
+            for audio, reference in clips:
+                start = time.perf_counter()
+                result = service.transcribe(audio, "en", args.model, profile)
+                latencies.append((time.perf_counter() - start) * 1000)
+                clip_errors, clip_words = word_errors(reference, result["text"])
+                errors += clip_errors
+                words += clip_words
+        print(f"{profile:<10}{np.mean(latencies):>10.1f}{np.percentile(latencies, 95):>10.1f}"
+              f"{errors / max(words, 1):>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
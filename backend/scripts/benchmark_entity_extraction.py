@@ -0,0 +1,205 @@
+"""
+Golden checks and micro-benchmark for the precompiled entity extractor
+
+The golden cases pin down the outputs of the original implementation,
+quirks included (every word after "to" is captured as the recipient,
+"unblock" reports "block", any 4+ digit run is an account number). The
+extractor is also compared against the original implementation on every
+Banking77 test utterance under every intent, then both are timed.
+
+Usage (from the backend directory):
+    python scripts/benchmark_entity_extraction.py
+    python scripts/benchmark_entity_extraction.py --repeat 20
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.entity_extractor import entity_extractor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TEST_CSV = os.path.join(BACKEND_DIR, "..", "banking77data", "banking77_test.csv")
+
+INTENTS = [
+    "check_balance", "transfer_funds", "view_transactions", "loan_inquiry", "interest_inquiry",
+    "credit_limit_inquiry", "set_reminder", "payment_alert", "spending_summary", "category_spending",
+    "fraud_alert", "view_notifications", "setup_auto_pay", "request_chequebook", "manage_card",
+    "greeting", "goodbye", "other",
+]
+
+# (text, intent, entities) as returned before the extractor was introduced
+GOLDEN_CASES = [
+    ('Send ₹5,000.50 to Rahul Sharma', 'transfer_funds', {'amount': 5000.5, 'recipient_name': 'Rahul Sharma'}),
+    ('transfer 200 rupees to asha for dinner', 'transfer_funds', {'amount': 200.0, 'recipient_name': 'asha for dinner'}),
+    ('pay 1000 rs to Mom', 'transfer_funds', {'amount': 1000.0, 'recipient_name': 'Mom', 'account_number': '1000'}),
+    ('transfer money into savings', 'transfer_funds', {'recipient_name': 'savings'}),
+    ('send Rs. 250 for Priya', 'transfer_funds', {'amount': 250.0, 'recipient_name': 'Priya'}),
+    ('amount of rs 300', 'transfer_funds', {'amount': 300.0}),
+    ('the amount 1,250.75 please', 'other', {'amount': 1250.75}),
+    ('my account number 12345678', 'check_balance', {'account_number': '12345678'}),
+    ('account 123456789012345678', 'check_balance', {'account_number': '1234567890123456'}),
+    ('call me at 98 765 4321', 'other', {'account_number': '4321'}),
+    ('How much did I spend on food last month', 'category_spending', {'category': 'food', 'period': 'last_month'}),
+    ('food expenses this week', 'category_spending', {'category': 'food', 'period': 'week'}),
+    ('spent for travel past year', 'category_spending', {'category': 'travel', 'period': 'last_year'}),
+    ('show my spending summary for this month', 'spending_summary', {'period': 'month'}),
+    ('what were my expenses last week', 'spending_summary', {'period': 'last_week'}),
+    ('unblock my debit card', 'manage_card', {'action': 'block', 'card_type': 'debit'}),
+    ('block my credit card', 'manage_card', {'action': 'block', 'card_type': 'credit'}),
+    ('set limit on credit card', 'manage_card', {'action': 'set_limit', 'card_type': 'credit'}),
+    ('auto pay electricity bill of 1500 rupees', 'setup_auto_pay', {'amount': 1500.0, 'bill_type': 'electricity', 'account_number': '1500'}),
+    ('set up autopay for my gas and water', 'setup_auto_pay', {'bill_type': 'water'}),
+    ('hello there', 'greeting', {}),
+    ('What is my balance?', 'check_balance', {}),
+    ('RS 99 to Kumar', 'transfer_funds', {'amount': 99.0, 'recipient_name': 'Kumar'}),
+    ('₹ 42', 'other', {'amount': 42.0}),
+]
+
+
+def legacy_extract_entities(text: str, intent: str) -> Dict:
+    """The original IntentRecognitionService.extract_entities, one re.search per pattern"""
+    entities = {}
+
+    # Extract amount
+    amount_patterns = [
+        r'(?:₹|rs\.?|rupees?)\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',
+        r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:₹|rs\.?|rupees?)',
+        r'amount\s*(?:of\s*)?(?:₹|rs\.?|rupees?)?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)'
+    ]
+    for pattern in amount_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            amount_str = match.group(1).replace(',', '')
+            entities["amount"] = float(amount_str)
+            break
+
+    # Extract recipient name for transfers
+    if intent == "transfer_funds":
+        # Simple pattern: "to [Name]" or "transfer [amount] to [Name]"
+        to_patterns = [
+            r'(?:to|for)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+            r'transfer.*?to\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+        ]
+        for pattern in to_patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                entities["recipient_name"] = match.group(1)
+                break
+
+    # Extract category for spending queries
+    if intent == "category_spending":
+        category_patterns = [
+            r'(?:spent|spend|expenses?)\s+(?:on|for)\s+(\w+)',
+            r'(\w+)\s+(?:spending|expenses?)',
+        ]
+        for pattern in category_patterns:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                entities["category"] = match.group(1).lower()
+                break
+
+    # Extract period for spending queries
+    if intent in ["spending_summary", "category_spending"]:
+        period_patterns = [
+            r'(?:last|past)\s+(?:week|month|year)',
+            r'this\s+(?:week|month|year)',
+        ]
+        text_lower = text.lower()
+        if "last month" in text_lower or "past month" in text_lower:
+            entities["period"] = "last_month"
+        elif "last week" in text_lower or "past week" in text_lower:
+            entities["period"] = "last_week"
+        elif "last year" in text_lower or "past year" in text_lower:
+            entities["period"] = "last_year"
+        elif "this month" in text_lower:
+            entities["period"] = "month"
+        elif "this week" in text_lower:
+            entities["period"] = "week"
+
+    # Extract bill type for auto-pay
+    if intent == "setup_auto_pay":
+        bill_types = ["electricity", "phone", "water", "internet", "gas"]
+        text_lower = text.lower()
+        for bill_type in bill_types:
+            if bill_type in text_lower:
+                entities["bill_type"] = bill_type
+                break
+
+    # Extract card action
+    if intent == "manage_card":
+        text_lower = text.lower()
+        if "block" in text_lower:
+            entities["action"] = "block"
+        elif "unblock" in text_lower:
+            entities["action"] = "unblock"
+        elif "limit" in text_lower:
+            entities["action"] = "set_limit"
+
+        if "debit" in text_lower:
+            entities["card_type"] = "debit"
+        elif "credit" in text_lower:
+            entities["card_type"] = "credit"
+
+    # Extract account number
+    account_pattern = r'(?:account\s*)?(?:number\s*)?(\d{4,16})'
+    match = re.search(account_pattern, text, re.IGNORECASE)
+    if match:
+        entities["account_number"] = match.group(1)
+
+    return entities
+
+
+def timed(fn, cases, repeat: int) -> float:
+    """Microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text, intent in cases:
+            fn(text, intent)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(cases))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark entity extraction")
+    parser.add_argument("--test-csv", type=str, default=DEFAULT_TEST_CSV, help="Banking77 test CSV")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (default: 5)")
+    args = parser.parse_args()
+
+    failures = 0
+    for text, intent, expected in GOLDEN_CASES:
+        actual = entity_extractor.extract(text, intent)
+        if actual != expected or list(actual) != list(expected):
+            failures += 1
+            print(f"[GOLDEN] {text!r} ({intent}): expected {expected}, got {actual}")
+
+    texts = [text for text, _, _ in GOLDEN_CASES]
+    if os.path.exists(args.test_csv):
+        with open(args.test_csv, "r", encoding="utf-8", newline="") as f:
+            texts += [row["text"] for row in csv.DictReader(f)]
+    cases = [(text, intent) for text in texts for intent in INTENTS]
+    for text, intent in cases:
+        expected = legacy_extract_entities(text, intent)
+        actual = entity_extractor.extract(text, intent)
+        if actual != expected or list(actual) != list(expected):
+            failures += 1
+            print(f"[MISMATCH] {text!r} ({intent}): legacy {expected}, extractor {actual}")
+
+    print(f"{len(GOLDEN_CASES)} golden cases, {len(cases)} differential cases")
+    digit_cases = [(text, intent) for text, intent in cases if re.search(r"\d", text)]
+    print(f"{'':<16}{'legacy us':>11}{'extractor us':>14}{'speedup':>9}")
+    for name, subset in (("all", cases), ("with digits", digit_cases)):
+        legacy = timed(legacy_extract_entities, subset, args.repeat)
+        current = timed(entity_extractor.extract, subset, args.repeat)
+        print(f"{name:<16}{legacy:>11.2f}{current:>14.2f}{legacy / current:>8.1f}x")
+
+    print(f"[{'OK' if not failures else 'FAIL'}] {failures} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Parity and throughput check for the ONNX Runtime intent backend
+
+Runs the Banking77 test set through the PyTorch model and the exported
+ONNX models (fp32 and, if present, int8), reporting max logit difference,
+argmax agreement, accuracy and throughput at several batch sizes. Exits
+non-zero when the fp32 ONNX model does not match PyTorch.
+
+Export the model first (from the repository root):
+    python scripts/export_intent_onnx.py --model-path models/banking77-intent --quantize
+
+Usage (from the backend directory):
+    python scripts/benchmark_intent_onnx.py --model-path ../models/banking77-intent
+    python scripts/benchmark_intent_onnx.py --limit 500 --batch-sizes 1 8 32
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from app.services.intent_recognition import ONNX_INT8_MODEL_FILE, ONNX_MODEL_FILE
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TEST_CSV = os.path.join(BACKEND_DIR, "..", "banking77data", "banking77_test.csv")
+
+
+def torch_logits(model, tokenizer, texts, batch_size: int):
+    """Return (logits, seconds) for the PyTorch model"""
+    outputs = []
+    start = time.perf_counter()
+    with torch.no_grad():
+        for i in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[i:i + batch_size], return_tensors="pt", truncation=True,
+                               max_length=128, padding="longest")
+            outputs.append(model(**inputs).logits.numpy())
+    return np.concatenate(outputs), time.perf_counter() - start
+
+
+def onnx_logits(session, tokenizer, texts, batch_size: int):
+    """Return (logits, seconds) for an ONNX Runtime session"""
+    feed_names = [i.name for i in session.get_inputs()]
+    outputs = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        inputs = tokenizer(texts[i:i + batch_size], return_tensors="np", truncation=True,
+                           max_length=128, padding="longest")
+        feeds = {name: inputs[name].astype(np.int64) for name in feed_names}
+        outputs.append(session.run(["logits"], feeds)[0])
+    return np.concatenate(outputs), time.perf_counter() - start
+
+
+def make_session(path: str, threads: int):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the ONNX Runtime intent backend with PyTorch")
+    parser.add_argument("--model-path", type=str, default="models/banking77-intent",
+                        help="Fine-tuned intent model directory (default: models/banking77-intent)")
+    parser.add_argument("--test-csv", type=str, default=DEFAULT_TEST_CSV, help="Banking77 test CSV")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N test utterances")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32],
+                        help="Batch sizes for the throughput table (default: 1 8 32)")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = default)")
+    parser.add_argument("--max-logit-diff", type=float, default=1e-3,
+                        help="Allowed fp32 ONNX vs PyTorch max |logit| difference (default: 1e-3)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                        help="Allowed int8 ONNX accuracy drop vs PyTorch (default: 0.01)")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    test_df = pd.read_csv(args.test_csv)
+    if args.limit:
+        test_df = test_df.head(args.limit)
+    texts, labels = test_df["text"].tolist(), test_df["label"].to_numpy()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model_path).eval()
+    runners = {"torch": lambda texts, batch_size: torch_logits(model, tokenizer, texts, batch_size)}
+    for name, filename in (("onnx", ONNX_MODEL_FILE), ("onnx-int8", ONNX_INT8_MODEL_FILE)):
+        path = os.path.join(args.model_path, filename)
+        if os.path.exists(path):
+            session = make_session(path, args.threads)
+            runners[name] = lambda texts, batch_size, session=session: onnx_logits(session, tokenizer, texts, batch_size)
+        else:
+            print(f"[SKIP] {path} not found")
+    if "onnx" not in runners:
+        print("Run scripts/export_intent_onnx.py first")
+        sys.exit(1)
+
+    # Parity on the full test set, batched the way the service batches
+    reference, _ = runners["torch"](texts, 32)
+    reference_pred = reference.argmax(axis=-1)
+    print(f"\nParity on {len(texts)} test utterances")
+    print(f"{'backend':<11}{'max diff':>10}{'agree':>8}{'accuracy':>10}")
+    passed = True
+    for name, run in runners.items():
+        logits, _ = run(texts, 32)
+        pred = logits.argmax(axis=-1)
+        max_diff = float(np.abs(logits - reference).max())
+        accuracy = float(np.mean(pred == labels))
+        print(f"{name:<11}{max_diff:>10.2e}{np.mean(pred == reference_pred):>8.4f}{accuracy:>10.4f}")
+        if name == "onnx":
+            passed &= max_diff <= args.max_logit_diff
+        elif name == "onnx-int8":
+            passed &= float(np.mean(reference_pred == labels)) - accuracy <= args.max_accuracy_drop
+
+    print(f"\nThroughput (utterances/second)")
+    print(f"{'backend':<11}" + "".join(f"{f'batch {b}':>11}" for b in args.batch_sizes))
+    for name, run in runners.items():
+        run(texts[:8], 8)  # Warm-up
+        row = f"{name:<11}"
+        for batch_size in args.batch_sizes:
+            _, seconds = run(texts, batch_size)
+            row += f"{len(texts) / seconds:>11.1f}"
+        print(row)
+
+    print(f"\n[{'OK' if passed else 'FAIL'}] fp32 logit diff <= {args.max_logit_diff}, "
+          f"int8 accuracy drop <= {args.max_accuracy_drop}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Equivalence check and benchmark for the Aho-Corasick keyword matcher
+
+Compares the automaton against the original nested substring loops for
+rule-based intent recognition (on Banking77 utterances) and spending
+categorization (on synthetic transaction descriptions). Any disagreement
+is printed and the script exits non-zero.
+
+Usage (from the backend directory):
+    python scripts/benchmark_keyword_matcher.py
+    python scripts/benchmark_keyword_matcher.py --transactions 50000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.intent_recognition import GREETINGS, INTENT_KEYWORDS, RULE_MATCHER
+from app.services.spending_tracker import SPENDING_CATEGORIES, spending_tracker
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TEST_CSV = os.path.join(BACKEND_DIR, "..", "banking77data", "banking77_test.csv")
+
+MERCHANTS = [
+    "Swiggy order", "Zomato", "Uber trip", "Ola ride", "Metro card recharge", "Amazon purchase",
+    "Flipkart", "Electricity bill", "Netflix subscription", "Apollo Pharmacy", "City Hospital",
+    "College tuition fee", "Transfer to Rahul", "UPI pay", "Indian Oil petrol", "Cafe Coffee Day",
+    "Spotify", "BookMyShow movie", "Jio phone recharge", "ATM withdrawal", "Rent", "Salary",
+]
+
+
+def legacy_intent(text: str) -> str:
+    """Original rule-based loop: first intent with a keyword, then greetings"""
+    text_lower = text.lower()
+    for intent, keywords in INTENT_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                return intent
+    if any(g in text_lower for g in GREETINGS):
+        return "greeting"
+    return "other"
+
+
+def legacy_category(description: str, recipient: str = None) -> str:
+    """Original nested scan over SPENDING_CATEGORIES"""
+    text = (description or "").lower()
+    if recipient:
+        text += " " + recipient.lower()
+    for category, keywords in SPENDING_CATEGORIES.items():
+        if category == "other":
+            continue
+        for keyword in keywords:
+            if keyword in text:
+                return category
+    return "other"
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the keyword automaton")
+    parser.add_argument("--test-csv", type=str, default=DEFAULT_TEST_CSV, help="Banking77 test CSV")
+    parser.add_argument("--transactions", type=int, default=20000,
+                        help="Synthetic transactions to categorize (default: 20000)")
+    args = parser.parse_args()
+
+    texts = []
+    if os.path.exists(args.test_csv):
+        with open(args.test_csv, "r", encoding="utf-8", newline="") as f:
+            texts = [row["text"] for row in csv.DictReader(f)]
+    texts += ["hi there", "Hello", "this is it", "send to Asha", "block my debit card", "what's my credit limit"]
+
+    failures = 0
+    legacy, legacy_seconds = timed(lambda: [legacy_intent(t) for t in texts])
+    automaton, automaton_seconds = timed(lambda: [RULE_MATCHER.first(t.lower()) or "other" for t in texts])
+    for text, expected, actual in zip(texts, legacy, automaton):
+        if expected != actual:
+            failures += 1
+            print(f"[MISMATCH] intent {text!r}: legacy={expected} automaton={actual}")
+    print(f"Rule-based intent, {len(texts)} utterances: legacy {legacy_seconds * 1e6 / len(texts):.2f} us/utt, "
+          f"automaton {automaton_seconds * 1e6 / len(texts):.2f} us/utt")
+
+    rng = random.Random(0)
+    descriptions = [f"{rng.choice(MERCHANTS)} #{rng.randint(1, 50)}" for _ in range(args.transactions)]
+    recipients = [rng.choice([None, "Rahul", "Big Bazaar", "Ravi Kumar"]) for _ in descriptions]
+    legacy, legacy_seconds = timed(lambda: [legacy_category(d, r) for d, r in zip(descriptions, recipients)])
+    single, single_seconds = timed(
+        lambda: [spending_tracker.categorize_transaction(d, r) for d, r in zip(descriptions, recipients)]
+    )
+    batch, batch_seconds = timed(spending_tracker.categorize_transactions, descriptions, recipients)
+    for description, recipient, expected, one, many in zip(descriptions, recipients, legacy, single, batch):
+        if not expected == one == many:
+            failures += 1
+            print(f"[MISMATCH] category {description!r}/{recipient!r}: legacy={expected} single={one} batch={many}")
+    print(f"Spending categories, {len(descriptions)} transactions: legacy {legacy_seconds * 1000:.1f} ms, "
+          f"automaton {single_seconds * 1000:.1f} ms, batched {batch_seconds * 1000:.1f} ms")
+
+    print(f"[{'OK' if not failures else 'FAIL'}] {failures} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark kNN intent query latency against index size
+
+Writes synthetic unit-vector indexes of increasing size to a temporary
+directory, memory-maps them like the service does and times the cosine
+top-k search per query at batch 1 and batch 32. With --encoder (or an
+existing index), the sentence encoding time is measured too, since a
+query pays for both.
+
+Usage (from the backend directory):
+    python scripts/benchmark_knn_intent.py
+    python scripts/benchmark_knn_intent.py --sizes 10000 100000 1000000 --encoder sentence-transformers/all-MiniLM-L6-v2
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERIES = [
+    "What is my account balance?",
+    "I want to transfer 500 rupees to Rahul",
+    "My card has not arrived yet",
+    "Why was I charged a fee for my top up?",
+]
+
+
+def time_search(matrix, queries, k, repeats):
+    """Return ms per query for searching matrix with all queries at once"""
+    from app.services.knn_intent import top_k_rows
+
+    top_k_rows(queries, matrix, k)  # Fault the pages in, as a warm service would have
+    start = time.perf_counter()
+    for _ in range(repeats):
+        top_k_rows(queries, matrix, k)
+    return (time.perf_counter() - start) * 1000 / (repeats * len(queries))
+
+
+def main():
+    from app.core.config import settings
+    from app.services.knn_intent import INFO_FILE
+
+    parser = argparse.ArgumentParser(description="kNN intent latency versus index size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000],
+                        help="Index sizes in examples (default: 1k 10k 100k 1M)")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension without an encoder (default: 384)")
+    parser.add_argument("--encoder", type=str, default=None,
+                        help="Sentence encoder to time (default: the one in INTENT_KNN_INDEX_DIR, if built)")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    encoder_name = args.encoder
+    info_path = os.path.join(settings.INTENT_KNN_INDEX_DIR, INFO_FILE)
+    if encoder_name is None and os.path.exists(info_path):
+        with open(info_path, "r") as f:
+            encoder_name = json.load(f)["encoder"]
+
+    dim = args.dim
+    if encoder_name:
+        from app.services.knn_intent import SentenceEncoder
+
+        encoder = SentenceEncoder(encoder_name)
+        dim = encoder.dim
+        encoder.encode(QUERIES)  # warm-up
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            for query in QUERIES:
+                encoder.encode([query])
+        encode_ms = (time.perf_counter() - start) * 1000 / (args.repeats * len(QUERIES))
+        print(f"Encoder {encoder_name}: {encode_ms:.2f} ms/query (batch 1)")
+    else:
+        encode_ms = None
+        print("No encoder given: timing the search only")
+
+    rng = np.random.default_rng(0)
+    k = settings.INTENT_KNN_K
+    print(f"\n{'index size':>11}{'MB':>9}{'search b=1':>12}{'search b=32':>13}{'query total':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"{size}.npy")
+            matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(size, dim))
+            for start in range(0, size, 65536):
+                block = rng.standard_normal((min(65536, size - start), dim), dtype=np.float32)
+                matrix[start:start + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+            matrix.flush()
+            del matrix
+            index = np.load(path, mmap_mode="r")
+
+            queries = rng.standard_normal((32, dim), dtype=np.float32)
+            queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+            single = time_search(index, queries[:1], k, args.repeats)
+            batched = time_search(index, queries, k, max(1, args.repeats // 4))
+            total = f"{single + encode_ms:.2f} ms" if encode_ms is not None else "-"
+            print(f"{size:>11}{os.path.getsize(path) / 1024 ** 2:>9.1f}{single:>10.3f}ms{batched:>11.3f}ms{total:>13}")
+            del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark short-utterance encoding against full 30-second padding
+
+Runs synthetic 1-10 s clips through the Whisper encoder and the full decode
+with both the padded window and the reduced audio context chosen by
+SpeechToTextService.audio_ctx_for().
+
+Usage (from the backend directory):
+    python scripts/benchmark_short_utterance.py --model base --iterations 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+import whisper
+
+from app.services.speech_to_text import SpeechToTextService, enable_variable_audio_ctx
+
+
+def synthetic_clip(duration: float, sample_rate: int = 16000) -> np.ndarray:
+    """Speech-band harmonics with syllable-rate amplitude modulation and noise"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    voice = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate([180, 360, 720, 1440]))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    return (0.2 * voice * envelope + 0.01 * np.random.randn(len(t))).astype(np.float32)
+
+
+def mean_ms(fn, iterations: int) -> float:
+    """Mean wall time in milliseconds after one warm-up call"""
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark short-utterance Whisper encoding")
+    parser.add_argument("--model", type=str, default="base", help="Whisper model size (default: base)")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed iterations per clip (default: 5)")
+    args = parser.parse_args()
+
+    service = SpeechToTextService()
+    model = enable_variable_audio_ctx(whisper.load_model(args.model, device="cpu"))
+
+    print(f"Model: {args.model}, {args.iterations} iterations per clip\n")
+    print(f"{'clip s':>7}{'ctx':>7}{'enc full ms':>14}{'enc short ms':>14}"
+          f"{'e2e full ms':>14}{'e2e short ms':>14}{'speedup':>9}")
+    print("-" * 79)
+
+    for duration in range(1, 11):
+        clip = synthetic_clip(duration)
+        audio_ctx = service.audio_ctx_for(duration, model)
+        n_short = audio_ctx * 2 * whisper.audio.HOP_LENGTH
+        mel_full = whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), model.dims.n_mels)[None]
+        mel_short = whisper.log_mel_spectrogram(whisper.pad_or_trim(clip, n_short), model.dims.n_mels)[None]
+
+        with torch.no_grad():
+            enc_full = mean_ms(lambda: model.encoder(mel_full), args.iterations)
+            enc_short = mean_ms(lambda: model.encoder(mel_short), args.iterations)
+        e2e_full = mean_ms(lambda: service._decode(model, [clip], "en", "fast"), args.iterations)
+        e2e_short = mean_ms(lambda: service._decode(model, [clip], "en", "fast", audio_ctx), args.iterations)
+
+        print(f"{duration:>7}{audio_ctx:>7}{enc_full:>14.1f}{enc_short:>14.1f}"
+              f"{e2e_full:>14.1f}{e2e_short:>14.1f}{e2e_full / e2e_short:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark speculative decoding against plain greedy Whisper decoding
+
+Decodes each clip with whisper.decode (greedy) and with SpeculativeDecoder
+using a smaller draft model, checks the transcripts are token-for-token
+identical, and reports draft acceptance rate and decoder tokens per second.
+
+Usage (from the backend directory):
+    python scripts/benchmark_speculative_decoding.py --model base --draft tiny
+    python scripts/benchmark_speculative_decoding.py --audio-dir recordings/ --draft-tokens 2 4 6
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import whisper
+
+from app.services.speculative_decoding import SpeculativeDecoder, can_draft_for
+from benchmark_decoding_profiles import load_clips
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speculative Whisper decoding")
+    parser.add_argument("--model", type=str, default="base", help="Main Whisper model (default: base)")
+    parser.add_argument("--draft", type=str, default="tiny", help="Draft Whisper model (default: tiny)")
+    parser.add_argument("--draft-tokens", type=int, nargs="+", default=[4],
+                        help="Draft lengths to try (default: 4)")
+    parser.add_argument("--audio-dir", type=str, default=None, help="Directory of .wav files with .txt references")
+    args = parser.parse_args()
+
+    main_model = whisper.load_model(args.model, device="cpu")
+    draft_model = whisper.load_model(args.draft, device="cpu")
+    if not can_draft_for(draft_model, main_model):
+        print(f"'{args.draft}' cannot draft for '{args.model}' (different tokenizer or mel bins)")
+        sys.exit(1)
+
+    clips = load_clips(args.audio_dir)
+    mels = [
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), main_model.dims.n_mels)
+        for audio, _ in clips
+    ]
+    options = whisper.DecodingOptions(language="en", without_timestamps=True, fp16=False)
+
+    # Greedy baseline (first call warms up)
+    whisper.decode(main_model, mels[0][None], options)
+    start = time.perf_counter()
+    baseline = [whisper.decode(main_model, mel[None], options)[0] for mel in mels]
+    greedy_seconds = time.perf_counter() - start
+    n_tokens = sum(len(result.tokens) + 1 for result in baseline)
+
+    print(f"Main: {args.model}, draft: {args.draft}, {len(clips)} clips, {n_tokens} tokens\n")
+    print(f"{'decoder':<14}{'tokens/s':>10}{'accept':>9}{'tok/pass':>10}{'speedup':>9}{'identical':>11}")
+    print("-" * 63)
+    print(f"{'greedy':<14}{n_tokens / greedy_seconds:>10.1f}{'-':>9}{1.0:>10.2f}{1.0:>8.2f}x{'-':>11}")
+
+    for draft_tokens in args.draft_tokens:
+        decoder = SpeculativeDecoder(draft_tokens)
+        start = time.perf_counter()
+        results = [decoder.decode(main_model, draft_model, mel, options) for mel in mels]
+        seconds = time.perf_counter() - start
+        identical = all(ref.tokens == got.tokens for ref, got in zip(baseline, results))
+        stats = decoder.get_stats()
+        print(f"{'speculative k=' + str(draft_tokens):<14}{n_tokens / seconds:>10.1f}"
+              f"{stats['acceptance_rate']:>9.1%}{stats['tokens_per_main_pass']:>10.2f}"
+              f"{greedy_seconds / seconds:>8.2f}x{str(identical):>11}")
+
+
+if __name__ == "__main__":
+    main()
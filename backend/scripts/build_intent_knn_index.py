@@ -0,0 +1,97 @@
+"""
+Build the embedding index for INTENT_BACKEND=knn
+
+Encodes the Banking77 train utterances (plus optional extra labelled CSVs)
+with a small sentence encoder and writes embeddings.npy (memory-mapped by
+the service), labels.json and index_info.json to INTENT_KNN_INDEX_DIR. The
+Banking77 -> application intent mapping is copied alongside when found.
+With --evaluate, reports kNN accuracy on the Banking77 test set.
+
+Usage (from the backend directory):
+    python scripts/build_intent_knn_index.py
+    python scripts/build_intent_knn_index.py --encoder sentence-transformers/paraphrase-MiniLM-L3-v2 --evaluate
+    python scripts/build_intent_knn_index.py --extra-csv ops_examples.csv  # text,label columns
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ENCODER = "sentence-transformers/all-MiniLM-L6-v2"
+INTENT_MAPPING_PATHS = [
+    os.path.join(BACKEND_DIR, "..", "scripts", "banking77data", "intent_mapping.json"),
+    os.path.join(BACKEND_DIR, "..", "banking77data", "intent_mapping.json"),
+    os.path.join(BACKEND_DIR, "..", "models", "banking77-intent", "intent_mapping.json"),
+]
+
+
+def read_examples(path, label_column):
+    """Return (texts, labels) from a CSV with a text column and a label column"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    return [row["text"] for row in rows], [row[label_column] for row in rows]
+
+
+def main():
+    from app.core.config import settings
+    from app.services.intent_cache import find_train_set
+
+    parser = argparse.ArgumentParser(description="Build the kNN intent index")
+    parser.add_argument("--encoder", type=str, default=DEFAULT_ENCODER,
+                        help=f"Sentence encoder name or path (default: {DEFAULT_ENCODER})")
+    parser.add_argument("--output", type=str, default=settings.INTENT_KNN_INDEX_DIR,
+                        help=f"Index directory (default: {settings.INTENT_KNN_INDEX_DIR})")
+    parser.add_argument("--train-csv", type=str, default=None, help="Banking77 train CSV (default: auto-detect)")
+    parser.add_argument("--extra-csv", type=str, nargs="*", default=[],
+                        help="Additional CSVs with text,label columns (label: app intent or Banking77 label)")
+    parser.add_argument("--limit", type=int, default=0, help="Only index the first N train utterances")
+    parser.add_argument("--evaluate", action="store_true", help="Report accuracy on banking77_test.csv")
+    args = parser.parse_args()
+
+    from app.services.knn_intent import SentenceEncoder, build_index
+
+    train_csv = args.train_csv or find_train_set()
+    if train_csv is None:
+        print("banking77_train.csv not found (pass --train-csv)")
+        sys.exit(1)
+    texts, labels = read_examples(train_csv, "label_text")
+    if args.limit:
+        texts, labels = texts[:args.limit], labels[:args.limit]
+    for path in args.extra_csv:
+        extra_texts, extra_labels = read_examples(path, "label")
+        texts += extra_texts
+        labels += extra_labels
+        print(f"Added {len(extra_texts)} examples from {path}")
+
+    encoder = SentenceEncoder(args.encoder, max_length=settings.INTENT_MAX_LENGTH)
+    start = time.perf_counter()
+    info = build_index(args.output, encoder, texts, labels, source=os.path.basename(train_csv))
+    print(f"Encoded {info['count']} examples ({info['labels']} labels, dim {info['dim']}) "
+          f"in {time.perf_counter() - start:.1f}s -> {args.output}")
+
+    mapping = next((path for path in INTENT_MAPPING_PATHS if os.path.exists(path)), None)
+    if mapping:
+        shutil.copy(mapping, os.path.join(args.output, "intent_mapping.json"))
+        print(f"Copied intent mapping from {mapping}")
+
+    if args.evaluate:
+        from app.services.knn_intent import KnnIntentIndex
+
+        test_csv = train_csv.replace("train.csv", "test.csv")
+        test_texts, test_labels = read_examples(test_csv, "label_text")
+        index = KnnIntentIndex(args.output, encoder, settings.INTENT_KNN_K, settings.INTENT_KNN_TEMPERATURE)
+        start = time.perf_counter()
+        predicted = [ranked[0][0] for ranked in index.rank(test_texts, 1)]
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(test_texts)
+        accuracy = sum(p == gold for p, gold in zip(predicted, test_labels)) / len(test_labels)
+        print(f"Banking77 test accuracy (k={settings.INTENT_KNN_K}): {accuracy:.4f}, "
+              f"{elapsed_ms:.2f} ms/utt (batch 64)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Regression check: intents answered while the intent model is loading
+
+Starts the intent service with background loading and holds the model load
+(tier one is already trained, as in production) while a set of utterances
+is classified. The answers must come from the keyword rules, through both
+rank_intents and the scheduler-timeout fallback_intent; exits non-zero on
+any mismatch, or if the model then fails to take over.
+
+Usage (from the backend directory):
+    python scripts/check_intent_loading_fallback.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.intent_recognition import IntentRecognitionService
+from app.services.model_loading import LOADING
+
+EXPECTED = [
+    ("report fraud on my account", "fraud_alert"),
+    ("hi", "greeting"),
+    ("show my spending summary", "spending_summary"),
+    ("request a cheque book", "request_chequebook"),
+    ("what is my account balance", "check_balance"),
+    ("transfer 500 rupees to Rahul", "transfer_funds"),
+    ("what is my credit limit", "credit_limit_inquiry"),
+    ("what is the interest rate", "interest_inquiry"),
+]
+
+
+class HeldLoadService(IntentRecognitionService):
+    """Intent service whose model load waits for a gate"""
+
+    def __init__(self, gate: threading.Event):
+        self.gate = gate
+        super().__init__(load_in_background=True)
+
+    def load_model(self, version=None) -> bool:
+        self.gate.wait()
+        return super().load_model(version)
+
+
+def main():
+    gate = threading.Event()
+    service = HeldLoadService(gate)
+    # Tier one trains before the model load starts, as in production
+    deadline = time.monotonic() + 120
+    while service.fast_classifier is None and time.monotonic() < deadline:
+        time.sleep(0.1)
+    print(f"Tier one trained: {service.fast_classifier is not None}")
+
+    failures = []
+    if service.loader.state != LOADING:
+        failures.append(f"loader is {service.loader.state}, expected {LOADING}")
+    texts = [text for text, _ in EXPECTED]
+    ranked = service.rank_intents(texts)
+    for (text, expected), result in zip(EXPECTED, ranked):
+        fallback = service.fallback_intent(text)[0]
+        status = "OK" if result[0] == expected and fallback == expected else "FAIL"
+        print(f"[{status}] {text!r}: rank_intents={result[0]} fallback_intent={fallback} (expected {expected})")
+        if status == "FAIL":
+            failures.append(text)
+
+    gate.set()
+    service.loader.wait()
+    print(f"Loaded: {service.get_load_status()}")
+    if not service.loader.ready:
+        failures.append("model did not load after the gate opened")
+
+    print("[OK] rule-based answers while loading" if not failures else f"[FAIL] {len(failures)} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Accuracy regression check for dynamic int8 quantization
+
+Compares fp32 and int8 versions of the intent model on the Banking77 test
+set and of Whisper on a synthetic (TTS-generated) utterance set, reporting
+accuracy / WER, agreement, model size and latency. Exits non-zero when the
+int8 model regresses by more than the allowed margin.
+
+Usage (from the backend directory):
+    python scripts/check_quantization_accuracy.py --intent
+    python scripts/check_quantization_accuracy.py --stt --whisper-model base
+    python scripts/check_quantization_accuracy.py --intent --stt --max-accuracy-drop 0.005
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from app.services.quantization import quantize_dynamic_int8
+from benchmark_decoding_profiles import load_clips, word_errors
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TEST_CSV = os.path.join(BACKEND_DIR, "..", "banking77data", "banking77_test.csv")
+
+
+def predict_intents(model, tokenizer, texts, batch_size: int):
+    """Return (predicted label ids, seconds) for a list of texts"""
+    predictions = []
+    start = time.perf_counter()
+    with torch.no_grad():
+        for i in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[i:i + batch_size], return_tensors="pt", truncation=True,
+                               max_length=128, padding=True)
+            predictions.extend(model(**inputs).logits.argmax(dim=-1).tolist())
+    return np.array(predictions), time.perf_counter() - start
+
+
+def check_intent(args) -> bool:
+    import pandas as pd
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    test_df = pd.read_csv(args.test_csv)
+    if args.limit:
+        test_df = test_df.head(args.limit)
+    texts, labels = test_df["text"].tolist(), test_df["label"].to_numpy()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model_path)
+    fp32_model = AutoModelForSequenceClassification.from_pretrained(args.model_path).eval()
+    int8_model, sizes = quantize_dynamic_int8(copy.deepcopy(fp32_model), "intent model")
+
+    fp32_pred, fp32_seconds = predict_intents(fp32_model, tokenizer, texts, args.batch_size)
+    int8_pred, int8_seconds = predict_intents(int8_model, tokenizer, texts, args.batch_size)
+    fp32_acc = float(np.mean(fp32_pred == labels))
+    int8_acc = float(np.mean(int8_pred == labels))
+
+    print(f"\nIntent model: {args.model_path} ({len(texts)} test utterances)")
+    print(f"{'':<8}{'accuracy':>10}{'size MB':>10}{'ms/utt':>9}")
+    print(f"{'fp32':<8}{fp32_acc:>10.4f}{sizes['fp32_mb']:>10.1f}{fp32_seconds * 1000 / len(texts):>9.2f}")
+    print(f"{'int8':<8}{int8_acc:>10.4f}{sizes['int8_mb']:>10.1f}{int8_seconds * 1000 / len(texts):>9.2f}")
+    print(f"Agreement: {np.mean(fp32_pred == int8_pred):.4f}, memory saved: {sizes['saved_mb']} MB")
+
+    passed = fp32_acc - int8_acc <= args.max_accuracy_drop
+    print(f"[{'OK' if passed else 'FAIL'}] accuracy drop {fp32_acc - int8_acc:+.4f} "
+          f"(allowed {args.max_accuracy_drop})")
+    return passed
+
+
+def transcribe_all(model, clips):
+    """Return (word errors, reference words, transcripts, seconds)"""
+    errors = words = 0
+    texts = []
+    start = time.perf_counter()
+    for audio, reference in clips:
+        text = model.transcribe(audio, language="en", temperature=0.0, fp16=False)["text"]
+        clip_errors, clip_words = word_errors(reference, text)
+        errors += clip_errors
+        words += clip_words
+        texts.append(text.strip())
+    return errors, words, texts, time.perf_counter() - start
+
+
+def check_stt(args) -> bool:
+    import whisper
+
+    clips = load_clips(args.audio_dir)
+    fp32_model = whisper.load_model(args.whisper_model, device="cpu")
+    int8_model, sizes = quantize_dynamic_int8(copy.deepcopy(fp32_model), f"whisper-{args.whisper_model}")
+
+    fp32_errors, words, fp32_texts, fp32_seconds = transcribe_all(fp32_model, clips)
+    int8_errors, _, int8_texts, int8_seconds = transcribe_all(int8_model, clips)
+    fp32_wer = fp32_errors / max(words, 1)
+    int8_wer = int8_errors / max(words, 1)
+    same = sum(a == b for a, b in zip(fp32_texts, int8_texts))
+
+    print(f"\nWhisper {args.whisper_model} ({len(clips)} synthetic clips)")
+    print(f"{'':<8}{'WER':>8}{'size MB':>10}{'ms/clip':>10}")
+    print(f"{'fp32':<8}{fp32_wer:>8.1%}{sizes['fp32_mb']:>10.1f}{fp32_seconds * 1000 / len(clips):>10.1f}")
+    print(f"{'int8':<8}{int8_wer:>8.1%}{sizes['int8_mb']:>10.1f}{int8_seconds * 1000 / len(clips):>10.1f}")
+    print(f"Identical transcripts: {same}/{len(clips)}, memory saved: {sizes['saved_mb']} MB")
+
+    passed = int8_wer - fp32_wer <= args.max_wer_increase
+    print(f"[{'OK' if passed else 'FAIL'}] WER change {int8_wer - fp32_wer:+.1%} "
+          f"(allowed {args.max_wer_increase:.1%})")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check int8 quantization accuracy against fp32")
+    parser.add_argument("--intent", action="store_true", help="Check the intent model on Banking77")
+    parser.add_argument("--stt", action="store_true", help="Check Whisper on synthetic utterances")
+    parser.add_argument("--model-path", type=str, default="models/banking77-intent",
+                        help="Fine-tuned intent model directory (default: models/banking77-intent)")
+    parser.add_argument("--test-csv", type=str, default=DEFAULT_TEST_CSV, help="Banking77 test CSV")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N test utterances")
+    parser.add_argument("--batch-size", type=int, default=32, help="Intent batch size (default: 32)")
+    parser.add_argument("--whisper-model", type=str, default="base", help="Whisper model size (default: base)")
+    parser.add_argument("--audio-dir", type=str, default=None,
+                        help="Directory of .wav files with .txt references (default: synthesize with TTS)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                        help="Allowed intent accuracy drop (default: 0.01)")
+    parser.add_argument("--max-wer-increase", type=float, default=0.02,
+                        help="Allowed absolute WER increase (default: 0.02)")
+    args = parser.parse_args()
+
+    if not args.intent and not args.stt:
+        args.intent = args.stt = True
+
+    passed = True
+    if args.intent:
+        passed &= check_intent(args)
+    if args.stt:
+        passed &= check_stt(args)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Regression check: short-utterance transcription without a language
+
+Short clips are encoded with a reduced audio context, on which Whisper's
+own language detection cannot run. This transcribes short clips with
+language=None under every decoding profile, singly and as a batch, and
+exits non-zero if any call fails, returns no language or skips the
+short-utterance path.
+
+Usage (from the backend directory):
+    python scripts/check_short_utterance_language.py
+    python scripts/check_short_utterance_language.py --model base --audio-dir recordings/
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.audio_decoder import SAMPLE_RATE
+from benchmark_decoding_profiles import load_clips
+
+
+def synthetic_clip(seconds: float, pitch: float) -> np.ndarray:
+    """Amplitude-modulated tone: decodes to something, never to an exception"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * pitch * t) * (1 + np.sin(2 * np.pi * 3 * t))).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check short-utterance transcription with language=None")
+    parser.add_argument("--model", type=str, default="tiny", help="Whisper model size (default: tiny)")
+    parser.add_argument("--audio-dir", type=str, default=None,
+                        help="Directory of .wav files with .txt references (default: synthetic clips)")
+    args = parser.parse_args()
+
+    settings.STT_SHORT_UTTERANCE_MODE = True
+    settings.STT_VAD_ENABLED = False  # Synthetic clips are not speech
+    from app.services.speech_to_text import DECODING_PROFILES, WHISPER_AVAILABLE, SpeechToTextService
+
+    if not WHISPER_AVAILABLE:
+        print("Whisper is not installed")
+        sys.exit(1)
+    service = SpeechToTextService()
+    if args.audio_dir:
+        clips = [audio for audio, _ in load_clips(args.audio_dir)]
+    else:
+        clips = [synthetic_clip(2.0, 220.0), synthetic_clip(4.5, 180.0)]
+    clips = [clip for clip in clips if len(clip) <= settings.STT_SHORT_UTTERANCE_MAX_SECONDS * SAMPLE_RATE]
+
+    failures = []
+    for profile in DECODING_PROFILES:
+        decodes_before = service.stats["short_utterance_decodes"]
+        try:
+            results = [service.transcribe(clip, None, args.model, profile) for clip in clips]
+            results += service.transcribe_batch(clips, [None] * len(clips), [args.model] * len(clips),
+                                                [profile] * len(clips))
+        except Exception as e:
+            failures.append(f"{profile}: {e}")
+            continue
+        languages = sorted({result["language"] for result in results})
+        if not all(isinstance(result["language"], str) and result["language"] for result in results):
+            failures.append(f"{profile}: missing language in {languages}")
+        if service.stats["short_utterance_decodes"] == decodes_before:
+            failures.append(f"{profile}: short-utterance mode was not used")
+        print(f"{profile:<10} {len(results)} transcriptions, detected {languages}")
+
+    for failure in failures:
+        print(f"[FAIL] {failure}")
+    if not failures:
+        print(f"[OK] {len(clips)} clips x {len(DECODING_PROFILES)} profiles with language=None")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Offline sizing report for the confidence-gated intent cascade
+
+Runs the Banking77 test set through the tier-one TF-IDF classifier and the
+transformer, then reports for several thresholds how much traffic would
+escalate to the transformer, how often the tiers agree, and the accuracy of
+the combined cascade (measured on application intents).
+
+Usage (from the backend directory):
+    python scripts/evaluate_intent_cascade.py
+    python scripts/evaluate_intent_cascade.py --thresholds 0.5 0.7 0.9 --limit 1000
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TEST_CSV = os.path.join(BACKEND_DIR, "..", "banking77data", "banking77_test.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report escalation rate and agreement of the intent cascade")
+    parser.add_argument("--test-csv", type=str, default=DEFAULT_TEST_CSV, help="Banking77 test CSV")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N test utterances")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.7, 0.8, 0.9],
+                        help="Tier-one confidence thresholds to report (default: 0.5 ... 0.9)")
+    args = parser.parse_args()
+
+    from app.services.intent_recognition import get_intent_service
+
+    service = get_intent_service()
+    if service.fast_classifier is None:
+        print("Tier-one classifier unavailable (needs scikit-learn and banking77_train.csv)")
+        sys.exit(1)
+
+    with open(args.test_csv, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    if args.limit:
+        rows = rows[:args.limit]
+    texts = [row["text"] for row in rows]
+    gold = np.array([service._app_intent_for_label(row["label_text"]) for row in rows])
+
+    start = time.perf_counter()
+    tier_one = service.fast_classifier.classify(texts)
+    tier_one_ms = (time.perf_counter() - start) * 1000 / len(texts)
+    fast_intents = np.array([intent for intent, _ in tier_one])
+    fast_confidence = np.array([confidence for _, confidence in tier_one])
+
+    has_model = service.model is not None or service.onnx_session is not None
+    if has_model:
+        start = time.perf_counter()
+        model_intents = []
+        for i in range(0, len(texts), 32):
+            model_intents.extend(ranked[0][0] for ranked in service._classify(texts[i:i + 32]))
+        model_ms = (time.perf_counter() - start) * 1000 / len(texts)
+        model_intents = np.array(model_intents)
+    else:
+        print("No transformer loaded: reporting tier one only")
+        model_intents, model_ms = fast_intents, 0.0
+
+    print(f"\n{len(texts)} test utterances, tier one {tier_one_ms:.3f} ms/utt, "
+          f"transformer {model_ms:.2f} ms/utt (batch 32)")
+    print(f"Accuracy: tier one {np.mean(fast_intents == gold):.4f}, "
+          f"transformer {np.mean(model_intents == gold):.4f}")
+    print(f"\n{'threshold':>10}{'escalated':>11}{'agree<':>9}{'agree>=':>9}{'cascade acc':>13}{'ms/utt':>9}")
+    for threshold in args.thresholds:
+        escalate = fast_confidence < threshold
+        cascade = np.where(escalate, model_intents, fast_intents)
+        agree = fast_intents == model_intents
+        agree_low = np.mean(agree[escalate]) if escalate.any() else float("nan")
+        agree_high = np.mean(agree[~escalate]) if (~escalate).any() else float("nan")
+        cost = tier_one_ms + np.mean(escalate) * model_ms
+        print(f"{threshold:>10.2f}{np.mean(escalate):>11.1%}{agree_low:>9.3f}{agree_high:>9.3f}"
+              f"{np.mean(cascade == gold):>13.4f}{cost:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
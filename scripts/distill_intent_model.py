@@ -0,0 +1,411 @@
+"""
+Distill the fine-tuned Banking77 teacher into a compact student intent model
+
+The teacher (roberta-base / distilbert from fine_tune_intent_model.py) labels
+Banking77 train plus augmented paraphrases with soft targets; a small student
+(a 2-4 layer BERT, or the teacher truncated to a few layers) is trained on
+them. The student is saved in the same models/banking77-intent layout
+(config, weights, tokenizer, intent/label mappings, ONNX export), so
+IntentRecognitionService.load_model picks it up unchanged. When the student
+replaces the teacher in place, the teacher is kept in banking77-intent-teacher.
+
+Accuracy, latency and memory of teacher and student are printed side by side
+and saved to <output>/distillation_report.json.
+
+Usage:
+    python distill_intent_model.py
+    python distill_intent_model.py --student google/bert_uncased_L-2_H-128_A-2
+    python distill_intent_model.py --student-layers 2 --output ./models/banking77-intent-student
+"""
+import os
+import copy
+import json
+import random
+import shutil
+import time
+
+# Disable TensorFlow to avoid DLL issues (we're using PyTorch)
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+os.environ['TRANSFORMERS_NO_TF'] = '1'
+os.environ['USE_TF'] = '0'
+
+import torch
+import torch.nn.functional as F
+from transformers import AutoTokenizer, AutoModelForSequenceClassification, get_linear_schedule_with_warmup
+
+from fine_tune_intent_model import load_banking77_data, dataset_texts_and_labels
+
+MAPPING_FILES = ["intent_mapping.json", "label_mapping.json"]
+IGNORE_LABEL = -100  # Augmented paraphrases have soft targets only
+
+# Rule-based paraphrasing: fillers, banking synonyms, word dropout and swaps.
+# The teacher labels every variant, so imperfect paraphrases still teach the
+# student how the teacher's decision boundary behaves around real utterances.
+PREFIXES = ["", "hi, ", "please ", "can you tell me ", "i need help, ", "quick question: ", "hey "]
+SUFFIXES = ["", " please", "?", " thanks", " asap", " right now"]
+SYNONYMS = {
+    "card": ["debit card", "credit card", "bank card"],
+    "money": ["funds", "cash"],
+    "transfer": ["send", "move"],
+    "account": ["bank account", "acct"],
+    "payment": ["transaction", "charge"],
+    "refund": ["reimbursement", "money back"],
+    "balance": ["funds", "account balance"],
+    "fee": ["charge", "commission"],
+    "why": ["how come"],
+    "want": ["would like", "need"],
+    "cancel": ["stop", "revoke"],
+    "received": ["got"],
+    "top up": ["top-up", "topup", "add money"],
+}
+
+
+def paraphrase(text, rng):
+    """Return one noisy paraphrase of a training utterance"""
+    words = text.rstrip("?.!").split()
+    lowered = " ".join(words).lower()
+    for phrase, options in SYNONYMS.items():
+        if phrase in lowered.split() or (" " in phrase and phrase in lowered):
+            if rng.random() < 0.5:
+                lowered = lowered.replace(phrase, rng.choice(options), 1)
+    words = lowered.split()
+    if len(words) > 3 and rng.random() < 0.3:
+        del words[rng.randrange(len(words))]
+    if len(words) > 3 and rng.random() < 0.2:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    return (rng.choice(PREFIXES) + " ".join(words) + rng.choice(SUFFIXES)).strip()
+
+
+def augment_paraphrases(texts, per_text=2, seed=42):
+    """Generate distinct paraphrases of the training texts (soft-labelled by the teacher later)"""
+    rng = random.Random(seed)
+    seen = {t.lower() for t in texts}
+    augmented = []
+    for text in texts:
+        for _ in range(per_text):
+            variant = paraphrase(text, rng)
+            if variant.lower() not in seen:
+                seen.add(variant.lower())
+                augmented.append(variant)
+    return augmented
+
+
+def encoder_layer_list(model):
+    """Transformer blocks of a BERT/RoBERTa (encoder.layer) or DistilBERT (transformer.layer) model"""
+    base = model.base_model
+    for container in ("encoder", "transformer"):
+        layers = getattr(getattr(base, container, None), "layer", None)
+        if isinstance(layers, torch.nn.ModuleList):
+            return layers
+    raise ValueError(f"Cannot truncate layers of {type(model).__name__}")
+
+
+def truncate_teacher(teacher, num_layers):
+    """
+    Build a student from the teacher's embeddings and an evenly spaced subset of its layers
+
+    Args:
+        teacher: Fine-tuned teacher model
+        num_layers: Number of layers to keep
+
+    Returns:
+        Student model with the teacher's architecture and tokenizer
+    """
+    student = copy.deepcopy(teacher)
+    layers = encoder_layer_list(student)
+    if not 0 < num_layers < len(layers):
+        raise ValueError(f"--student-layers must be between 1 and {len(layers) - 1}")
+    step = len(layers) / num_layers
+    keep = [int(round((i + 1) * step)) - 1 for i in range(num_layers)]
+    kept = torch.nn.ModuleList([layers[i] for i in keep])
+    base = student.base_model
+    container = base.encoder if hasattr(base, "encoder") else base.transformer
+    container.layer = kept
+    # BERT/RoBERTa call it num_hidden_layers, DistilBERT n_layers
+    if hasattr(student.config, "n_layers"):
+        student.config.n_layers = num_layers
+    else:
+        student.config.num_hidden_layers = num_layers
+    print(f"[OK] Student initialized from teacher layers {[i + 1 for i in keep]}")
+    return student
+
+
+def predict_logits(model, tokenizer, texts, device, batch_size=64, max_length=128):
+    """Return (num_texts, num_labels) logits on CPU"""
+    model.eval()
+    outputs = []
+    with torch.no_grad():
+        for start in range(0, len(texts), batch_size):
+            inputs = tokenizer(
+                texts[start:start + batch_size],
+                return_tensors="pt",
+                truncation=True,
+                max_length=max_length,
+                padding="longest"
+            ).to(device)
+            outputs.append(model(**inputs).logits.float().cpu())
+    return torch.cat(outputs)
+
+
+def measure_model(model, tokenizer, texts, labels, model_dir, num_latency_texts=200):
+    """
+    Accuracy, CPU latency and memory footprint of a model
+
+    Returns:
+        Dictionary with accuracy, latency_ms_batch1, latency_ms_batch32 (per
+        utterance), parameters, memory_mb (parameters + buffers) and disk_mb
+    """
+    model = model.to("cpu").eval()
+    logits = predict_logits(model, tokenizer, texts, "cpu")
+    predictions = logits.argmax(dim=-1)
+    accuracy = (predictions == labels).float().mean().item()
+
+    sample = texts[:num_latency_texts]
+    with torch.no_grad():
+        for text in sample[:10]:  # warm-up
+            model(**tokenizer(text, return_tensors="pt"))
+        start = time.perf_counter()
+        for text in sample:
+            model(**tokenizer(text, return_tensors="pt", truncation=True, max_length=128))
+        batch1 = (time.perf_counter() - start) * 1000 / len(sample)
+    start = time.perf_counter()
+    predict_logits(model, tokenizer, sample, "cpu", batch_size=32)
+    batch32 = (time.perf_counter() - start) * 1000 / len(sample)
+
+    tensors = list(model.parameters()) + list(model.buffers())
+    memory_mb = sum(t.numel() * t.element_size() for t in tensors) / 1024 ** 2
+    disk_mb = sum(
+        os.path.getsize(os.path.join(model_dir, name))
+        for name in os.listdir(model_dir)
+        if name.startswith(("model", "pytorch_model")) and name.endswith((".safetensors", ".bin"))
+    ) / 1024 ** 2
+    return {
+        "accuracy": accuracy,
+        "latency_ms_batch1": batch1,
+        "latency_ms_batch32": batch32,
+        "parameters": sum(p.numel() for p in model.parameters()),
+        "memory_mb": memory_mb,
+        "disk_mb": disk_mb,
+        "predictions": predictions,
+    }
+
+
+def print_report(teacher, student, agreement):
+    """Print teacher and student metrics side by side"""
+    rows = [
+        ("Test accuracy", "accuracy", "{:.4f}"),
+        ("Latency, batch 1 (ms/utt)", "latency_ms_batch1", "{:.2f}"),
+        ("Latency, batch 32 (ms/utt)", "latency_ms_batch32", "{:.2f}"),
+        ("Parameters (M)", "parameters", "{:.1f}"),
+        ("Weights in memory (MB)", "memory_mb", "{:.1f}"),
+        ("Weights on disk (MB)", "disk_mb", "{:.1f}"),
+    ]
+    print(f"\n{'':<28}{'teacher':>12}{'student':>12}{'ratio':>9}")
+    for title, key, fmt in rows:
+        t, s = teacher[key], student[key]
+        if key == "parameters":
+            t, s = t / 1e6, s / 1e6
+        ratio = f"{s / t:.2f}x" if t else "-"
+        print(f"{title:<28}{fmt.format(t):>12}{fmt.format(s):>12}{ratio:>9}")
+    print(f"{'Agreement with teacher':<28}{'':>12}{agreement:>12.4f}")
+
+
+def distill_intent_model(
+    teacher_dir="./models/banking77-intent",
+    output_dir="./models/banking77-intent",
+    student_name="google/bert_uncased_L-4_H-256_A-4",
+    student_layers=None,
+    paraphrases_per_text=2,
+    num_epochs=10,
+    batch_size=32,
+    learning_rate=1e-4,
+    temperature=2.0,
+    alpha=0.7,
+    export_onnx=True
+):
+    """
+    Distill the teacher into a compact student and save it in the service layout
+
+    Args:
+        teacher_dir: Fine-tuned teacher model directory
+        output_dir: Student output directory; if it is the teacher directory
+            the teacher is moved to <output_dir>-teacher first
+        student_name: Pretrained compact model to start the student from
+        student_layers: Instead of student_name, keep this many teacher layers
+        paraphrases_per_text: Augmented paraphrases generated per train utterance
+        num_epochs: Training epochs
+        batch_size: Batch size
+        learning_rate: Learning rate
+        temperature: Softmax temperature of the distillation targets
+        alpha: Weight of the soft-target loss (1 - alpha for hard labels)
+        export_onnx: Also export the student for INTENT_BACKEND=onnx
+
+    Returns:
+        Report dictionary with teacher and student metrics
+    """
+    print(f"\n{'='*60}")
+    print(f"Distilling {teacher_dir} into a compact student")
+    print(f"{'='*60}\n")
+
+    # In-place replacement: the teacher is moved aside only once the student is trained
+    moved_teacher_dir = None
+    if os.path.abspath(teacher_dir) == os.path.abspath(output_dir):
+        moved_teacher_dir = output_dir.rstrip("/\\") + "-teacher"
+        if os.path.exists(moved_teacher_dir):
+            raise FileExistsError(
+                f"{moved_teacher_dir} already exists; pass --teacher {moved_teacher_dir} to distill from it"
+            )
+
+    train_dataset, test_dataset = load_banking77_data()
+    train_texts, train_labels = dataset_texts_and_labels(train_dataset)
+    test_texts, test_labels = dataset_texts_and_labels(test_dataset)
+    augmented = augment_paraphrases(train_texts, per_text=paraphrases_per_text)
+    texts = train_texts + augmented
+    hard_labels = torch.tensor(train_labels + [IGNORE_LABEL] * len(augmented))
+    test_labels = torch.tensor(test_labels)
+    print(f"[OK] {len(train_texts)} train utterances + {len(augmented)} paraphrases\n")
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    teacher_tokenizer = AutoTokenizer.from_pretrained(teacher_dir)
+    teacher = AutoModelForSequenceClassification.from_pretrained(teacher_dir).to(device)
+    print("Computing teacher soft targets...")
+    teacher_logits = predict_logits(teacher, teacher_tokenizer, texts, device)
+
+    if student_layers:
+        student = truncate_teacher(teacher, student_layers)
+        tokenizer = teacher_tokenizer
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(student_name)
+        student = AutoModelForSequenceClassification.from_pretrained(
+            student_name,
+            num_labels=teacher.config.num_labels,
+            id2label=teacher.config.id2label,
+            label2id=teacher.config.label2id,
+            ignore_mismatched_sizes=True
+        )
+        print(f"[OK] Student initialized from {student_name}")
+    student.to(device)
+
+    optimizer = torch.optim.AdamW(student.parameters(), lr=learning_rate, weight_decay=0.01)
+    steps = num_epochs * ((len(texts) + batch_size - 1) // batch_size)
+    scheduler = get_linear_schedule_with_warmup(optimizer, int(0.06 * steps), steps)
+    generator = torch.Generator().manual_seed(42)
+
+    print(f"\nTraining student ({sum(p.numel() for p in student.parameters()) / 1e6:.1f}M parameters)...")
+    for epoch in range(num_epochs):
+        student.train()
+        order = torch.randperm(len(texts), generator=generator).tolist()
+        total_loss = 0.0
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = tokenizer(
+                [texts[i] for i in batch],
+                return_tensors="pt",
+                truncation=True,
+                max_length=128,
+                padding="longest"
+            ).to(device)
+            logits = student(**inputs).logits
+            targets = F.softmax(teacher_logits[batch].to(device) / temperature, dim=-1)
+            soft_loss = F.kl_div(
+                F.log_softmax(logits / temperature, dim=-1), targets, reduction="batchmean"
+            ) * temperature ** 2
+            labels = hard_labels[batch].to(device)
+            loss = alpha * soft_loss
+            if (labels != IGNORE_LABEL).any():
+                loss = loss + (1 - alpha) * F.cross_entropy(logits, labels, ignore_index=IGNORE_LABEL)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            total_loss += loss.item() * len(batch)
+        print(f"  Epoch {epoch + 1}/{num_epochs}: loss {total_loss / len(texts):.4f}")
+
+    # Save in the layout load_model expects
+    if moved_teacher_dir:
+        shutil.move(teacher_dir, moved_teacher_dir)
+        teacher_dir = moved_teacher_dir
+        print(f"\n[OK] Teacher moved to {teacher_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+    student.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    for name in MAPPING_FILES:
+        for source in (os.path.join(teacher_dir, name), os.path.join(teacher_dir, "..", name)):
+            if os.path.exists(source):
+                shutil.copy(source, os.path.join(output_dir, name))
+                break
+    print(f"\n[OK] Student saved to: {output_dir}")
+
+    print("\nEvaluating teacher and student on the test set (CPU)...")
+    teacher_metrics = measure_model(teacher, teacher_tokenizer, test_texts, test_labels, teacher_dir)
+    student_metrics = measure_model(student, tokenizer, test_texts, test_labels, output_dir)
+    agreement = (teacher_metrics.pop("predictions") == student_metrics.pop("predictions")).float().mean().item()
+    print_report(teacher_metrics, student_metrics, agreement)
+
+    report = {
+        "teacher_dir": teacher_dir,
+        "student_init": f"{student_layers} teacher layers" if student_layers else student_name,
+        "train_texts": len(train_texts),
+        "paraphrases": len(augmented),
+        "temperature": temperature,
+        "alpha": alpha,
+        "teacher_metrics": teacher_metrics,
+        "student_metrics": student_metrics,
+        "agreement": agreement,
+    }
+    with open(os.path.join(output_dir, "distillation_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[OK] Report saved: {output_dir}/distillation_report.json")
+
+    if export_onnx:
+        try:
+            from export_intent_onnx import export_intent_onnx
+            export_intent_onnx(output_dir, quantize=True)
+        except Exception as e:
+            print(f"⚠ Warning: Could not export student to ONNX: {e}")
+    return report
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Distill the Banking77 intent model into a compact student")
+    parser.add_argument("--teacher", type=str, default="./models/banking77-intent",
+                        help="Teacher model directory (default: ./models/banking77-intent)")
+    parser.add_argument("--output", type=str, default="./models/banking77-intent",
+                        help="Student output directory (default: ./models/banking77-intent, "
+                             "moving the teacher to ./models/banking77-intent-teacher)")
+    parser.add_argument("--student", type=str, default="google/bert_uncased_L-4_H-256_A-4",
+                        help="Pretrained compact student (default: google/bert_uncased_L-4_H-256_A-4)")
+    parser.add_argument("--student-layers", type=int, default=None,
+                        help="Build the student from this many teacher layers instead of --student")
+    parser.add_argument("--paraphrases", type=int, default=2,
+                        help="Augmented paraphrases per train utterance (default: 2)")
+    parser.add_argument("--epochs", type=int, default=10, help="Number of training epochs (default: 10)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size (default: 32)")
+    parser.add_argument("--lr", type=float, default=1e-4, help="Learning rate (default: 1e-4)")
+    parser.add_argument("--temperature", type=float, default=2.0, help="Distillation temperature (default: 2.0)")
+    parser.add_argument("--alpha", type=float, default=0.7,
+                        help="Soft-target loss weight; 1 - alpha goes to hard labels (default: 0.7)")
+    parser.add_argument("--no-onnx", action="store_true", help="Skip the ONNX export of the student")
+    args = parser.parse_args()
+
+    distill_intent_model(
+        teacher_dir=args.teacher,
+        output_dir=args.output,
+        student_name=args.student,
+        student_layers=args.student_layers,
+        paraphrases_per_text=args.paraphrases,
+        num_epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.lr,
+        temperature=args.temperature,
+        alpha=args.alpha,
+        export_onnx=not args.no_onnx
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Export the fine-tuned Banking77 intent model to ONNX for ONNX Runtime inference
+
+Writes <model_path>/onnx/model.onnx (and model.int8.onnx with --quantize)
+next to the PyTorch weights, so the backend can serve it with
+INTENT_BACKEND=onnx.
+"""
+import os
+import json
+import inspect
+
+# Disable TensorFlow to avoid DLL issues (we're using PyTorch)
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+os.environ['TRANSFORMERS_NO_TF'] = '1'
+os.environ['USE_TF'] = '0'
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+ONNX_DIR = "onnx"
+ONNX_MODEL = "model.onnx"
+ONNX_INT8_MODEL = "model.int8.onnx"
+
+PARITY_TEXTS = [
+    "What is my account balance?",
+    "I want to transfer 500 rupees to Rahul",
+    "My card has not arrived yet",
+    "Why was I charged a fee for my top up?",
+]
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Positional-input wrapper returning only the classification logits"""
+
+    def __init__(self, model, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs))).logits
+
+
+def export_intent_onnx(model_path="./models/banking77-intent", quantize=False, opset=14, max_length=128):
+    """
+    Export a sequence-classification model to ONNX
+
+    Args:
+        model_path: Fine-tuned model directory (config.json, weights, tokenizer)
+        quantize: Also write a dynamically int8-quantized copy
+        opset: ONNX opset version
+        max_length: Sequence length of the example input used for tracing
+
+    Returns:
+        Path to the exported fp32 model
+    """
+    print(f"Exporting {model_path} to ONNX...")
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+
+    example = tokenizer(PARITY_TEXTS[:2], return_tensors="pt", padding="max_length",
+                        truncation=True, max_length=max_length)
+    forward_params = inspect.signature(model.forward).parameters
+    input_names = [name for name in forward_params if name in example]
+
+    output_dir = os.path.join(model_path, ONNX_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    onnx_path = os.path.join(output_dir, ONNX_MODEL)
+
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False  # TorchScript exporter: stable dynamic axes for HF models
+    torch.onnx.export(
+        _LogitsOnly(model, input_names),
+        tuple(example[name] for name in input_names),
+        onnx_path,
+        input_names=input_names,
+        output_names=["logits"],
+        dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in input_names}, "logits": {0: "batch"}},
+        opset_version=opset,
+        do_constant_folding=True,
+        **export_kwargs
+    )
+    print(f"[OK] ONNX model saved: {onnx_path} ({os.path.getsize(onnx_path) / 1024 ** 2:.1f} MB)")
+
+    int8_path = None
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        int8_path = os.path.join(output_dir, ONNX_INT8_MODEL)
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"[OK] int8 ONNX model saved: {int8_path} ({os.path.getsize(int8_path) / 1024 ** 2:.1f} MB)")
+
+    with open(os.path.join(output_dir, "export_info.json"), "w") as f:
+        json.dump({
+            "input_names": input_names,
+            "opset": opset,
+            "quantized": quantize,
+            "num_labels": model.config.num_labels,
+        }, f, indent=2)
+
+    # Compare against a freshly loaded model: tracing can leave state on the exported one
+    reference = AutoModelForSequenceClassification.from_pretrained(model_path).eval()
+    max_diff = check_parity(reference, tokenizer, onnx_path)
+    print(f"[OK] Max |logit| difference vs PyTorch: {max_diff:.2e}")
+    return onnx_path
+
+
+def check_parity(model, tokenizer, onnx_path, texts=PARITY_TEXTS):
+    """Return the max absolute logit difference between PyTorch and ONNX Runtime"""
+    import onnxruntime as ort
+
+    session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+    feed_names = [i.name for i in session.get_inputs()]
+    inputs = tokenizer(texts, return_tensors="np", padding=True, truncation=True, max_length=128)
+    onnx_logits = session.run(["logits"], {name: inputs[name].astype(np.int64) for name in feed_names})[0]
+    with torch.no_grad():
+        torch_logits = model(**{name: torch.from_numpy(inputs[name]) for name in feed_names}).logits.numpy()
+    return float(np.abs(onnx_logits - torch_logits).max())
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the intent model to ONNX")
+    parser.add_argument(
+        "--model-path",
+        type=str,
+        default="./models/banking77-intent",
+        help="Fine-tuned model directory (default: ./models/banking77-intent)"
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Also write a dynamically int8-quantized model"
+    )
+    parser.add_argument(
+        "--opset",
+        type=int,
+        default=14,
+        help="ONNX opset version (default: 14)"
+    )
+
+    args = parser.parse_args()
+    export_intent_onnx(args.model_path, quantize=args.quantize, opset=args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,8 @@ from datasets import Dataset, load_dataset
 from sklearn.metrics import accuracy_score, precision_recall_fscore_support
 import numpy as np
 
+EARLY_EXIT_FILE = "early_exit_heads.pt"
+
 
 def load_banking77_data(data_dir="banking77data"):
     """Load Banking77 dataset from CSV files"""
@@ -305,6 +307,187 @@ def fine_tune_model(
     return trainer, eval_results
 
 
+def mean_pool(hidden, attention_mask):
+    """Average token states over the attention mask (same as backend/app/services/early_exit.py)"""
+    mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+    return (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+
+
+def dataset_texts_and_labels(dataset):
+    """Return (texts, integer labels) using the same label ids as fine_tune_model"""
+    text_column = "text" if "text" in dataset.column_names else "sentence"
+    if 'label' in dataset.column_names:
+        labels = list(dataset['label'])
+    else:
+        label_map = {label: idx for idx, label in enumerate(sorted(set(dataset['label_text'])))}
+        labels = [label_map[label] for label in dataset['label_text']]
+    return list(dataset[text_column]), labels
+
+
+def pooled_layer_features(model, tokenizer, texts, batch_size=64, max_length=128):
+    """
+    Run the frozen model once and collect every encoder layer's pooled output
+    
+    Returns:
+        (list of (num_texts, hidden) tensors, one per layer; final classifier logits)
+    """
+    import torch
+    
+    features, final_logits = None, []
+    with torch.no_grad():
+        for start in range(0, len(texts), batch_size):
+            inputs = tokenizer(
+                texts[start:start + batch_size],
+                return_tensors="pt",
+                truncation=True,
+                max_length=max_length,
+                padding="longest"
+            ).to(model.device)
+            outputs = model(**inputs, output_hidden_states=True)
+            # hidden_states[0] is the embedding output; [i] is layer i
+            pooled = [mean_pool(h, inputs["attention_mask"]).float().cpu() for h in outputs.hidden_states[1:]]
+            if features is None:
+                features = [[] for _ in pooled]
+            for layer_features, layer_pooled in zip(features, pooled):
+                layer_features.append(layer_pooled)
+            final_logits.append(outputs.logits.float().cpu())
+    return [torch.cat(f) for f in features], torch.cat(final_logits)
+
+
+def evaluate_early_exit(heads, features, final_logits, labels, thresholds):
+    """
+    Simulate early exit on pre-computed features
+    
+    Each text leaves at the first head whose max probability reaches the
+    threshold, otherwise at the final classifier, as IntentRecognitionService does.
+    
+    Returns:
+        {threshold: {"accuracy", "avg_layers", "histogram"}}
+    """
+    import torch
+    
+    num_layers = len(features)
+    with torch.no_grad():
+        head_probabilities = {
+            layer: torch.softmax(head(features[layer - 1]), dim=-1) for layer, head in heads.items()
+        }
+    full_accuracy = (final_logits.argmax(dim=-1) == labels).float().mean().item()
+    print(f"\n  Full model accuracy: {full_accuracy:.4f} ({num_layers} layers)")
+    print(f"  {'threshold':>9}  {'accuracy':>8}  {'avg layers':>10}  exit histogram (layer: share)")
+    
+    report = {}
+    for threshold in thresholds:
+        predictions = final_logits.argmax(dim=-1)
+        exit_layer = torch.full_like(labels, num_layers)
+        pending = torch.ones_like(labels, dtype=torch.bool)
+        for layer in sorted(head_probabilities):
+            confidence, predicted = head_probabilities[layer].max(dim=-1)
+            exits = pending & (confidence >= threshold)
+            predictions[exits] = predicted[exits]
+            exit_layer[exits] = layer
+            pending &= ~exits
+        histogram = {int(layer): int(count) for layer, count in zip(*exit_layer.unique(return_counts=True))}
+        accuracy = (predictions == labels).float().mean().item()
+        avg_layers = exit_layer.float().mean().item()
+        shares = ", ".join(f"{layer}: {count / len(labels):.0%}" for layer, count in histogram.items())
+        print(f"  {threshold:>9.2f}  {accuracy:>8.4f}  {avg_layers:>10.2f}  {shares}")
+        report[str(threshold)] = {"accuracy": accuracy, "avg_layers": avg_layers, "histogram": histogram}
+    return {"full_model_accuracy": full_accuracy, "thresholds": report}
+
+
+def train_early_exit_heads(
+    model_dir="./models/banking77-intent",
+    exit_layers=None,
+    num_epochs=30,
+    batch_size=256,
+    learning_rate=1e-3,
+    thresholds=(0.7, 0.8, 0.9, 0.95)
+):
+    """
+    Train early-exit classifier heads on intermediate layers of a fine-tuned model
+    
+    The fine-tuned backbone is frozen: each layer's mean-pooled output is
+    computed once and a linear head per exit layer is trained on it. Heads
+    are saved to <model_dir>/early_exit_heads.pt for INTENT_EARLY_EXIT_ENABLED;
+    per-layer accuracy and exit histograms on the test set are saved to
+    early_exit_info.json.
+    
+    Args:
+        model_dir: Fine-tuned model directory
+        exit_layers: 1-based layers that get a head (default: all but the last)
+        num_epochs: Head training epochs
+        batch_size: Head training batch size
+        learning_rate: Head learning rate
+        thresholds: Confidence thresholds to report exit histograms for
+    
+    Returns:
+        Evaluation report dictionary
+    """
+    import torch
+    import torch.nn.functional as F
+    
+    print(f"\n{'='*60}")
+    print(f"Training early-exit heads for {model_dir}")
+    print(f"{'='*60}\n")
+    
+    train_dataset, test_dataset = load_banking77_data()
+    train_texts, train_labels = dataset_texts_and_labels(train_dataset)
+    test_texts, test_labels = dataset_texts_and_labels(test_dataset)
+    train_labels = torch.tensor(train_labels)
+    test_labels = torch.tensor(test_labels)
+    
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir).to(device).eval()
+    
+    print("Extracting layer features (frozen backbone)...")
+    train_features, _ = pooled_layer_features(model, tokenizer, train_texts)
+    test_features, test_logits = pooled_layer_features(model, tokenizer, test_texts)
+    num_layers = len(train_features)
+    hidden_size = train_features[0].shape[1]
+    num_labels = model.config.num_labels
+    exit_layers = sorted(exit_layers or range(1, num_layers))
+    print(f"[OK] {num_layers} layers, exit heads at {exit_layers}\n")
+    
+    torch.manual_seed(0)
+    heads = {}
+    for layer in exit_layers:
+        head = torch.nn.Linear(hidden_size, num_labels)
+        optimizer = torch.optim.AdamW(head.parameters(), lr=learning_rate, weight_decay=0.01)
+        features = train_features[layer - 1]
+        for _ in range(num_epochs):
+            order = torch.randperm(len(features))
+            for start in range(0, len(features), batch_size):
+                batch = order[start:start + batch_size]
+                loss = F.cross_entropy(head(features[batch]), train_labels[batch])
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+        head.eval()
+        with torch.no_grad():
+            accuracy = (head(test_features[layer - 1]).argmax(dim=-1) == test_labels).float().mean().item()
+        print(f"  Layer {layer:>2} head: test accuracy {accuracy:.4f}")
+        heads[layer] = head
+    
+    heads_path = os.path.join(model_dir, EARLY_EXIT_FILE)
+    torch.save({
+        "exit_layers": exit_layers,
+        "num_layers": num_layers,
+        "hidden_size": hidden_size,
+        "num_labels": num_labels,
+        "pooling": "mean",
+        "heads": {str(layer): head.state_dict() for layer, head in heads.items()},
+    }, heads_path)
+    print(f"\n[OK] Early-exit heads saved: {heads_path}")
+    
+    report = evaluate_early_exit(heads, test_features, test_logits, test_labels, thresholds)
+    report["exit_layers"] = exit_layers
+    with open(os.path.join(model_dir, "early_exit_info.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[OK] Early-exit report saved: {model_dir}/early_exit_info.json")
+    return report
+
+
 def main():
     """Main function"""
     import argparse
@@ -340,9 +523,23 @@ def main():
         default="./models/banking77-intent",
         help="Output directory (default: ./models/banking77-intent)"
     )
+    parser.add_argument(
+        "--early-exit",
+        action="store_true",
+        help="Also train early-exit heads on intermediate layers after fine-tuning"
+    )
+    parser.add_argument(
+        "--early-exit-only",
+        action="store_true",
+        help="Only train early-exit heads for the existing model in --output"
+    )
     
     args = parser.parse_args()
     
+    if args.early_exit_only:
+        train_early_exit_heads(model_dir=args.output)
+        return
+    
     # Create output directory
     os.makedirs(args.output, exist_ok=True)
     
@@ -355,6 +552,9 @@ def main():
         learning_rate=args.lr
     )
     
+    if args.early_exit:
+        train_early_exit_heads(model_dir=args.output)
+    
     print("\n" + "="*60)
     print("Training Complete!")
     print("="*60)
@@ -0,0 +1,171 @@
+"""
+Publish a trained intent model as a new version of the intent model registry
+
+Copies a model directory (weights, tokenizer, intent/label mappings, onnx/
+exports, early-exit heads, reports) into <registry>/<version>/ and writes
+manifest.json with a SHA-256 per file. The manifest is written last and the
+directory renamed into place, so the backend never sees a half-copied
+version. With --activate the ACTIVE pointer is switched too, and every
+running backend reloads it without a restart (INTENT_REGISTRY_POLL_SECONDS).
+
+Rolling back is activating an older version:
+    python scripts/publish_intent_model.py --registry ./models/intent-registry --activate-only v3
+"""
+import os
+import re
+import json
+import shutil
+import hashlib
+from datetime import datetime, timezone
+
+# Registry layout; must match backend/app/services/intent_model_registry.py
+ACTIVE_FILE = "ACTIVE"
+MANIFEST_FILE = "manifest.json"
+VERSION_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+# Training leftovers the backend never loads
+IGNORED = shutil.ignore_patterns("checkpoint-*", "logs", "runs", "training_args.bin", "__pycache__")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def next_version(registry):
+    """Next vN after the highest published vN"""
+    numbers = [
+        int(name[1:]) for name in os.listdir(registry)
+        if re.fullmatch(r"v\d+", name) and os.path.exists(os.path.join(registry, name, MANIFEST_FILE))
+    ] if os.path.isdir(registry) else []
+    return f"v{max(numbers, default=0) + 1}"
+
+
+def activate(registry, version):
+    """Point ACTIVE at a published version (atomic rename)"""
+    if not os.path.exists(os.path.join(registry, version, MANIFEST_FILE)):
+        raise ValueError(f"Version {version} is not published in {registry}")
+    tmp_path = os.path.join(registry, f".{ACTIVE_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp_path, os.path.join(registry, ACTIVE_FILE))
+    print(f"✓ ACTIVE -> {version}")
+
+
+def publish_intent_model(source="./models/banking77-intent", registry="./models/intent-registry",
+                         version=None, notes="", activate_version=False):
+    """
+    Copy a model directory into the registry as a new version
+
+    Args:
+        source: Fine-tuned model directory (config.json, weights, tokenizer)
+        registry: Registry directory
+        version: Version name (default: next vN)
+        notes: Free text stored in the manifest
+        activate_version: Also make it the served version
+
+    Returns:
+        The manifest
+    """
+    if not os.path.exists(os.path.join(source, "config.json")):
+        raise ValueError(f"{source} is not a model directory (no config.json)")
+    os.makedirs(registry, exist_ok=True)
+    version = version or next_version(registry)
+    if not VERSION_NAME.match(version):
+        raise ValueError(f"Invalid version name: {version!r}")
+    target = os.path.join(registry, version)
+    if os.path.exists(target):
+        raise ValueError(f"Version {version} already exists in {registry}")
+
+    staging = os.path.join(registry, f".{version}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    print(f"Publishing {source} as {version}...")
+    shutil.copytree(source, staging, ignore=IGNORED)
+    # Older layouts keep label_mapping.json beside the model directory
+    parent_labels = os.path.join(source, "..", "label_mapping.json")
+    if not os.path.exists(os.path.join(staging, "label_mapping.json")) and os.path.exists(parent_labels):
+        shutil.copy2(parent_labels, os.path.join(staging, "label_mapping.json"))
+
+    with open(os.path.join(staging, "config.json"), "r") as f:
+        config = json.load(f)
+    files = {}
+    for root, _, names in os.walk(staging):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, staging).replace(os.sep, "/")
+            files[relative] = {"sha256": file_sha256(path), "size": os.path.getsize(path)}
+    manifest = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": os.path.abspath(source),
+        "model_type": config.get("model_type"),
+        "num_labels": len(config.get("id2label", {})) or config.get("num_labels"),
+        "files": files,
+        "reports": sorted(name for name in files if name.endswith("_report.json")),
+        "notes": notes,
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(staging, target)
+
+    size_mb = sum(entry["size"] for entry in files.values()) / 1024 ** 2
+    print(f"✓ Published {version}: {len(files)} files, {size_mb:.1f} MB -> {target}")
+    if activate_version:
+        activate(registry, version)
+    return manifest
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Publish an intent model version to the registry")
+    parser.add_argument(
+        "--source",
+        type=str,
+        default="./models/banking77-intent",
+        help="Model directory to publish (default: ./models/banking77-intent)"
+    )
+    parser.add_argument(
+        "--registry",
+        type=str,
+        default="./models/intent-registry",
+        help="Registry directory (default: ./models/intent-registry)"
+    )
+    parser.add_argument(
+        "--version",
+        type=str,
+        default=None,
+        help="Version name (default: next vN)"
+    )
+    parser.add_argument(
+        "--notes",
+        type=str,
+        default="",
+        help="Notes stored in the manifest"
+    )
+    parser.add_argument(
+        "--activate",
+        action="store_true",
+        help="Serve the new version (running backends reload it)"
+    )
+    parser.add_argument(
+        "--activate-only",
+        type=str,
+        default=None,
+        metavar="VERSION",
+        help="Only point ACTIVE at an already published version (rollback)"
+    )
+
+    args = parser.parse_args()
+    if args.activate_only:
+        activate(args.registry, args.activate_only)
+    else:
+        publish_intent_model(args.source, args.registry, args.version, args.notes, args.activate)
+
+
+if __name__ == "__main__":
+    main()
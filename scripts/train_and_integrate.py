@@ -6,12 +6,22 @@ import sys
 import subprocess
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Train the Banking77 model and integrate it with the application")
+    parser.add_argument(
+        "--distill",
+        action="store_true",
+        help="Distill the trained model into a compact student served in its place"
+    )
+    args = parser.parse_args()
+    
     print("=" * 70)
     print("Banking77 Model Training and Integration")
     print("=" * 70)
     
     # Step 1: Create intent mapping
-    print("\n[Step 1/4] Creating intent mapping...")
+    print("\n[Step 1/5] Creating intent mapping...")
     try:
         from create_intent_mapping import create_intent_mapping
         create_intent_mapping()
@@ -21,7 +31,7 @@ def main():
         return
     
     # Step 2: Train the model
-    print("\n[Step 2/4] Training Banking77 model...")
+    print("\n[Step 2/5] Training Banking77 model...")
     print("This may take a while depending on your hardware...")
     
     # Use smaller model for faster training (can be changed)
@@ -52,7 +62,7 @@ def main():
         return
     
     # Step 3: Copy intent mapping to model directory
-    print("\n[Step 3/4] Copying intent mapping to model directory...")
+    print("\n[Step 3/5] Copying intent mapping to model directory...")
     try:
         import shutil
         if os.path.exists("banking77data/intent_mapping.json"):
@@ -67,7 +77,7 @@ def main():
         print(f"⚠ Warning: Could not copy intent mapping: {e}")
     
     # Step 4: Verify integration
-    print("\n[Step 4/4] Verifying model integration...")
+    print("\n[Step 4/5] Verifying model integration...")
     try:
         # Test loading the model
         from transformers import AutoTokenizer, AutoModelForSequenceClassification
@@ -90,6 +100,32 @@ def main():
         print(f"⚠ Warning: Could not verify model: {e}")
         print("The model may still work, but verification failed")
     
+    # Step 5: Export to ONNX for the ONNX Runtime backend
+    print("\n[Step 5/5] Exporting model to ONNX...")
+    try:
+        from export_intent_onnx import export_intent_onnx
+        export_intent_onnx("./models/banking77-intent", quantize=True)
+        print("✓ ONNX export completed (set INTENT_BACKEND=onnx to serve it)")
+    except Exception as e:
+        print(f"⚠ Warning: Could not export ONNX model: {e}")
+        print("The PyTorch model will still be used. Install onnx and onnxruntime to enable the export")
+    
+    # Optional: replace the served model with a distilled student
+    if args.distill:
+        print("\n[Optional] Distilling into a compact student model...")
+        try:
+            from distill_intent_model import distill_intent_model
+            report = distill_intent_model(
+                teacher_dir="./models/banking77-intent",
+                output_dir="./models/banking77-intent"
+            )
+            print("✓ Student model installed (teacher kept in ./models/banking77-intent-teacher)")
+            print(f"  - Student accuracy: {report['student_metrics']['accuracy']:.4f} "
+                  f"(teacher {report['teacher_metrics']['accuracy']:.4f})")
+        except Exception as e:
+            print(f"⚠ Warning: Could not distill model: {e}")
+            print("The teacher model will still be used")
+    
     print("\n" + "=" * 70)
     print("Training and Integration Complete!")
     print("=" * 70)